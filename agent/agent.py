@@ -1,16 +1,46 @@
-from typing import List
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from pydantic import BaseModel, Field, computed_field
+from pydantic.json_schema import SkipJsonSchema
 from pydantic_ai import Agent, ModelSettings
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.usage import RunUsage
+from pydantic_core import from_json
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from agent.ai_model import TEMPERATURE, model
-from agent.prompt import PROMPT_V1
+from agent.ai_model import AI_MODEL, TEMPERATURE, model
+from agent.concurrency import analysis_flights, model_call_limiter
+from agent.llm_metrics import llm_call_log, prompt_version, tracked_call
+from agent.map_reduce import (
+    MAP_REDUCE_CHUNK_SIZE,
+    MAP_REDUCE_PARALLELISM,
+    digests_text,
+    keep_known_citations,
+    summarize_reports,
+)
+from agent.prompt import CHUNK_PROMPT_V1, PROMPT_V1
+from agent.prompt_context import (
+    PromptContext,
+    build_prompt_context,
+    render_header,
+    report_table,
+)
+from agent.report_ranking import RANKING_WEIGHTS, ReportSelection, rank_reports
+from agent.result_cache import agent_result_cache, data_fingerprint, result_cache_key
+from agent.timing import timed_stage
 from service_layer.kpi_query import (
     KPISchema,
     get_kpis_by_insurance_company_and_practice_area,
+    get_kpis_by_insurance_company_and_practice_area_async,
+)
+from service_layer.reports_query import (
+    ReportSchema,
+    get_report_analysis_payload,
+    get_report_analysis_payload_async,
+    months_ago,
 )
-from service_layer.reports_query import ReportSchema, get_report_analysis_payload
 
 
 class Citation(BaseModel):
@@ -36,8 +66,14 @@ class Insurance360Output(BaseModel):
         description="Ein Gesamtfazit mit verknüpften [ID] Zitaten."
     )
     citations: List[Citation] = Field(default_factory=list)
+    # Filled in after the run; hidden from the model's output schema
+    report_selection: SkipJsonSchema[Optional[ReportSelection]] = None
 
 
+# Output fields pushed to the client while the model is still writing them
+STREAMED_FIELDS = ("kpi_analysis", "report_analysis", "final_executive_summary")
+STREAM_DEBOUNCE_SECONDS = 0.05
+
 simple_agent = Agent(
     model,
     output_type=Insurance360Output,
@@ -46,16 +82,359 @@ simple_agent = Agent(
 )
 
 
-def run_simple_360(session: Session, company_id: int, area_id: int):
-    kpis = get_kpis_by_insurance_company_and_practice_area(session, company_id, area_id)
-    reports = get_report_analysis_payload(session, company_id, area_id)
+def _result_cache_key(context: PromptContext) -> str:
+    # The serialized context holds every KPI and report row sent
+    return result_cache_key(
+        PROMPT_V1, AI_MODEL, TEMPERATURE, data_fingerprint(context.text)
+    )
+
+
+def _prepare_context(
+    company_id: int,
+    area_id: int,
+    kpis,
+    reports,
+    focus: Optional[str] = None,
+) -> Tuple[PromptContext, ReportSelection]:
+    """Ranks the reports and serializes the best ones that fit the budget.
+
+    Relevance is scored against the practice area name plus ``focus``.
+    """
+    report_list = reports["reports"] if reports else []
+    area_name = reports["practice_area_name"] if reports else None
+    query = " ".join(filter(None, [area_name, focus]))
+    ranked = rank_reports(report_list, query)
+    by_id = {report.id: report for report in report_list}
+    ranked_reports = reports and {
+        **reports,
+        "reports": [by_id[r.report_id] for r in ranked],
+    }
+    prompt_context = build_prompt_context(company_id, area_id, kpis, ranked_reports)
+    included = set(prompt_context.report_ids)
+    selection = ReportSelection(
+        query=query,
+        weights=RANKING_WEIGHTS,
+        considered=len(report_list),
+        selected=[r for r in ranked if r.report_id in included],
+        omitted=prompt_context.omitted_reports,
+    )
+    return prompt_context, selection
+
+
+def _finish(output: Insurance360Output, selection: ReportSelection, cache_key: str):
+    output.report_selection = selection
+    agent_result_cache.set(cache_key, output.model_dump_json())
+    return output
+
 
-    prompt = (
-        f"Context IDs: company_id={company_id}, area_id={area_id}\n\n"
-        f"Analyze this data for {reports.get('insurance_company_name', 'Unknown')}:\n\n"
-        f"KPIs: {kpis}\n\n"
-        f"Reports: {reports}"
+def _cached_result(cache_key: str) -> Optional[Insurance360Output]:
+    cached = agent_result_cache.get(cache_key)
+    if cached is None:
+        return None
+    return Insurance360Output.model_validate_json(cached)
+
+
+def _tracked(operation: str, company_id: int, area_id: int, prompt: str = PROMPT_V1):
+    """Records the run in :data:`llm_call_log` (see :func:`tracked_call`)."""
+    return tracked_call(
+        llm_call_log,
+        company_id=company_id,
+        area_id=area_id,
+        operation=operation,
+        model_name=AI_MODEL,
+        prompt_version=prompt_version(prompt),
+    )
+
+
+def run_simple_360(
+    session: Session,
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = None,
+    months: Optional[int] = None,
+    bypass_cache: bool = False,
+    focus: Optional[str] = None,
+):
+    """Runs the 360 analysis for one company/area pair.
+
+    ``max_reports`` keeps only the most recent reports and ``months`` only
+    those of the last N months; by default the full history is analysed.
+    Results are cached by prompt, model and input data; ``bypass_cache``
+    forces a fresh model call and stores its result. Reports are ranked by
+    recency, priority and relevance to the area and ``focus`` before the
+    token budget is applied; the selection is recorded on the output.
+    Every run is logged to :data:`llm_call_log`.
+    """
+    with _tracked("run_simple_360", company_id, area_id) as call:
+        kpis = get_kpis_by_insurance_company_and_practice_area(
+            session, company_id, area_id, validate=False
+        )
+        reports = get_report_analysis_payload(
+            session,
+            company_id,
+            area_id,
+            validate=False,
+            limit=max_reports,
+            since=months_ago(months) if months else None,
+        )
+
+        prompt_context, selection = _prepare_context(
+            company_id, area_id, kpis, reports, focus
+        )
+        cache_key = _result_cache_key(prompt_context)
+        if not bypass_cache:
+            cached = _cached_result(cache_key)
+            if cached is not None:
+                call.cache_hit = True
+                return cached
+
+        with call.model_call():
+            call.result = simple_agent.run_sync(prompt_context.text)
+        return _finish(call.result.output, selection, cache_key)
+
+
+async def _load_inputs_async(
+    session: AsyncSession,
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int],
+    months: Optional[int],
+):
+    kpis = await get_kpis_by_insurance_company_and_practice_area_async(
+        session, company_id, area_id, validate=False
+    )
+    reports = await get_report_analysis_payload_async(
+        session,
+        company_id,
+        area_id,
+        validate=False,
+        limit=max_reports,
+        since=months_ago(months) if months else None,
     )
+    # Hand the connection back to the pool before the long model call
+    await session.close()
+    return kpis, reports
+
+
+async def run_360(
+    session: AsyncSession,
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = None,
+    months: Optional[int] = None,
+    bypass_cache: bool = False,
+    focus: Optional[str] = None,
+):
+    """Async variant of :func:`run_simple_360`.
+
+    The model call runs inside a slot of :data:`model_call_limiter` and
+    raises :class:`ModelBusyError` when none frees up in time. Cache hits
+    never wait for a slot. Concurrent runs over the same data share one
+    model call (:data:`analysis_flights`). The ``db``, ``prompt`` and
+    ``model`` stages are timed (see :mod:`agent.timing`).
+    """
+    with _tracked("run_360", company_id, area_id) as call:
+        with timed_stage("db"):
+            kpis, reports = await _load_inputs_async(
+                session, company_id, area_id, max_reports, months
+            )
+        with timed_stage("prompt"):
+            # Ranking is CPU-bound; keep it off the event loop
+            prompt_context, selection = await asyncio.to_thread(
+                _prepare_context, company_id, area_id, kpis, reports, focus
+            )
+            cache_key = _result_cache_key(prompt_context)
+            cached = None if bypass_cache else _cached_result(cache_key)
+        if cached is not None:
+            call.cache_hit = True
+            return cached
+
+        async def compute():
+            async with model_call_limiter.slot():
+                with timed_stage("model"), call.model_call():
+                    call.result = await simple_agent.run(prompt_context.text)
+            return _finish(call.result.output, selection, cache_key)
+
+        output = await analysis_flights.run((company_id, area_id, cache_key), compute)
+        call.coalesced = call.result is None
+        return output
+
+
+def _is_known_source(source_id: str, report_ids: Set[int]) -> bool:
+    if not source_id.startswith("Report-"):
+        return True
+    number = source_id.removeprefix("Report-")
+    return number.isdigit() and int(number) in report_ids
+
+
+def _drop_unknown_report_citations(
+    output: Insurance360Output, report_ids: Set[int]
+) -> Insurance360Output:
+    for field in STREAMED_FIELDS:
+        setattr(output, field, keep_known_citations(getattr(output, field), report_ids))
+    output.citations = [
+        citation
+        for citation in output.citations
+        if _is_known_source(citation.source_id, report_ids)
+    ]
+    return output
+
+
+async def run_360_hierarchical(
+    session: AsyncSession,
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = None,
+    months: Optional[int] = None,
+    bypass_cache: bool = False,
+    chunk_size: int = MAP_REDUCE_CHUNK_SIZE,
+    parallelism: int = MAP_REDUCE_PARALLELISM,
+):
+    """Map-reduce variant of :func:`run_360` for accounts with many reports.
+
+    All reports are summarized in chunks, ``parallelism`` at a time (see
+    :func:`summarize_reports`), and :data:`simple_agent` then analyses the
+    KPIs plus those summaries. The summaries carry the original
+    ``[Report-ID]`` citations through; citations to reports outside the
+    input are dropped from the output.
+    """
+    with _tracked(
+        "run_360_hierarchical", company_id, area_id, PROMPT_V1 + CHUNK_PROMPT_V1
+    ) as call:
+        with timed_stage("db"):
+            kpis, reports = await _load_inputs_async(
+                session, company_id, area_id, max_reports, months
+            )
+        report_list = reports["reports"] if reports else []
+        header = render_header(company_id, area_id, kpis, reports)
+        cache_key = result_cache_key(
+            PROMPT_V1 + CHUNK_PROMPT_V1,
+            AI_MODEL,
+            TEMPERATURE,
+            data_fingerprint(header, report_table("Reports", report_list), chunk_size),
+        )
+        if not bypass_cache:
+            cached = _cached_result(cache_key)
+            if cached is not None:
+                call.cache_hit = True
+                return cached
+
+        async def compute():
+            # Sums the chunk calls and the final call, so the logged tokens
+            # cover the whole map-reduce
+            usage = RunUsage()
+            with timed_stage("model"), call.model_call():
+                digests = await summarize_reports(
+                    report_list,
+                    model_call_limiter,
+                    chunk_size,
+                    parallelism,
+                    usage=usage,
+                )
+                prompt = (
+                    f"{header}\n"
+                    "Report summaries, citing the underlying [Report-ID]s:\n"
+                    f"{digests_text(digests)}"
+                )
+                async with model_call_limiter.slot():
+                    call.result = await simple_agent.run(prompt)
+                usage.incr(call.result.usage())
+                call.usage = usage
+
+            output = _drop_unknown_report_citations(
+                call.result.output, {report.id for report in report_list}
+            )
+            agent_result_cache.set(cache_key, output.model_dump_json())
+            return output
+
+        output = await analysis_flights.run((company_id, area_id, cache_key), compute)
+        call.coalesced = call.result is None
+        return output
+
+
+def _streamed_fields(response: ModelResponse) -> Dict[str, str]:
+    """Text fields present so far in the partial output tool call."""
+    for part in response.parts:
+        if not isinstance(part, ToolCallPart):
+            continue
+        args = part.args
+        if isinstance(args, str):
+            try:
+                args = from_json(args or "{}", allow_partial="trailing-strings")
+            except ValueError:
+                return {}
+        return {
+            name: args[name]
+            for name in STREAMED_FIELDS
+            if isinstance(args, dict) and isinstance(args.get(name), str)
+        }
+    return {}
+
+
+async def stream_360(
+    session: AsyncSession,
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = None,
+    months: Optional[int] = None,
+    bypass_cache: bool = False,
+    focus: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Streaming variant of :func:`run_360`, yielding ``(event, data)`` pairs.
+
+    ``context`` carries the KPIs and reports straight from the database,
+    ``partial`` the current text of one of :data:`STREAMED_FIELDS` while the
+    model writes it, and ``result`` the complete output (also the only
+    event after ``context`` on a cache hit). The model call runs as a
+    shared flight, so concurrent streams over the same data all follow one
+    call, and the call finishes even if its first client disconnects.
+    """
+    with _tracked("stream_360", company_id, area_id) as call:
+        kpis, reports = await _load_inputs_async(
+            session, company_id, area_id, max_reports, months
+        )
+        report_list = reports["reports"] if reports else []
+        names = reports or (kpis[0].model_dump() if kpis else {})
+        yield "context", {
+            "insurance_company_name": names.get("insurance_company_name"),
+            "practice_area_name": names.get("practice_area_name"),
+            "kpi_data": [kpi.model_dump(mode="json") for kpi in kpis],
+            "visit_reports": [report.model_dump(mode="json") for report in report_list],
+        }
+
+        prompt_context, selection = await asyncio.to_thread(
+            _prepare_context, company_id, area_id, kpis, reports, focus
+        )
+        cache_key = _result_cache_key(prompt_context)
+        cached = None if bypass_cache else _cached_result(cache_key)
+        if cached is not None:
+            call.cache_hit = True
+            yield "result", cached.model_dump(mode="json")
+            return
+
+        async def compute(flight):
+            sent: Dict[str, str] = {}
+            async with model_call_limiter.slot():
+                with call.model_call():
+                    async with simple_agent.run_stream(prompt_context.text) as result:
+                        async for response, _ in result.stream_responses(
+                            debounce_by=STREAM_DEBOUNCE_SECONDS
+                        ):
+                            for name, text in _streamed_fields(response).items():
+                                if sent.get(name) != text:
+                                    sent[name] = text
+                                    flight.publish({"field": name, "text": text})
+                        output = await result.get_output()
+                    call.result = result
+            return _finish(output, selection, cache_key)
+
+        # Joiners replay the partials sent so far, then follow along
+        flight, started = analysis_flights.join(
+            (company_id, area_id, cache_key), compute
+        )
+        call.coalesced = not started
+        async for partial in flight.follow():
+            yield "partial", partial
+        output = await flight.result()
 
-    result = simple_agent.run_sync(prompt)
-    return result.output
+        yield "result", output.model_dump(mode="json")
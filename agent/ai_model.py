@@ -1,13 +1,119 @@
+import asyncio
+import json
 import os
+import re
 
 from dotenv import load_dotenv
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models import Model
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
 from pydantic_ai.models.mistral import MistralModel
 
 load_dotenv()
 api_key = os.getenv("MISTRAL_API_KEY")
-AI_MODEL = "ministral-14b-2512"
+MISTRAL_MODEL = "ministral-14b-2512"
+LOCAL_MODEL = "local-standin"
 
-model = MistralModel(AI_MODEL)
+# "mistral" calls the API; "local" is an offline stand-in for load tests
+AI_BACKEND = os.getenv("AI_BACKEND", "mistral")
+LOCAL_MODEL_LATENCY_SECONDS = float(os.getenv("LOCAL_MODEL_LATENCY_SECONDS", "0.5"))
+LOCAL_MODEL_TOKENS_PER_SECOND = float(os.getenv("LOCAL_MODEL_TOKENS_PER_SECOND", "50"))
+LOCAL_MODEL_OUTPUT_TOKENS = int(os.getenv("LOCAL_MODEL_OUTPUT_TOKENS", "150"))
+
+_SOURCE_ID = re.compile(r"\b(?:KPI|Report)-\d+\b")
+_NAMES = re.compile(r"Analyze this data for (.+) \((.+)\)\.")
+_EMPTY_VALUES = {"array": [], "object": {}, "integer": 0, "number": 0, "boolean": False}
+# Output tokens per streamed delta
+_STREAM_TOKENS_PER_DELTA = 10
+
+
+class LocalStandIn:
+    """Deterministic offline replacement for the Mistral model.
+
+    Answers with the agent's output tool, filling its required fields:
+    names from the prompt header, empty lists, and text that cites the
+    first KPI/report IDs of the prompt. Each call waits ``latency`` seconds
+    before the first token and then ``output_tokens / tokens_per_second``
+    seconds for the rest; streamed calls spread that wait over the deltas.
+    """
+
+    def __init__(
+        self,
+        latency: float = LOCAL_MODEL_LATENCY_SECONDS,
+        tokens_per_second: float = LOCAL_MODEL_TOKENS_PER_SECOND,
+        output_tokens: int = LOCAL_MODEL_OUTPUT_TOKENS,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+
+    def output_args(self, messages, info: AgentInfo) -> dict:
+        prompt = "\n".join(
+            part.content
+            for message in messages
+            for part in message.parts
+            if isinstance(getattr(part, "content", None), str)
+        )
+        names = _NAMES.search(prompt)
+        citations = " ".join(f"[{i}]" for i in _SOURCE_ID.findall(prompt)[:3])
+
+        schema = info.output_tools[0].parameters_json_schema
+        required = schema.get("required", [])
+        text_fields = [
+            name
+            for name in required
+            if schema["properties"][name].get("type") == "string"
+        ]
+        words = max(self.output_tokens // max(len(text_fields), 1), 1)
+        text = " ".join(["Befund"] * words + [citations]).strip()
+
+        args = {}
+        for name in required:
+            if name in ("insurance_company_name", "practice_area_name") and names:
+                args[name] = names.group(1 if name == "insurance_company_name" else 2)
+            elif name in text_fields:
+                args[name] = text
+            else:
+                kind = schema["properties"][name].get("type")
+                args[name] = _EMPTY_VALUES.get(kind)
+        return args
+
+    async def respond(self, messages, info: AgentInfo) -> ModelResponse:
+        args = self.output_args(messages, info)
+        await asyncio.sleep(self.latency + self.output_tokens / self.tokens_per_second)
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, args)],
+            model_name=LOCAL_MODEL,
+        )
+
+    async def stream(self, messages, info: AgentInfo):
+        args = json.dumps(self.output_args(messages, info))
+        await asyncio.sleep(self.latency)
+        yield {0: DeltaToolCall(name=info.output_tools[0].name, json_args="")}
+        deltas = max(self.output_tokens // _STREAM_TOKENS_PER_DELTA, 1)
+        size = -(-len(args) // deltas)
+        for start in range(0, len(args), size):
+            await asyncio.sleep(_STREAM_TOKENS_PER_DELTA / self.tokens_per_second)
+            yield {0: DeltaToolCall(json_args=args[start : start + size])}
+
+    def model(self) -> FunctionModel:
+        return FunctionModel(
+            self.respond, stream_function=self.stream, model_name=LOCAL_MODEL
+        )
+
+
+def build_model(backend: str = AI_BACKEND) -> Model:
+    if backend == "mistral":
+        return MistralModel(MISTRAL_MODEL)
+    if backend == "local":
+        return LocalStandIn().model()
+    raise ValueError(f"Unknown AI_BACKEND {backend!r}; expected 'mistral' or 'local'")
+
+
+# Part of the result cache key, so stand-in results never serve real requests
+AI_MODEL = MISTRAL_MODEL if AI_BACKEND == "mistral" else LOCAL_MODEL
+
+model = build_model()
 
 
 TEMPERATURE = 0
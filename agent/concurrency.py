@@ -0,0 +1,153 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from agent.timing import timed_stage
+
+
+class ModelBusyError(Exception):
+    """Raised when no model-call slot frees up within the queue timeout."""
+
+
+class ModelCallLimiter:
+    """Caps concurrent model calls across the process.
+
+    Callers wait up to ``queue_timeout`` seconds for a slot; with a timeout
+    of 0 they fail immediately when all slots are taken. The wait is timed
+    as the ``queue`` stage.
+    """
+
+    def __init__(self, limit: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.queue_timeout <= 0 and self._semaphore.locked():
+            self.rejected += 1
+            raise ModelBusyError("All model-call slots are busy")
+        self.waiting += 1
+        try:
+            with timed_stage("queue"):
+                await asyncio.wait_for(
+                    self._semaphore.acquire(), self.queue_timeout or None
+                )
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ModelBusyError(
+                f"No model-call slot within {self.queue_timeout:g}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_timeout_seconds": self.queue_timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+class Flight:
+    """One shared computation and the updates it has published so far."""
+
+    def __init__(self):
+        self.updates: List[Any] = []
+        self.task: asyncio.Task = None
+        self._changed = asyncio.Event()
+
+    def publish(self, update) -> None:
+        self.updates.append(update)
+        self._wake()
+
+    def _wake(self, *_) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        """Every update from the first, until the computation ends."""
+        seen = 0
+        while True:
+            while seen < len(self.updates):
+                yield self.updates[seen]
+                seen += 1
+            if self.task.done():
+                return
+            await self._changed.wait()
+
+    async def result(self):
+        # Shielded: a caller going away must not cancel the others' result
+        return await asyncio.shield(self.task)
+
+
+class SingleFlight:
+    """Coalesces concurrent computations with the same key.
+
+    The first caller starts the computation as its own task; callers that
+    arrive while it runs join it and receive the same result or exception.
+    The key is forgotten once the computation ends.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def join(
+        self, key: Hashable, compute: Callable[[Flight], Awaitable]
+    ) -> Tuple[Flight, bool]:
+        """The flight for ``key``, and whether this call started it."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            return flight, False
+        flight = Flight()
+        flight.task = asyncio.create_task(compute(flight))
+        flight.task.add_done_callback(flight._wake)
+        flight.task.add_done_callback(lambda task: self._land(key, task))
+        self._flights[key] = flight
+        self.started += 1
+        return flight, True
+
+    def _land(self, key: Hashable, task: asyncio.Task) -> None:
+        self._flights.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable]):
+        flight, _ = self.join(key, lambda _: compute())
+        return await flight.result()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+
+model_call_limiter = ModelCallLimiter(
+    limit=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30")),
+)
+
+analysis_flights = SingleFlight()
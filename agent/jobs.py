@@ -0,0 +1,229 @@
+"""Background 360 analyses and the nightly precompute of every pair.
+
+Jobs run on the event loop of the process that submitted them, at most
+``JOB_CONCURRENCY`` at a time, and their model calls still go through
+:data:`model_call_limiter`. Failed attempts are retried with exponential
+backoff. The precompute (run it from cron) analyses every company/area
+pair with KPIs; rerunning it with the same ``--batch-id`` resumes an
+interrupted run and skips the pairs that already succeeded:
+
+    python -m agent.jobs precompute [--batch-id 2026-10-17] [--concurrency 2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from agent.agent import run_360, run_360_hierarchical
+from database import AsyncSessionLocal
+from service_layer.analysis_jobs import (
+    AnalysisJobSchema,
+    create_job_async,
+    finish_job_async,
+    get_active_pairs_async,
+    get_batch_jobs_async,
+    get_unfinished_jobs_async,
+    mark_job_running_async,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "5"))
+
+ANALYSIS_MODES = {"ranked": run_360, "hierarchical": run_360_hierarchical}
+
+
+async def run_analysis(session, company_id: int, area_id: int, params: dict):
+    """Runs the analysis described by a job's ``params``."""
+    params = dict(params)
+    analysis = ANALYSIS_MODES[params.pop("mode", "ranked")]
+    return await analysis(
+        session=session, company_id=company_id, area_id=area_id, **params
+    )
+
+
+class JobRunner:
+    """Runs analysis jobs in the background with bounded concurrency."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        concurrency: int = JOB_CONCURRENCY,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_delay: float = JOB_RETRY_DELAY_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._finished: Dict[int, asyncio.Event] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        company_id: int,
+        area_id: int,
+        params: Optional[dict] = None,
+        batch_id: Optional[str] = None,
+    ) -> AnalysisJobSchema:
+        async with self.session_factory() as session:
+            job = await create_job_async(session, company_id, area_id, params, batch_id)
+        self.start(job.id)
+        return job
+
+    async def recover(self) -> List[int]:
+        """Picks up the jobs a previous process left queued or running.
+
+        Jobs only run in the process that submitted them, so after a
+        restart nothing else would finish them. Jobs that already used
+        every attempt fail; the others start again. Precompute batches
+        are left to a rerun of their batch. Returns the restarted ids.
+        """
+        async with self.session_factory() as session:
+            jobs = await get_unfinished_jobs_async(session)
+        restarted = []
+        for job in jobs:
+            if job.id in self._finished:
+                continue
+            if job.attempts >= self.max_attempts:
+                async with self.session_factory() as session:
+                    await finish_job_async(
+                        session, job.id, error="Interrupted by a restart"
+                    )
+                continue
+            self.start(job.id)
+            restarted.append(job.id)
+        if jobs:
+            logger.info(
+                "recovered %d unfinished analysis jobs, restarted %d",
+                len(jobs),
+                len(restarted),
+            )
+        return restarted
+
+    def start(self, job_id: int) -> None:
+        """Schedules an existing job on the running event loop."""
+        self._finished[job_id] = asyncio.Event()
+        task = asyncio.create_task(self._execute(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, job_id: int) -> None:
+        try:
+            async with self._semaphore:
+                await self._attempt_until_done(job_id)
+        finally:
+            self._finished.pop(job_id).set()
+
+    async def _attempt_until_done(self, job_id: int) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            async with self.session_factory() as session:
+                job = await mark_job_running_async(session, job_id)
+            try:
+                async with self.session_factory() as session:
+                    output = await run_analysis(
+                        session,
+                        job.insurance_company_id,
+                        job.practice_area_id,
+                        job.params,
+                    )
+            except Exception as exc:
+                logger.warning(
+                    "analysis job %s attempt %d/%d failed: %r",
+                    job_id,
+                    attempt,
+                    self.max_attempts,
+                    exc,
+                )
+                if attempt == self.max_attempts:
+                    async with self.session_factory() as session:
+                        await finish_job_async(session, job_id, error=repr(exc))
+                    return
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                continue
+
+            async with self.session_factory() as session:
+                if output is None:
+                    await finish_job_async(session, job_id, error="Data not found")
+                else:
+                    await finish_job_async(
+                        session, job_id, result=output.model_dump(mode="json")
+                    )
+            return
+
+    async def wait(self, job_id: int, timeout: float) -> None:
+        """Waits up to ``timeout`` seconds for a job started here to finish."""
+        finished = self._finished.get(job_id)
+        if finished is None:
+            return
+        try:
+            await asyncio.wait_for(finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def drain(self) -> None:
+        """Waits for every job started here."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+
+async def precompute_all(runner: JobRunner, batch_id: Optional[str] = None) -> dict:
+    """Analyses every company/area pair with KPIs as one batch.
+
+    Pairs that already succeeded in ``batch_id`` are skipped, so rerunning
+    an interrupted batch resumes it. Returns the job count per status.
+    """
+    batch_id = batch_id or datetime.now().strftime("%Y-%m-%d")
+    async with runner.session_factory() as session:
+        pairs = await get_active_pairs_async(session)
+        done = await get_batch_jobs_async(session, batch_id)
+
+    skipped = 0
+    for company_id, area_id in pairs:
+        job = done.get((company_id, area_id))
+        if job is not None and job.status == "succeeded":
+            skipped += 1
+            continue
+        if job is None:
+            await runner.submit(company_id, area_id, batch_id=batch_id)
+        else:
+            runner.start(job.id)
+    logger.info(
+        "precompute batch %s: %d pairs, %d already done", batch_id, len(pairs), skipped
+    )
+    await runner.drain()
+
+    async with runner.session_factory() as session:
+        jobs = await get_batch_jobs_async(session, batch_id)
+    summary = {"batch_id": batch_id, "pairs": len(pairs), "skipped": skipped}
+    for job in jobs.values():
+        summary[job.status] = summary.get(job.status, 0) + 1
+    return summary
+
+
+job_runner = JobRunner(AsyncSessionLocal)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    precompute = commands.add_parser("precompute")
+    precompute.add_argument("--batch-id", help="Resume or name a batch")
+    precompute.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    runner = JobRunner(AsyncSessionLocal, concurrency=args.concurrency)
+    print(asyncio.run(precompute_all(runner, args.batch_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+from pydantic_ai.messages import RetryPromptPart
+
+# Estimated spend in USD per million tokens; 0 until prices are configured
+LLM_INPUT_PRICE_PER_MTOK = float(os.getenv("LLM_INPUT_PRICE_PER_MTOK", "0"))
+LLM_OUTPUT_PRICE_PER_MTOK = float(os.getenv("LLM_OUTPUT_PRICE_PER_MTOK", "0"))
+
+
+def prompt_version(prompt: str) -> str:
+    """Short content hash of a system prompt, so every edit is a new version."""
+    return hashlib.sha256(prompt.encode()).hexdigest()[:12]
+
+
+class LLMCall(BaseModel):
+    """One analysis run: a cache hit, a model call, a share of another
+    caller's model call (``coalesced``) or a failure."""
+
+    company_id: int
+    area_id: int
+    operation: str
+    model_name: str
+    prompt_version: str
+    cache_hit: bool = False
+    coalesced: bool = False
+    input_tokens: int = 0
+    output_tokens: int = 0
+    requests: int = 0
+    retries: int = 0
+    wall_ms: float = 0.0
+    model_ms: float = 0.0
+    error: Optional[str] = None
+
+
+class CallTracker:
+    """Collects what :func:`tracked_call` records for one run."""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.result = None
+        # Overrides ``result.usage()`` when a run spans several agent runs
+        self.usage = None
+        self.cache_hit = False
+        self.coalesced = False
+        self.model_ms = 0.0
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def model_call(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.model_ms += (time.perf_counter() - start) * 1000
+
+    def to_call(self, error: Optional[str] = None) -> LLMCall:
+        call = LLMCall(
+            **self.fields,
+            cache_hit=self.cache_hit,
+            coalesced=self.coalesced,
+            wall_ms=(time.perf_counter() - self._start) * 1000,
+            model_ms=self.model_ms,
+            error=error,
+        )
+        if self.result is not None:
+            usage = self.usage or self.result.usage()
+            call.input_tokens = usage.input_tokens
+            call.output_tokens = usage.output_tokens
+            call.requests = usage.requests
+            # Each retry prompt is an output that failed validation
+            call.retries = sum(
+                isinstance(part, RetryPromptPart)
+                for message in self.result.all_messages()
+                for part in message.parts
+            )
+        return call
+
+
+class LLMCallLog:
+    """Per-call LLM metrics in a local SQLite table, pruned by age.
+
+    The database file is created on first use.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age_seconds: float = 30 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_calls ("
+                "created_at REAL NOT NULL, company_id INTEGER NOT NULL, "
+                "area_id INTEGER NOT NULL, operation TEXT NOT NULL, "
+                "model_name TEXT NOT NULL, prompt_version TEXT NOT NULL, "
+                "cache_hit INTEGER NOT NULL, coalesced INTEGER NOT NULL, "
+                "input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL, "
+                "requests INTEGER NOT NULL, retries INTEGER NOT NULL, "
+                "wall_ms REAL NOT NULL, model_ms REAL NOT NULL, error TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_calls_created_at "
+                "ON llm_calls (created_at)"
+            )
+        return self._conn
+
+    def record(self, call: LLMCall) -> None:
+        with self._lock:
+            conn = self._connection()
+            now = self._clock()
+            conn.execute(
+                "INSERT INTO llm_calls VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    now,
+                    call.company_id,
+                    call.area_id,
+                    call.operation,
+                    call.model_name,
+                    call.prompt_version,
+                    call.cache_hit,
+                    call.coalesced,
+                    call.input_tokens,
+                    call.output_tokens,
+                    call.requests,
+                    call.retries,
+                    call.wall_ms,
+                    call.model_ms,
+                    call.error,
+                ),
+            )
+            conn.execute(
+                "DELETE FROM llm_calls WHERE created_at <= ?",
+                (now - self.max_age_seconds,),
+            )
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_calls")
+            conn.commit()
+
+    def summary(self, since_seconds: Optional[float] = None, limit: int = 50) -> dict:
+        """Totals, per model/prompt version, and the ``limit`` company/area
+        pairs with the most model time."""
+        since = self._clock() - since_seconds if since_seconds else 0
+        aggregates = (
+            "COUNT(*) AS calls, SUM(cache_hit) AS cache_hits, "
+            "SUM(coalesced) AS coalesced, COUNT(error) AS errors, "
+            "SUM(input_tokens) AS input_tokens, "
+            "SUM(output_tokens) AS output_tokens, SUM(retries) AS retries, "
+            "AVG(wall_ms) AS avg_wall_ms, MAX(wall_ms) AS max_wall_ms, "
+            "SUM(model_ms) AS total_model_ms"
+        )
+        with self._lock:
+            conn = self._connection()
+            conn.row_factory = sqlite3.Row
+            totals = conn.execute(
+                f"SELECT {aggregates} FROM llm_calls WHERE created_at > ?", (since,)
+            ).fetchone()
+            by_model = conn.execute(
+                f"SELECT model_name, prompt_version, {aggregates} FROM llm_calls "
+                "WHERE created_at > ? GROUP BY model_name, prompt_version "
+                "ORDER BY calls DESC",
+                (since,),
+            ).fetchall()
+            by_pair = conn.execute(
+                f"SELECT company_id, area_id, {aggregates} FROM llm_calls "
+                "WHERE created_at > ? GROUP BY company_id, area_id "
+                "ORDER BY total_model_ms DESC LIMIT ?",
+                (since, limit),
+            ).fetchall()
+            conn.row_factory = None
+        return {
+            "prices_per_mtok": {
+                "input": LLM_INPUT_PRICE_PER_MTOK,
+                "output": LLM_OUTPUT_PRICE_PER_MTOK,
+            },
+            "totals": _with_cost(totals),
+            "by_model": [_with_cost(row) for row in by_model],
+            "by_pair": [_with_cost(row) for row in by_pair],
+        }
+
+
+def _with_cost(row: sqlite3.Row) -> dict:
+    stats = {key: row[key] or 0 for key in row.keys()}
+    stats["estimated_cost_usd"] = (
+        stats["input_tokens"] * LLM_INPUT_PRICE_PER_MTOK
+        + stats["output_tokens"] * LLM_OUTPUT_PRICE_PER_MTOK
+    ) / 1_000_000
+    return stats
+
+
+@contextmanager
+def tracked_call(log: LLMCallLog, **fields):
+    """Records the block as one :class:`LLMCall` in ``log``, including
+    failures. The block sets ``result``, ``cache_hit`` or ``coalesced`` on
+    the tracker and times the model call with ``tracker.model_call()``."""
+    tracker = CallTracker(**fields)
+    try:
+        yield tracker
+    except Exception as exc:
+        log.record(tracker.to_call(error=repr(exc)))
+        raise
+    log.record(tracker.to_call())
+
+
+llm_call_log = LLMCallLog(
+    path=os.getenv("LLM_METRICS_PATH", os.path.join(".cache", "llm_calls.db")),
+    max_age_seconds=float(
+        os.getenv("LLM_METRICS_MAX_AGE_SECONDS", str(30 * 24 * 3600))
+    ),
+)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import re
+from typing import List, Optional, Sequence, Set
+
+from pydantic import BaseModel, Field
+from pydantic_ai import Agent, ModelSettings
+from pydantic_ai.usage import RunUsage
+
+from agent.ai_model import TEMPERATURE, model
+from agent.concurrency import ModelCallLimiter
+from agent.prompt import CHUNK_PROMPT_V1
+from agent.prompt_context import PROMPT_TOKEN_BUDGET, estimate_tokens, report_table
+from service_layer.reports_query import ReportSchema
+
+MAP_REDUCE_CHUNK_SIZE = int(os.getenv("MAP_REDUCE_CHUNK_SIZE", "40"))
+MAP_REDUCE_PARALLELISM = int(os.getenv("MAP_REDUCE_PARALLELISM", "4"))
+
+REPORT_CITATION = re.compile(r"\[Report-(\d+)\]")
+
+
+class ChunkSummary(BaseModel):
+    summary: str = Field(description="Dichte Zusammenfassung mit [Report-ID] Zitaten.")
+
+
+class ReportDigest(BaseModel):
+    """A summary and the reports it covers."""
+
+    text: str
+    report_ids: List[int]
+
+
+chunk_agent = Agent(
+    model,
+    output_type=ChunkSummary,
+    system_prompt=CHUNK_PROMPT_V1,
+    model_settings=ModelSettings(temperature=TEMPERATURE),
+)
+
+
+def chunked(items: Sequence, size: int) -> List[Sequence]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def keep_known_citations(text: str, report_ids: Set[int]) -> str:
+    """Drops [Report-ID] citations to reports outside the summarized input."""
+    return REPORT_CITATION.sub(
+        lambda m: m.group(0) if int(m.group(1)) in report_ids else "", text
+    )
+
+
+def digests_text(digests: List[ReportDigest]) -> str:
+    return "\n".join(
+        f"Part {number}: {digest.text}" for number, digest in enumerate(digests, 1)
+    )
+
+
+async def _summarize(
+    text: str,
+    report_ids: List[int],
+    semaphore: asyncio.Semaphore,
+    limiter: ModelCallLimiter,
+    usage: Optional[RunUsage],
+) -> ReportDigest:
+    async with semaphore, limiter.slot():
+        # Each call gets its own usage: a shared one would hold the whole
+        # fan-out to a single run's request limit
+        result = await chunk_agent.run(text)
+    if usage is not None:
+        usage.incr(result.usage())
+    return ReportDigest(
+        text=keep_known_citations(result.output.summary, set(report_ids)),
+        report_ids=report_ids,
+    )
+
+
+async def summarize_reports(
+    reports: List[ReportSchema],
+    limiter: ModelCallLimiter,
+    chunk_size: int = MAP_REDUCE_CHUNK_SIZE,
+    parallelism: int = MAP_REDUCE_PARALLELISM,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    usage: Optional[RunUsage] = None,
+) -> List[ReportDigest]:
+    """Map-reduce over the reports with at most ``parallelism`` chunk calls
+    in flight.
+
+    Chunks of ``chunk_size`` reports are summarized concurrently. While the
+    summaries together exceed ``token_budget``, groups of them are
+    summarized again, so the final input stays bounded however many
+    reports there are. Citations are checked against each chunk's reports.
+    Token usage of all chunk calls is added to ``usage`` when given.
+    """
+    semaphore = asyncio.Semaphore(parallelism)
+    digests = await asyncio.gather(
+        *(
+            _summarize(
+                report_table("Visit reports", chunk),
+                [report.id for report in chunk],
+                semaphore,
+                limiter,
+                usage,
+            )
+            for chunk in chunked(reports, chunk_size)
+        )
+    )
+    while len(digests) > 1 and estimate_tokens(digests_text(digests)) > token_budget:
+        digests = await asyncio.gather(
+            *(
+                _summarize(
+                    "Partial summaries:\n" + digests_text(group),
+                    [i for digest in group for i in digest.report_ids],
+                    semaphore,
+                    limiter,
+                    usage,
+                )
+                for group in chunked(digests, max(chunk_size, 2))
+            )
+        )
+    return list(digests)
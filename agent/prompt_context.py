@@ -0,0 +1,156 @@
+import logging
+import math
+import os
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from service_layer.kpi_query import KPISchema
+from service_layer.reports_query import ReportSchema
+
+logger = logging.getLogger(__name__)
+
+# No tokenizer dependency: ~3.5 characters per token is a slightly
+# conservative estimate for German text with Mistral's tokenizer
+CHARS_PER_TOKEN = 3.5
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "16000"))
+
+SEPARATOR = "\t"
+KPI_COLUMNS = ("id", "incoming_fees", "fees_collected", "new_mandates")
+REPORT_COLUMNS = ("id", "date", "department", "personnel", "content")
+
+
+class PromptBudgetExceeded(ValueError):
+    """Raised when the KPIs alone do not fit the token budget."""
+
+
+class PromptContext(BaseModel):
+    """The serialized model input and what went into it."""
+
+    text: str
+    estimated_tokens: int
+    token_budget: int
+    kpi_count: int
+    report_count: int
+    omitted_reports: int
+    report_ids: List[int]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _cell(value) -> str:
+    # Rows are single lines of separated cells
+    text = " / ".join(line.strip() for line in str(value).splitlines())
+    return text.replace(SEPARATOR, " ")
+
+
+def _table(title: str, columns, rows) -> List[str]:
+    heading = SEPARATOR.join(columns)
+    return [f"{title} [{heading}]:", *(SEPARATOR.join(row) for row in rows)]
+
+
+def kpi_row(kpi: KPISchema) -> List[str]:
+    return [
+        f"KPI-{kpi.id}",
+        str(kpi.incoming_fees),
+        str(kpi.fees_collected),
+        str(kpi.new_mandates),
+    ]
+
+
+def report_row(report: ReportSchema) -> List[str]:
+    return [
+        f"Report-{report.id}",
+        report.report_date.date().isoformat(),
+        _cell(report.department_visited),
+        _cell(report.visited_key_personnel),
+        _cell(report.report_content),
+    ]
+
+
+def render_header(
+    company_id: int, area_id: int, kpis: List[KPISchema], reports: Optional[dict]
+) -> str:
+    """Context IDs, the company and area names, and the KPI table."""
+    names = reports or (kpis[0].model_dump() if kpis else {})
+    return "\n".join(
+        [
+            f"Context IDs: company_id={company_id}, area_id={area_id}",
+            f"Analyze this data for {names.get('insurance_company_name', 'Unknown')} "
+            f"({names.get('practice_area_name', 'Unknown')}).",
+            "",
+            *_table("KPIs", KPI_COLUMNS, (kpi_row(kpi) for kpi in kpis)),
+            "",
+        ]
+    )
+
+
+def report_table(title: str, reports: List[ReportSchema]) -> str:
+    return "\n".join(_table(title, REPORT_COLUMNS, (report_row(r) for r in reports)))
+
+
+def build_prompt_context(
+    company_id: int,
+    area_id: int,
+    kpis: List[KPISchema],
+    reports: Optional[dict],
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+) -> PromptContext:
+    """Serializes KPIs and reports as compact tables for the model.
+
+    Company and area names appear once in the header instead of on every
+    row, and each row carries the ``KPI-<id>``/``Report-<id>`` citation ID.
+    Reports are taken in the given order (most important first) until the
+    token budget is used up, then listed newest first; the number left out
+    is stated in the prompt.
+    """
+    report_list = reports["reports"] if reports else []
+    text = render_header(company_id, area_id, kpis, reports)
+    if estimate_tokens(text) > token_budget:
+        raise PromptBudgetExceeded(
+            f"KPIs need ~{estimate_tokens(text)} tokens, budget is {token_budget}"
+        )
+
+    heading = _table("Reports, newest first", REPORT_COLUMNS, [])[0]
+    used = len(text) + len(heading) + 1
+    # Leave room for the omission note
+    limit = token_budget * CHARS_PER_TOKEN - 80
+    selected = []
+    for report in report_list:
+        line = SEPARATOR.join(report_row(report))
+        if used + len(line) + 1 > limit:
+            break
+        selected.append((report, line))
+        used += len(line) + 1
+    selected.sort(key=lambda item: (item[0].report_date, item[0].id), reverse=True)
+
+    lines = [heading, *(line for _, line in selected)]
+    omitted = len(report_list) - len(selected)
+    if omitted:
+        lines.append(f"({omitted} further reports omitted to fit the token budget)")
+    text += "\n" + "\n".join(lines)
+
+    context = PromptContext(
+        text=text,
+        estimated_tokens=estimate_tokens(text),
+        token_budget=token_budget,
+        kpi_count=len(kpis),
+        report_count=len(selected),
+        omitted_reports=omitted,
+        report_ids=[report.id for report, _ in selected],
+    )
+    logger.info(
+        "prompt context company_id=%s area_id=%s kpis=%d reports=%d omitted=%d "
+        "chars=%d tokens~%d budget=%d",
+        company_id,
+        area_id,
+        context.kpi_count,
+        context.report_count,
+        context.omitted_reports,
+        len(text),
+        context.estimated_tokens,
+        token_budget,
+    )
+    return context
@@ -0,0 +1,112 @@
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from service_layer.reports_query import ReportSchema
+
+RECENCY_HALF_LIFE_DAYS = 90
+PRIORITY_MARKER = "Prio: Hoch"
+RANKING_WEIGHTS = {"recency": 0.4, "priority": 0.3, "relevance": 0.3}
+
+_TOKEN_PATTERN = re.compile(r"\w{3,}")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_counts = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (
+            sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        )
+        document_frequency: Counter = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self._idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        scores = []
+        for counts, length in zip(self._term_counts, self._lengths):
+            norm = self.k1 * (
+                1 - self.b + self.b * length / (self._average_length or 1)
+            )
+            scores.append(
+                sum(
+                    self._idf[term]
+                    * counts[term]
+                    * (self.k1 + 1)
+                    / (counts[term] + norm)
+                    for term in terms
+                    if term in counts
+                )
+            )
+        return scores
+
+
+class RankedReport(BaseModel):
+    """A report's ranking score and the components behind it."""
+
+    report_id: int
+    score: float
+    recency: float
+    priority: float
+    relevance: float
+
+
+class ReportSelection(BaseModel):
+    """Which reports were sent to the model, and why."""
+
+    query: str
+    weights: Dict[str, float]
+    considered: int
+    selected: List[RankedReport]
+    omitted: int
+
+
+def rank_reports(
+    reports: List[ReportSchema],
+    query: str,
+    now: Optional[datetime] = None,
+    weights: Dict[str, float] = RANKING_WEIGHTS,
+) -> List[RankedReport]:
+    """Scores reports by recency, ``Prio: Hoch`` and BM25 relevance to
+    ``query``, best first. Each component is scaled to 0..1."""
+    if not reports:
+        return []
+    now = now or datetime.now()
+    relevance = BM25Index([r.report_content for r in reports]).scores(query)
+    best_relevance = max(relevance) or 1.0
+
+    ranked = []
+    for report, lexical in zip(reports, relevance):
+        age_days = max((now - report.report_date).total_seconds(), 0) / 86400
+        components = {
+            "recency": 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS),
+            "priority": 1.0 if PRIORITY_MARKER in report.report_content else 0.0,
+            "relevance": lexical / best_relevance,
+        }
+        ranked.append(
+            RankedReport(
+                report_id=report.id,
+                score=sum(weights[name] * value for name, value in components.items()),
+                **components,
+            )
+        )
+    ranked.sort(key=lambda r: r.score, reverse=True)
+    return ranked
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from pydantic_core import to_jsonable_python
+
+
+def data_fingerprint(*payloads) -> str:
+    """Stable hash of the rows fed to the model."""
+    canonical = json.dumps(
+        to_jsonable_python(payloads), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def result_cache_key(
+    prompt: str, model_name: str, temperature: float, fingerprint: str
+) -> str:
+    """Content address of one analysis. ``prompt`` is the system prompt text,
+    so editing it invalidates old results just like a data change does."""
+    parts = json.dumps([prompt, model_name, temperature, fingerprint])
+    return hashlib.sha256(parts.encode()).hexdigest()
+
+
+class AgentResultCache:
+    """Persistent SQLite cache for agent results, evicting by age and count.
+
+    The database file is created on first use.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1000,
+        max_age_seconds: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS agent_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            now = self._clock()
+            row = conn.execute(
+                "SELECT value FROM agent_results WHERE key = ? AND created_at > ?",
+                (key, now - self.max_age_seconds),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE agent_results SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            now = self._clock()
+            conn.execute(
+                "INSERT OR REPLACE INTO agent_results VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "DELETE FROM agent_results WHERE created_at <= ?",
+            (now - self.max_age_seconds,),
+        ).rowcount
+        # Least recently used beyond the size limit
+        overflow = conn.execute(
+            "DELETE FROM agent_results WHERE key IN ("
+            "SELECT key FROM agent_results ORDER BY last_used_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += expired + overflow
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM agent_results")
+            conn.commit()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = (
+                self._connection()
+                .execute("SELECT COUNT(*) FROM agent_results")
+                .fetchone()[0]
+            )
+            return {
+                "path": self.path,
+                "max_entries": self.max_entries,
+                "max_age_seconds": self.max_age_seconds,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+agent_result_cache = AgentResultCache(
+    path=os.getenv("AGENT_CACHE_PATH", os.path.join(".cache", "agent_results.db")),
+    max_entries=int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "1000")),
+    max_age_seconds=float(os.getenv("AGENT_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600))),
+)
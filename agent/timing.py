@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "stage_timings", default=None
+)
+
+
+def start_stage_timings() -> Dict[str, float]:
+    """Collects :func:`timed_stage` durations of the current request (task)."""
+    timings: Dict[str, float] = {}
+    _stage_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Adds the block's wall time in ms to stage ``name``, if collecting."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _stage_timings.get()
+        if timings is not None:
+            elapsed = (time.perf_counter() - start) * 1000
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Formats stage durations as a ``Server-Timing`` header value."""
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
@@ -0,0 +1,64 @@
+"""Add KPI rollup tables
+
+Revision ID: 5e8d2b71c4a9
+Revises: a3c9e1f47b20
+Create Date: 2026-10-17 11:02:17.640311
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8d2b71c4a9"
+down_revision: Union[str, Sequence[str], None] = "a3c9e1f47b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "kpi_area_rollups",
+        sa.Column("practice_area_id", sa.Integer(), nullable=False),
+        sa.Column("incoming_fees", sa.BigInteger(), nullable=False),
+        sa.Column("fees_collected", sa.BigInteger(), nullable=False),
+        sa.Column("kpi_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["practice_area_id"],
+            ["practice_areas.id"],
+        ),
+        sa.PrimaryKeyConstraint("practice_area_id"),
+    )
+    op.create_table(
+        "kpi_company_rollups",
+        sa.Column("insurance_company_id", sa.Integer(), nullable=False),
+        sa.Column("new_mandates", sa.BigInteger(), nullable=False),
+        sa.Column("kpi_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["insurance_company_id"],
+            ["insurance_companies.id"],
+        ),
+        sa.PrimaryKeyConstraint("insurance_company_id"),
+    )
+    # Backfill from the existing KPIs
+    op.execute(
+        "INSERT INTO kpi_area_rollups "
+        "(practice_area_id, incoming_fees, fees_collected, kpi_count) "
+        "SELECT practice_area_id, SUM(incoming_fees), SUM(fees_collected), COUNT(id) "
+        "FROM kpis GROUP BY practice_area_id"
+    )
+    op.execute(
+        "INSERT INTO kpi_company_rollups "
+        "(insurance_company_id, new_mandates, kpi_count) "
+        "SELECT insurance_company_id, SUM(new_mandates), COUNT(id) "
+        "FROM kpis GROUP BY insurance_company_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("kpi_company_rollups")
+    op.drop_table("kpi_area_rollups")
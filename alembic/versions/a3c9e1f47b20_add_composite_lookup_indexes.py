@@ -0,0 +1,38 @@
+"""Add composite lookup indexes
+
+Revision ID: a3c9e1f47b20
+Revises: 79391ba35ef6
+Create Date: 2026-10-17 09:12:41.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c9e1f47b20"
+down_revision: Union[str, Sequence[str], None] = "79391ba35ef6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_kpis_company_area",
+        "kpis",
+        ["insurance_company_id", "practice_area_id"],
+    )
+    op.create_index(
+        "ix_reports_company_area_date",
+        "reports",
+        ["insurance_company_id", "practice_area_id", sa.text("report_date DESC")],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reports_company_area_date", table_name="reports")
+    op.drop_index("ix_kpis_company_area", table_name="kpis")
@@ -0,0 +1,67 @@
+"""Add analysis jobs table
+
+Revision ID: c41f7a9d2e63
+Revises: 5e8d2b71c4a9
+Create Date: 2026-10-17 14:21:05.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f7a9d2e63"
+down_revision: Union[str, Sequence[str], None] = "5e8d2b71c4a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("insurance_company_id", sa.Integer(), nullable=False),
+        sa.Column("practice_area_id", sa.Integer(), nullable=False),
+        sa.Column("batch_id", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["insurance_company_id"],
+            ["insurance_companies.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["practice_area_id"],
+            ["practice_areas.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analysis_jobs_company_area_status",
+        "analysis_jobs",
+        [
+            "insurance_company_id",
+            "practice_area_id",
+            "status",
+            sa.text("finished_at DESC"),
+        ],
+        unique=False,
+    )
+    op.create_index(
+        "ix_analysis_jobs_batch", "analysis_jobs", ["batch_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_analysis_jobs_batch", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_company_area_status", table_name="analysis_jobs")
+    op.drop_table("analysis_jobs")
@@ -1,29 +1,129 @@
+import json
+import logging
 import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated, List, Literal, Optional
 
 import fastapi
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, Request, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.responses import (
+    HTMLResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.security import HTTPBearer
 from fastapi.templating import Jinja2Templates
-from requests import Session
-
-from agent.agent import run_simple_360
-from dependencies import get_current_user, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent.agent import run_360, run_360_hierarchical, stream_360
+from agent.concurrency import ModelBusyError, analysis_flights, model_call_limiter
+from agent.jobs import job_runner
+from agent.llm_metrics import llm_call_log
+from agent.prompt_context import PromptBudgetExceeded
+from agent.timing import server_timing, start_stage_timings, timed_stage
+from agent.result_cache import agent_result_cache
+from assets import (
+    DIST_DIR,
+    DIST_URL,
+    ImmutableStaticFiles,
+    asset_url,
+    page_version,
+)
+from database import POOL_PROFILE, pool_stats
+from dependencies import (
+    get_async_db,
+    get_async_session_factory,
+    get_current_user,
+    get_user_profile,
+)
+from responses import ECHOED_DATA_FIELDS, PydanticJSONResponse
+from service_layer.analysis_jobs import get_job_async, get_latest_result_async
+from service_layer.bootstrap import get_bootstrap_payload_async
+from service_layer.data_version import DataVersionSchema, get_data_version_async
 from service_layer.dropdown_queries import (
-    get_insurance_companies_for_dropdowns,
-    get_practice_areas_for_dropdowns,
+    get_insurance_companies_for_dropdowns_cached_async,
+    get_practice_areas_for_dropdowns_cached_async,
+    reference_data_cache,
+)
+from service_layer.kpi_query import get_analytics_payload_async
+from service_layer.reports_query import (
+    get_report_by_id_async,
+    get_report_page_async,
+    get_reports_by_ids_async,
 )
-from service_layer.kpi_query import get_analytics_payload
-from service_layer.reports_query import get_report_by_id
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
 
-app = fastapi.FastAPI()
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """Restarts the analysis jobs the previous process left unfinished."""
+    try:
+        await job_runner.recover()
+    except Exception:
+        # A broken jobs table must not keep the rest of the app down
+        logger.exception("could not recover unfinished analysis jobs")
+    yield
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
+
+app.mount(
+    DIST_URL,
+    ImmutableStaticFiles(directory=DIST_DIR, check_dir=False),
+    name="assets",
+)
 
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
 security = HTTPBearer()
 
+OmitData = Annotated[
+    bool, Query(description="Leave out the echoed kpi_data and visit_reports")
+]
+
+
+def _cache_validators(tag: str, version: DataVersionSchema, html: bool = False) -> dict:
+    """ETag/Last-Modified for data at ``version``; browsers revalidate
+    every time and get a 304 until the data changes.
+
+    HTML pages also depend on the templates and the hashed assets they
+    link, so their ETag includes :func:`page_version` and they carry no
+    Last-Modified, which a deploy would not move.
+    """
+    # The timestamp keeps tags unique if the counters are ever reset
+    stamp = int(version.updated_at.timestamp()) if version.updated_at else 0
+    etag = f"{tag}-v{version.version}-{stamp}"
+    if html:
+        etag += f"-{page_version()}"
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if version.updated_at is not None and not html:
+        headers["Last-Modified"] = format_datetime(
+            version.updated_at.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def _not_modified(request: Request, headers: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(
+                headers["Last-Modified"]
+            )
+        except (TypeError, ValueError):
+            return False
+    return False
+
 
 @app.exception_handler(status.HTTP_401_UNAUTHORIZED)
 async def unauthorized_redirect_handler(request: Request, exc: HTTPException):
@@ -47,14 +147,16 @@ def welcome_page(request: Request):
     )
 
 
-@app.get("/dashboard", dependencies=[Depends(get_current_user)])
-def dashboard(
+@app.get("/dashboard")
+async def dashboard(
     request: Request,
     user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    insurance_companies = get_insurance_companies_for_dropdowns(db_session=db)
-    practice_areas = get_practice_areas_for_dropdowns(db_session=db)
+    insurance_companies = await get_insurance_companies_for_dropdowns_cached_async(
+        db_session=db
+    )
+    practice_areas = await get_practice_areas_for_dropdowns_cached_async(db_session=db)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -73,16 +175,22 @@ def dashboard(
     tags=["Reports"],
     dependencies=[Depends(get_current_user)],
 )
-def get_specific_report(
-    request: Request, report_id: int, db: Session = Depends(get_db)
+async def get_specific_report(
+    request: Request, report_id: int, db: AsyncSession = Depends(get_async_db)
 ):
-    report = get_report_by_id(session=db, report_id=report_id)
+    headers = _cache_validators(
+        f"report-{report_id}", await get_data_version_async(db, "reports"), html=True
+    )
+    if _not_modified(request, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    report = await get_report_by_id_async(session=db, report_id=report_id)
 
     if not report:
         raise fastapi.HTTPException(status_code=404, detail="Report not found")
 
     return templates.TemplateResponse(
-        "report.html", {"request": request, "report": report}
+        "report.html", {"request": request, "report": report}, headers=headers
     )
 
 
@@ -92,13 +200,228 @@ def get_specific_report(
     tags=["Prompt"],
     dependencies=[Depends(get_current_user)],
 )
-def prompt(company_id: int, area_id: int, db: Session = Depends(get_db)):
-    result = run_simple_360(session=db, company_id=company_id, area_id=area_id)
+async def prompt(
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = Query(None, ge=1),
+    months: Optional[int] = Query(None, ge=1),
+    refresh: bool = False,
+    focus: Optional[str] = Query(None, max_length=200),
+    mode: Literal["ranked", "hierarchical"] = "ranked",
+    omit_data: OmitData = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    timings = start_stage_timings()
+    try:
+        if mode == "hierarchical":
+            result = await run_360_hierarchical(
+                session=db,
+                company_id=company_id,
+                area_id=area_id,
+                max_reports=max_reports,
+                months=months,
+                bypass_cache=refresh,
+            )
+        else:
+            result = await run_360(
+                session=db,
+                company_id=company_id,
+                area_id=area_id,
+                max_reports=max_reports,
+                months=months,
+                bypass_cache=refresh,
+                focus=focus,
+            )
+    except ModelBusyError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "5"},
+        )
+    except PromptBudgetExceeded as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        )
 
     if not result:
         raise fastapi.HTTPException(status_code=404, detail="Data not found")
 
-    return result
+    with timed_stage("serialize"):
+        body = result.model_dump_json(exclude=ECHOED_DATA_FIELDS if omit_data else None)
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"Server-Timing": server_timing(timings)},
+    )
+
+
+def _result_exclude(omit_data: bool) -> Optional[dict]:
+    """Exclude spec for a job's stored result."""
+    return {"result": ECHOED_DATA_FIELDS} if omit_data else None
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get(
+    "/prompt/{company_id}/{area_id}/stream",
+    summary="Stream the company and area analysis as server-sent events",
+    tags=["Prompt"],
+    dependencies=[Depends(get_current_user)],
+)
+async def prompt_stream(
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = Query(None, ge=1),
+    months: Optional[int] = Query(None, ge=1),
+    refresh: bool = False,
+    focus: Optional[str] = Query(None, max_length=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def events():
+        try:
+            async for event, data in stream_360(
+                session=db,
+                company_id=company_id,
+                area_id=area_id,
+                max_reports=max_reports,
+                months=months,
+                bypass_cache=refresh,
+                focus=focus,
+            ):
+                yield _sse(event, data)
+        except ModelBusyError as exc:
+            # Headers are already sent, so report it in-band
+            yield _sse("error", {"status": 503, "detail": str(exc)})
+        except PromptBudgetExceeded as exc:
+            yield _sse("error", {"status": 413, "detail": str(exc)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post(
+    "/api/jobs/{company_id}/{area_id}",
+    summary="Queue a company and area analysis in the background",
+    tags=["Prompt"],
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(get_current_user)],
+)
+async def submit_analysis_job(
+    company_id: int,
+    area_id: int,
+    max_reports: Optional[int] = Query(None, ge=1),
+    months: Optional[int] = Query(None, ge=1),
+    refresh: bool = False,
+    focus: Optional[str] = Query(None, max_length=200),
+    mode: Literal["ranked", "hierarchical"] = "ranked",
+):
+    params = {
+        "mode": mode,
+        "max_reports": max_reports,
+        "months": months,
+        "bypass_cache": refresh,
+    }
+    if mode == "ranked":
+        params["focus"] = focus
+    job = await job_runner.submit(company_id, area_id, params)
+    return PydanticJSONResponse(job, status_code=status.HTTP_202_ACCEPTED)
+
+
+@app.get(
+    "/api/jobs/{job_id}",
+    summary="Poll an analysis job, optionally waiting for it to finish",
+    tags=["Prompt"],
+    dependencies=[Depends(get_current_user)],
+)
+async def get_analysis_job(
+    job_id: int,
+    wait: float = Query(0, ge=0, le=30),
+    omit_data: OmitData = False,
+):
+    if wait:
+        await job_runner.wait(job_id, wait)
+    # No pooled connection is held while waiting
+    async with job_runner.session_factory() as session:
+        job = await get_job_async(session, job_id)
+    if not job:
+        raise fastapi.HTTPException(status_code=404, detail="Job not found")
+    return PydanticJSONResponse(job, exclude=_result_exclude(omit_data))
+
+
+@app.get(
+    "/api/analyses/{company_id}/{area_id}/latest",
+    summary="Latest precomputed or on-demand analysis of a company and area",
+    tags=["Prompt"],
+    dependencies=[Depends(get_current_user)],
+)
+async def latest_analysis(
+    company_id: int,
+    area_id: int,
+    omit_data: OmitData = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    job = await get_latest_result_async(db, company_id, area_id)
+    if not job:
+        raise fastapi.HTTPException(status_code=404, detail="No analysis yet")
+    return PydanticJSONResponse(job, exclude=_result_exclude(omit_data))
+
+
+MAX_BATCH_REPORT_IDS = 200
+
+
+@app.get(
+    "/api/reports",
+    summary="Fetch many reports by id in one request",
+    tags=["Reports"],
+    dependencies=[Depends(get_current_user)],
+)
+async def get_reports_batch(
+    ids: List[int] = Query(..., max_length=MAX_BATCH_REPORT_IDS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    reports = await get_reports_by_ids_async(db, ids)
+    found = {report.id for report in reports}
+    return PydanticJSONResponse(
+        {
+            "reports": reports,
+            "missing": [i for i in dict.fromkeys(ids) if i not in found],
+        }
+    )
+
+
+@app.get(
+    "/api/reports/{company_id}/{area_id}",
+    summary="Browse the visit reports of a company and area, newest first",
+    tags=["Reports"],
+    dependencies=[Depends(get_current_user)],
+)
+async def list_reports(
+    company_id: int,
+    area_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        page = await get_report_page_async(
+            db,
+            company_id,
+            area_id,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+        )
+    except ValueError as exc:
+        raise fastapi.HTTPException(status_code=400, detail=str(exc))
+    return PydanticJSONResponse(page)
 
 
 @app.get("/analytics")
@@ -113,12 +436,74 @@ def analytics_page(request: Request, user=Depends(get_current_user)):
 
 
 @app.get("/api/analytics")
-def analytics_api(db: Session = Depends(get_db)):
-    return get_analytics_payload(db)
+async def analytics_api(request: Request, db: AsyncSession = Depends(get_async_db)):
+    headers = _cache_validators("analytics", await get_data_version_async(db, "kpis"))
+    if _not_modified(request, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return PydanticJSONResponse(await get_analytics_payload_async(db), headers=headers)
+
+
+@app.get(
+    "/api/bootstrap",
+    summary="Dropdowns, analytics and recent analyses in one request",
+    dependencies=[Depends(get_current_user)],
+)
+async def bootstrap(
+    recent: int = Query(5, ge=0, le=20),
+    omit_data: OmitData = False,
+    session_factory=Depends(get_async_session_factory),
+):
+    payload = await get_bootstrap_payload_async(session_factory, recent_limit=recent)
+    exclude = _result_exclude(omit_data)
+    return PydanticJSONResponse(
+        payload, exclude={"recent_analyses": {"__all__": exclude}} if exclude else None
+    )
+
+
+@app.get(
+    "/internal/cache-stats",
+    tags=["Internal"],
+    dependencies=[Depends(get_current_user)],
+)
+def cache_stats():
+    return {
+        "reference_data": reference_data_cache.stats(),
+        "agent_results": agent_result_cache.stats(),
+    }
+
+
+@app.get(
+    "/internal/pool-stats",
+    tags=["Internal"],
+    dependencies=[Depends(get_current_user)],
+)
+def pool_stats_endpoint():
+    return {
+        "profile": POOL_PROFILE,
+        **{name: stats.snapshot() for name, stats in pool_stats.items()},
+    }
+
+
+@app.get(
+    "/internal/llm-stats",
+    tags=["Internal"],
+    dependencies=[Depends(get_current_user)],
+)
+def llm_stats(
+    hours: Optional[float] = Query(None, gt=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    return {
+        "limiter": model_call_limiter.stats(),
+        "single_flight": analysis_flights.stats(),
+        **llm_call_log.summary(
+            since_seconds=hours * 3600 if hours else None, limit=limit
+        ),
+    }
 
 
 @app.get("/profile")
-def profile(request: Request, user=Depends(get_current_user)):
+def profile(request: Request, user=Depends(get_user_profile)):
     if not user:
         return templates.TemplateResponse(
             "profile.html", {"request": request, "user": {}, "metadata": {}}
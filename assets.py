@@ -0,0 +1,61 @@
+"""Content-hashed static assets.
+
+``python build_assets.py`` writes the stylesheet and the scripts vendored
+in ``static/vendor`` to
+``static/dist`` under names that include a hash of their content, plus a
+manifest mapping each logical name to its built file. Templates link
+them with ``asset_url(name)``. A built file never changes, so it is
+served with a year-long immutable Cache-Control.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+from fastapi.staticfiles import StaticFiles
+
+STATIC_DIR = Path(__file__).parent / "static"
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_PATH = STATIC_DIR / "manifest.json"
+DIST_URL = "/static/dist"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> Dict[str, str]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+@lru_cache(maxsize=1)
+def page_version() -> str:
+    """Changes whenever a page would link or render differently: a rebuilt
+    asset manifest, edited templates or a new ``APP_VERSION``."""
+    digest = hashlib.sha256(os.getenv("APP_VERSION", "").encode())
+    if MANIFEST_PATH.exists():
+        digest.update(MANIFEST_PATH.read_bytes())
+    for path in sorted(TEMPLATES_DIR.glob("*.html")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def asset_url(name: str) -> str:
+    built = load_manifest().get(name)
+    if built is None:
+        raise KeyError(f"Asset {name!r} is not built; run python build_assets.py")
+    return f"{DIST_URL}/{built}"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Serves the hashed build output with far-future caching."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
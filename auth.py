@@ -0,0 +1,154 @@
+"""Local verification of Supabase access tokens.
+
+Tokens are checked against the project's JWT secret (HS256) or the
+signing keys published at the project's JWKS endpoint (RS256/ES256),
+which are fetched once and cached. Verified users are cached per token
+for ``AUTH_TOKEN_CACHE_SECONDS``, never beyond the token's expiry.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import jwt
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+load_dotenv()
+
+SUPABASE_URL = (os.getenv("SUPABASE_URL") or "").rstrip("/")
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL", f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+)
+JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+JWT_ISSUER = os.getenv("SUPABASE_JWT_ISSUER", f"{SUPABASE_URL}/auth/v1")
+AUTH_TOKEN_CACHE_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_SECONDS", "60"))
+JWKS_CACHE_SECONDS = int(os.getenv("JWKS_CACHE_SECONDS", "600"))
+# Ask the auth server when a token cannot be checked locally
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class SigningKeyUnavailable(Exception):
+    """Raised when no local key can check a token's signature."""
+
+
+class AuthenticatedUser(BaseModel):
+    """The user as stated by the claims of a verified access token."""
+
+    id: str
+    aud: str
+    role: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    app_metadata: Dict[str, Any] = Field(default_factory=dict)
+    user_metadata: Dict[str, Any] = Field(default_factory=dict)
+    session_id: Optional[str] = None
+    is_anonymous: bool = False
+    expires_at: int
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "AuthenticatedUser":
+        return cls(
+            id=claims["sub"],
+            aud=claims["aud"] if isinstance(claims["aud"], str) else claims["aud"][0],
+            role=claims.get("role"),
+            email=claims.get("email"),
+            phone=claims.get("phone"),
+            app_metadata=claims.get("app_metadata") or {},
+            user_metadata=claims.get("user_metadata") or {},
+            session_id=claims.get("session_id"),
+            is_anonymous=claims.get("is_anonymous", False),
+            expires_at=claims["exp"],
+        )
+
+
+class TokenVerifier:
+    """Verifies access tokens locally and caches the resulting users."""
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = SUPABASE_JWT_SECRET,
+        jwks_url: Optional[str] = SUPABASE_JWKS_URL,
+        audience: str = JWT_AUDIENCE,
+        issuer: Optional[str] = JWT_ISSUER,
+        cache_seconds: float = AUTH_TOKEN_CACHE_SECONDS,
+        max_cached: int = 10_000,
+        leeway: float = 5,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self.issuer = issuer
+        self.cache_seconds = cache_seconds
+        self.max_cached = max_cached
+        self.leeway = leeway
+        self._clock = clock
+        self._jwks = (
+            jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=JWKS_CACHE_SECONDS)
+            if jwks_url
+            else None
+        )
+        self._cache: "OrderedDict[str, Tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _signing_key(self, token: str, algorithm: str):
+        if algorithm == "HS256" and self.jwt_secret:
+            return self.jwt_secret
+        if algorithm in ASYMMETRIC_ALGORITHMS and self._jwks is not None:
+            try:
+                return self._jwks.get_signing_key_from_jwt(token).key
+            except jwt.PyJWKClientConnectionError as exc:
+                raise SigningKeyUnavailable(str(exc)) from exc
+        raise SigningKeyUnavailable(f"No local key for {algorithm} tokens")
+
+    def verify(self, token: str) -> AuthenticatedUser:
+        """The token's user; raises :class:`jwt.InvalidTokenError` for bad
+        tokens and :class:`SigningKeyUnavailable` when it cannot tell."""
+        # Hashed, so the cache does not hold live tokens
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        algorithm = jwt.get_unverified_header(token).get("alg")
+        claims = jwt.decode(
+            token,
+            self._signing_key(token, algorithm),
+            algorithms=[algorithm],
+            audience=self.audience,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"require": ["exp", "sub", "aud"]},
+        )
+        user = AuthenticatedUser.from_claims(claims)
+
+        with self._lock:
+            expires = min(now + self.cache_seconds, user.expires_at)
+            self._cache[cache_key] = (expires, user)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return user
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+token_verifier = TokenVerifier()
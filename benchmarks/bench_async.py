@@ -0,0 +1,163 @@
+"""Sync (threadpool) vs async service-layer calls under concurrent requests.
+
+Each simulated request opens a session, loads the KPIs and reports of one
+company/area pair and closes the session. The sync path runs in a
+40-thread limiter, like Starlette does for plain ``def`` routes.
+
+Usage:
+    python -m benchmarks.bench_async --reports 100000 --concurrency 1 10 50 100
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import anyio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import make_engine, seed
+from database import load_pool_options, to_async_url
+from pool_stats import instrument_engine
+from service_layer.kpi_query import (
+    get_kpis_by_insurance_company_and_practice_area,
+    get_kpis_by_insurance_company_and_practice_area_async,
+)
+from service_layer.reports_query import (
+    get_report_analysis_payload,
+    get_report_analysis_payload_async,
+)
+
+STARLETTE_THREADPOOL_SIZE = 40
+
+
+def _summarize(latencies: list[float], wall: float) -> dict:
+    latencies.sort()
+    return {
+        "requests_per_sec": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def _run_sync_path(SyncSession, pairs, concurrency: int) -> dict:
+    limiter = anyio.CapacityLimiter(STARLETTE_THREADPOOL_SIZE)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    def handle(company_id, area_id):
+        with SyncSession() as session:
+            get_kpis_by_insurance_company_and_practice_area(
+                session, company_id, area_id
+            )
+            get_report_analysis_payload(session, company_id, area_id)
+
+    async def request(company_id, area_id):
+        async with semaphore:
+            start = time.perf_counter()
+            await anyio.to_thread.run_sync(handle, company_id, area_id, limiter=limiter)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(c, a) for c, a in pairs))
+    return _summarize(latencies, time.perf_counter() - start)
+
+
+async def _run_async_path(AsyncSession, pairs, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request(company_id, area_id):
+        async with semaphore:
+            start = time.perf_counter()
+            async with AsyncSession() as session:
+                await get_kpis_by_insurance_company_and_practice_area_async(
+                    session, company_id, area_id
+                )
+                await get_report_analysis_payload_async(session, company_id, area_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(c, a) for c, a in pairs))
+    return _summarize(latencies, time.perf_counter() - start)
+
+
+async def _compare(engine, concurrency_levels, requests_per_level) -> list[dict]:
+    url = engine.url.render_as_string(hide_password=False)
+    async_engine = create_async_engine(
+        to_async_url(url), **load_pool_options("benchmark", url)
+    )
+    sync_stats = instrument_engine(engine)
+    async_stats = instrument_engine(async_engine.sync_engine)
+    SyncSession = sessionmaker(bind=engine)
+    AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    rng = random.Random(7)
+    pairs = [(rng.randint(1, 11), rng.randint(1, 9)) for _ in range(requests_per_level)]
+
+    results = []
+    try:
+        for concurrency in concurrency_levels:
+            results.append(
+                {
+                    "concurrency": concurrency,
+                    "sync": await _run_sync_path(SyncSession, pairs, concurrency),
+                    "async": await _run_async_path(AsyncSession, pairs, concurrency),
+                    "pool": {
+                        "sync": sync_stats.snapshot(),
+                        "async": async_stats.snapshot(),
+                    },
+                }
+            )
+            sync_stats.reset()
+            async_stats.reset()
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument("--reports", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    print(f"Seeding {args.reports} reports into {engine.url.render_as_string()}...")
+    seed(engine, args.reports, allow_destructive=args.allow_destructive)
+    url = engine.url.render_as_string(hide_password=False)
+    engine.dispose()
+
+    # Both paths get the "benchmark" pool profile
+    results = asyncio.run(
+        _compare(
+            create_engine(url, **load_pool_options("benchmark", url)),
+            args.concurrency,
+            args.requests,
+        )
+    )
+
+    print(
+        f"\n{'conc':>5} {'path':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'connects':>9} {'pooled':>7}"
+    )
+    for row in results:
+        for path in ("sync", "async"):
+            stats = row[path]
+            pool = row["pool"][path]
+            print(
+                f"{row['concurrency']:>5} {path:>6} {stats['requests_per_sec']:>9.1f} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{pool['connects']:>9} {pool.get('checkedin', 0):>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Per-request cost of authenticating a protected route.
+
+Compares local token verification (HS256 with the project secret, ES256
+against a JWKS served from this process) with and without the per-token
+cache, and the full request overhead against an unauthenticated one.
+With ``--remote-token`` (a real session's access token) it also times
+the auth-server round trip that every request used to make.
+
+Usage:
+    python -m benchmarks.bench_auth --iterations 2000 [--remote-token eyJ...]
+"""
+
+import argparse
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+# Importing the app must not need a model API key
+os.environ.setdefault("AI_BACKEND", "local")
+
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+# Sets the default DATABASE_URL before the app modules build their engines
+from benchmarks.common import timed  # noqa: E402
+import dependencies  # noqa: E402
+from app import app  # noqa: E402
+from auth import TokenVerifier  # noqa: E402
+
+SECRET = "benchmark-secret-with-at-least-32-bytes"
+ISSUER = "https://benchmark.supabase.co/auth/v1"
+
+
+def _claims() -> dict:
+    now = int(time.time())
+    return {
+        "sub": "bench-user",
+        "aud": "authenticated",
+        "iss": ISSUER,
+        "iat": now,
+        "exp": now + 3600,
+        "email": "bench@example.com",
+    }
+
+
+def _serve_jwks(public_key) -> HTTPServer:
+    directory = tempfile.mkdtemp(prefix="crm_bench_")
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(public_key))
+    Path(directory, "jwks.json").write_text(
+        json.dumps({"keys": [{**jwk, "kid": "k1"}]})
+    )
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--remote-token", default=None)
+    args = parser.parse_args()
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    server = _serve_jwks(private_key.public_key())
+    jwks_url = f"http://127.0.0.1:{server.server_port}/jwks.json"
+    hs_token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+    es_token = jwt.encode(
+        _claims(), private_key, algorithm="ES256", headers={"kid": "k1"}
+    )
+
+    def verifier(cache_seconds: float) -> TokenVerifier:
+        return TokenVerifier(
+            jwt_secret=SECRET,
+            jwks_url=jwks_url,
+            issuer=ISSUER,
+            cache_seconds=cache_seconds,
+        )
+
+    uncached, cached = verifier(0), verifier(60)
+    results = {
+        "local HS256, uncached": timed(
+            lambda: uncached.verify(hs_token), args.iterations
+        ),
+        "local ES256, uncached": timed(
+            lambda: uncached.verify(es_token), args.iterations
+        ),
+        "local, cached": timed(lambda: cached.verify(es_token), args.iterations),
+    }
+    if args.remote_token:
+        results["remote get_user"] = timed(
+            lambda: dependencies.supabase.auth.get_user(args.remote_token),
+            max(args.iterations // 100, 5),
+        )
+
+    dependencies.token_verifier = cached
+    headers = {"Authorization": f"Bearer {es_token}"}
+    with TestClient(app, base_url="http://localhost") as local:
+        results["request, no auth"] = timed(
+            lambda: local.get("/internal/pool-stats"), args.iterations // 4
+        )
+    with TestClient(app, base_url="http://crm.example.com") as remote:
+        results["request, token"] = timed(
+            lambda: remote.get("/internal/pool-stats", headers=headers),
+            args.iterations // 4,
+        )
+    server.shutdown()
+
+    print(f"\n{'path':<24} {'mean ms':>9} {'median ms':>10} {'p95 ms':>9}")
+    for name, stats in results.items():
+        print(
+            f"{name:<24} {stats['mean_ms']:>9.3f} {stats['median_ms']:>10.3f} "
+            f"{stats['p95_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Rows/sec of the validating (ORM + Pydantic) and column-projection read modes.
+
+Usage:
+    python -m benchmarks.bench_hydration --reports 50000
+"""
+
+import argparse
+
+from sqlalchemy.orm import Session
+
+from benchmarks.common import make_engine, seed, timed
+from service_layer.kpi_query import get_kpis_by_insurance_company_and_practice_area
+from service_layer.reports_query import get_report_analysis_payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument("--reports", type=int, default=50_000)
+    parser.add_argument("--kpis", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    # A single company/area pair, so every row belongs to the measured combo
+    engine = make_engine(args.database_url)
+    seed(
+        engine,
+        args.reports,
+        companies=1,
+        areas=1,
+        kpis_per_pair=args.kpis,
+        allow_destructive=args.allow_destructive,
+    )
+
+    print(f"{'query':<8} {'mode':<10} {'rows':>7} {'median ms':>10} {'rows/sec':>11}")
+    with Session(engine) as session:
+        for name, rows, call in (
+            (
+                "kpis",
+                args.kpis,
+                lambda validate: get_kpis_by_insurance_company_and_practice_area(
+                    session, 1, 1, validate=validate
+                ),
+            ),
+            (
+                "reports",
+                args.reports,
+                lambda validate: get_report_analysis_payload(
+                    session, 1, 1, validate=validate
+                ),
+            ),
+        ):
+            for mode, validate in (("validating", True), ("projection", False)):
+                # Fresh identity map each run, like a new request
+                stats = timed(
+                    lambda: (call(validate), session.expunge_all()), args.iterations
+                )
+                print(
+                    f"{name:<8} {mode:<10} {rows:>7} {stats['median_ms']:>10.1f} "
+                    f"{rows / (stats['median_ms'] / 1000):>11,.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
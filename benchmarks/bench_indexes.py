@@ -0,0 +1,130 @@
+"""Query plans and latencies of the (company, area) lookups with and without
+the composite indexes.
+
+Usage:
+    python -m benchmarks.bench_indexes --reports 200000
+    python -m benchmarks.bench_indexes --database-url postgresql://... \
+        --allow-destructive --reports 1000000
+
+Seeding drops and recreates the schema, so a ``--database-url`` only runs
+together with ``--allow-destructive``.
+"""
+
+import argparse
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from benchmarks.common import make_engine, seed, timed
+from database import KPI, Report
+from service_layer.kpi_query import get_kpis_by_insurance_company_and_practice_area
+from service_layer.reports_query import get_report_analysis_payload
+
+INDEXES = [index for model in (KPI, Report) for index in model.__table__.indexes]
+
+
+def _captured_statements(engine, fn) -> list[tuple]:
+    """Runs ``fn`` once and returns the SQL statements it sent to the database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def _explain(engine, fn) -> list[str]:
+    """Explains exactly the statements the service function emits."""
+    plan = []
+    with engine.connect() as conn:
+        for statement, parameters in _captured_statements(engine, fn):
+            if conn.dialect.name == "sqlite":
+                rows = conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+                plan.extend(row[-1] for row in rows)
+            else:
+                rows = conn.exec_driver_sql(f"EXPLAIN ANALYZE {statement}", parameters)
+                plan.extend(row[0] for row in rows)
+    return plan
+
+
+def _measure(engine, company_id: int, area_id: int, iterations: int) -> dict:
+    with Session(engine) as session:
+        calls = {
+            "kpis": lambda: get_kpis_by_insurance_company_and_practice_area(
+                session, company_id, area_id
+            ),
+            "reports": lambda: get_report_analysis_payload(
+                session, company_id, area_id
+            ),
+        }
+        plans = {name: _explain(engine, fn) for name, fn in calls.items()}
+        latencies = {name: timed(fn, iterations) for name, fn in calls.items()}
+    return {"plans": plans, "latencies": latencies}
+
+
+def _print_run(label: str, run: dict) -> None:
+    print(f"\n== {label} ==")
+    for name, plan in run["plans"].items():
+        print(f"  plan[{name}]:")
+        for line in plan:
+            print(f"    {line}")
+    for name, stats in run["latencies"].items():
+        print(
+            f"  {name:<8} mean={stats['mean_ms']:.2f}ms "
+            f"median={stats['median_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument(
+        "--allow-destructive",
+        action="store_true",
+        help="Allow seeding to drop the tables of --database-url",
+    )
+    parser.add_argument("--reports", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--company-id", type=int, default=3)
+    parser.add_argument("--area-id", type=int, default=4)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    print(f"Seeding {args.reports} reports into {engine.url.render_as_string()}...")
+    seed(engine, args.reports, allow_destructive=args.allow_destructive)
+
+    with engine.begin() as conn:
+        for index in INDEXES:
+            index.drop(conn)
+        conn.execute(text("ANALYZE"))
+    # Pooled connections keep statements prepared against the old schema
+    engine.dispose()
+    before = _measure(engine, args.company_id, args.area_id, args.iterations)
+
+    with engine.begin() as conn:
+        for index in INDEXES:
+            index.create(conn)
+        conn.execute(text("ANALYZE"))
+    # Pooled connections keep statements prepared against the old schema
+    engine.dispose()
+    after = _measure(engine, args.company_id, args.area_id, args.iterations)
+
+    _print_run("without composite indexes", before)
+    _print_run("with composite indexes", after)
+    for name in ("kpis", "reports"):
+        speedup = (
+            before["latencies"][name]["median_ms"]
+            / after["latencies"][name]["median_ms"]
+        )
+        print(f"\n{name}: {speedup:.1f}x faster with indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Live KPI aggregation vs the rollup tables as ``kpis`` grows.
+
+Usage:
+    python -m benchmarks.bench_kpi_rollup --kpis-per-pair 1 10 100 1000
+"""
+
+import argparse
+
+from sqlalchemy.orm import Session
+
+from benchmarks.common import make_engine, seed, timed
+from database import KPI
+from service_layer.kpi_query import get_analytics_payload, get_live_analytics_payload
+
+PAIRS = 11 * 9
+
+
+def _insert_one_kpi(session: Session) -> None:
+    session.add(
+        KPI(
+            insurance_company_id=1,
+            practice_area_id=1,
+            incoming_fees=1000,
+            fees_collected=900,
+            new_mandates=1,
+        )
+    )
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument(
+        "--kpis-per-pair", type=int, nargs="+", default=[1, 10, 100, 1000]
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'kpis':>9} {'live ms':>9} {'rollup ms':>10} {'speedup':>8} {'write ms':>9}"
+    )
+    for per_pair in args.kpis_per_pair:
+        engine = make_engine(args.database_url)
+        seed(
+            engine,
+            number_of_reports=0,
+            kpis_per_pair=per_pair,
+            allow_destructive=args.allow_destructive,
+        )
+        with Session(engine) as session:
+            live = timed(lambda: get_live_analytics_payload(session), args.iterations)
+            rollup = timed(lambda: get_analytics_payload(session), args.iterations)
+            # Cost of the incremental refresh, paid once per KPI write
+            write = timed(lambda: _insert_one_kpi(session), args.iterations)
+        engine.dispose()
+
+        print(
+            f"{PAIRS * per_pair:>9} {live['median_ms']:>9.2f} "
+            f"{rollup['median_ms']:>10.2f} "
+            f"{live['median_ms'] / rollup['median_ms']:>7.1f}x "
+            f"{write['median_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""End-to-end latency of /prompt under concurrent requests, offline.
+
+The model is the local stand-in from ``agent.ai_model`` with configurable
+latency and token throughput, so no API key or network is needed. Each
+request bypasses the result cache (unless ``--cached``) and the stages
+come from the route's ``Server-Timing`` header: db (KPI and report
+queries), prompt (ranking and serialization for the model), queue (wait
+for a model-call slot), model and serialize (response JSON).
+
+Usage:
+    python -m benchmarks.bench_prompt --reports 100000 --concurrency 1 8 32 \\
+        --latency 0.5 --tokens-per-second 50
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Never call the real model from a benchmark
+os.environ.setdefault("AI_BACKEND", "local")
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+# Sets the default DATABASE_URL before the app modules build their engines
+from benchmarks.common import make_engine, seed  # noqa: E402
+import agent.agent as agent_module  # noqa: E402
+from agent.ai_model import LocalStandIn  # noqa: E402
+from agent.concurrency import ModelCallLimiter  # noqa: E402
+from agent.map_reduce import chunk_agent  # noqa: E402
+from agent.result_cache import AgentResultCache  # noqa: E402
+from app import app  # noqa: E402
+from database import load_pool_options, to_async_url  # noqa: E402
+from dependencies import get_async_db  # noqa: E402
+
+STAGES = ("db", "prompt", "queue", "model", "serialize", "total")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``samples``."""
+    return samples[max(math.ceil(len(samples) * q) - 1, 0)]
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    timings = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, _, duration = entry.partition(";dur=")
+        timings[name] = float(duration)
+    return timings
+
+
+def _summarize(samples: dict[str, list[float]], wall: float, requests: int) -> dict:
+    summary = {"requests_per_sec": requests / wall, "stages": {}}
+    for stage in STAGES:
+        values = sorted(samples.get(stage, []))
+        if not values:
+            continue
+        mean = statistics.fmean(values)
+        summary["stages"][stage] = {
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+            # What one worker could sustain if it only ran this stage
+            "per_sec": 1000 / mean if mean else math.inf,
+        }
+    return summary
+
+
+async def _drive(client, pairs, concurrency: int, query: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    errors: list[int] = []
+
+    async def request(company_id, area_id):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(f"/prompt/{company_id}/{area_id}{query}")
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            errors.append(response.status_code)
+            return
+        samples["total"].append(elapsed)
+        for stage, ms in parse_server_timing(
+            response.headers.get("Server-Timing", "")
+        ).items():
+            samples[stage].append(ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(c, a) for c, a in pairs))
+    summary = _summarize(samples, time.perf_counter() - start, len(samples["total"]))
+    return {**summary, "errors": len(errors)}
+
+
+async def _run(url: str, args) -> list[dict]:
+    async_engine = create_async_engine(
+        to_async_url(url), **load_pool_options("benchmark", url)
+    )
+    BenchSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def bench_db():
+        async with BenchSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = bench_db
+    rng = random.Random(7)
+    pairs = [(rng.randint(1, 11), rng.randint(1, 9)) for _ in range(args.requests)]
+    query = f"?mode={args.mode}" + ("" if args.cached else "&refresh=true")
+
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost", timeout=None
+        ) as client:
+            for concurrency in args.concurrency:
+                results.append(
+                    {
+                        "concurrency": concurrency,
+                        **await _drive(client, pairs, concurrency, query),
+                    }
+                )
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument("--reports", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--mode", choices=["ranked", "hierarchical"], default="ranked")
+    parser.add_argument("--cached", action="store_true", help="Allow cache hits")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--output-tokens", type=int, default=150)
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=None,
+        help="Model-call slots (default: LLM_MAX_CONCURRENCY)",
+    )
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    print(f"Seeding {args.reports} reports into {engine.url.render_as_string()}...")
+    seed(engine, args.reports, allow_destructive=args.allow_destructive)
+    url = engine.url.render_as_string(hide_password=False)
+    engine.dispose()
+
+    stand_in = LocalStandIn(args.latency, args.tokens_per_second, args.output_tokens)
+    agent_module.agent_result_cache = AgentResultCache(
+        os.path.join(tempfile.mkdtemp(prefix="crm_bench_"), "agent_results.db")
+    )
+    if args.llm_concurrency:
+        agent_module.model_call_limiter = ModelCallLimiter(
+            args.llm_concurrency, queue_timeout=3600
+        )
+    with agent_module.simple_agent.override(
+        model=stand_in.model()
+    ), chunk_agent.override(model=stand_in.model()):
+        results = asyncio.run(_run(url, args))
+
+    print(
+        f"\n{'conc':>5} {'req/s':>8} {'stage':>10} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'per sec':>9}"
+    )
+    for row in results:
+        if row["errors"]:
+            print(f"{row['concurrency']:>5} {row['errors']} failed requests")
+        for stage, stats in row["stages"].items():
+            print(
+                f"{row['concurrency']:>5} {row['requests_per_sec']:>8.1f} {stage:>10} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                f"{stats['p99_ms']:>9.1f} {stats['per_sec']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cost of serializing a large /prompt response, per JSON path.
+
+Builds an ``Insurance360Output`` holding ``--reports`` visit reports and
+``--kpis`` KPI rows in memory and times FastAPI's default path
+(``jsonable_encoder`` then ``json.dumps``), Pydantic's
+``model_dump_json``, the ``PydanticJSONResponse`` used by the routes,
+orjson when it is installed, and the response without the echoed
+``kpi_data``/``visit_reports`` (``?omit_data=true``).
+
+Usage:
+    python -m benchmarks.bench_serialization --reports 10000 --kpis 1000
+"""
+
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+# Importing the agent must not need a model API key
+os.environ.setdefault("AI_BACKEND", "local")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from benchmarks.common import timed  # noqa: E402
+from agent.agent import Citation, Insurance360Output  # noqa: E402
+from responses import ECHOED_DATA_FIELDS, PydanticJSONResponse  # noqa: E402
+from service_layer.kpi_query import KPISchema  # noqa: E402
+from service_layer.reports_query import ReportSchema  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # optional; only adds a row to the table
+    orjson = None
+
+
+def build_output(reports: int, kpis: int, seed: int = 42) -> Insurance360Output:
+    rng = random.Random(seed)
+    now = datetime.now()
+    names = {"insurance_company_name": "Allianz", "practice_area_name": "Cyber"}
+    return Insurance360Output(
+        **names,
+        kpi_data=[
+            KPISchema(
+                id=i,
+                incoming_fees=rng.randint(10_000, 500_000),
+                fees_collected=rng.randint(10_000, 400_000),
+                new_mandates=rng.randint(15, 200),
+                **names,
+            )
+            for i in range(1, kpis + 1)
+        ],
+        visit_reports=[
+            ReportSchema(
+                id=i,
+                department_visited="Schadenabteilung",
+                visited_key_personnel="Dr. Müller",
+                report_date=now - timedelta(minutes=rng.randint(0, 1_051_200)),
+                report_content=f"Protokoll {i}\nPrio: Normal\n---\n"
+                + "Termin mit der Schadenabteilung. " * 12,
+                **names,
+            )
+            for i in range(1, reports + 1)
+        ],
+        kpi_analysis="Die Honorare steigen [KPI-1].",
+        report_analysis="Die Zusammenarbeit ist eng [1].",
+        final_executive_summary="Stabile Beziehung [KPI-1][1].",
+        citations=[
+            Citation(source_id=str(i), company_id=1, area_id=1) for i in range(1, 11)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("--kpis", type=int, default=1_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    output = build_output(args.reports, args.kpis)
+    paths = {
+        "jsonable_encoder": lambda: JSONResponse(jsonable_encoder(output)).body,
+        "model_dump_json": lambda: output.model_dump_json().encode(),
+        "PydanticJSONResponse": lambda: PydanticJSONResponse(output).body,
+    }
+    if orjson is not None:
+        paths["orjson"] = lambda: orjson.dumps(output.model_dump(mode="json"))
+    paths["omit_data"] = lambda: output.model_dump_json(
+        exclude=ECHOED_DATA_FIELDS
+    ).encode()
+
+    baseline = None
+    print(
+        f"\n{args.reports} reports, {args.kpis} KPIs\n"
+        f"{'path':<22} {'median ms':>10} {'p95 ms':>9} {'KiB':>9} {'speedup':>8}"
+    )
+    for name, render in paths.items():
+        size = len(render())
+        stats = timed(render, args.iterations)
+        baseline = baseline or stats["median_ms"]
+        print(
+            f"{name:<22} {stats['median_ms']:>10.2f} {stats['p95_ms']:>9.2f} "
+            f"{size / 1024:>9.1f} {baseline / stats['median_ms']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
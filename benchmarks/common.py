@@ -0,0 +1,130 @@
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+# The app modules build their engine from DATABASE_URL at import time
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'crm_bench.db')}"
+)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from database import KPI, Base, InsuranceCompany, PracticeArea, Report  # noqa: E402
+from service_layer.data_version import bump_data_version  # noqa: E402
+from service_layer.kpi_rollup import rebuild_kpi_rollups  # noqa: E402
+
+SCRATCH_PREFIX = "crm_bench_"
+
+
+def make_engine(database_url: str | None = None) -> Engine:
+    """Creates an engine for a benchmark run, defaulting to a fresh SQLite file."""
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix=SCRATCH_PREFIX), "bench.db")
+        database_url = f"sqlite:///{path}"
+    return create_engine(database_url)
+
+
+def is_scratch_database(engine: Engine) -> bool:
+    """True for the throwaway SQLite files created by :func:`make_engine`."""
+    database = engine.url.database or ""
+    return engine.dialect.name == "sqlite" and os.path.basename(
+        os.path.dirname(database)
+    ).startswith(SCRATCH_PREFIX)
+
+
+def reset_schema(engine: Engine, allow_destructive: bool = False) -> None:
+    """Drops and recreates all tables, refusing non-scratch databases unless
+    ``allow_destructive`` is set explicitly."""
+    if not (allow_destructive or is_scratch_database(engine)):
+        raise ValueError(
+            f"Refusing to drop tables in {engine.url.render_as_string()}; "
+            "pass allow_destructive=True (--allow-destructive) to seed it."
+        )
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def seed(
+    engine: Engine,
+    number_of_reports: int,
+    companies: int = 11,
+    areas: int = 9,
+    random_seed: int = 42,
+    batch_size: int = 10_000,
+    allow_destructive: bool = False,
+    kpis_per_pair: int = 1,
+) -> None:
+    """Recreates the schema (see :func:`reset_schema`) and bulk-loads a
+    synthetic dataset with placeholder content."""
+    reset_schema(engine, allow_destructive)
+    rng = random.Random(random_seed)
+
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(InsuranceCompany),
+            [{"id": i, "name": f"Company {i}"} for i in range(1, companies + 1)],
+        )
+        conn.execute(
+            insert(PracticeArea),
+            [{"id": i, "name": f"Area {i}"} for i in range(1, areas + 1)],
+        )
+        conn.execute(
+            insert(KPI),
+            [
+                {
+                    "insurance_company_id": c,
+                    "practice_area_id": a,
+                    "incoming_fees": rng.randint(10_000, 500_000),
+                    "fees_collected": rng.randint(10_000, 400_000),
+                    "new_mandates": rng.randint(15, 200),
+                }
+                for c in range(1, companies + 1)
+                for a in range(1, areas + 1)
+                for _ in range(kpis_per_pair)
+            ],
+        )
+        # Core inserts bypass the ORM listeners that maintain the rollups
+        # and data versions
+        rebuild_kpi_rollups(conn)
+        bump_data_version(conn, "kpis")
+        bump_data_version(conn, "reports")
+
+        for start in range(0, number_of_reports, batch_size):
+            rows = [
+                {
+                    "insurance_company_id": rng.randint(1, companies),
+                    "practice_area_id": rng.randint(1, areas),
+                    "department_visited": "Schadenabteilung",
+                    "visited_key_personnel": "Dr. Müller",
+                    "report_date": now - timedelta(minutes=rng.randint(0, 1_051_200)),
+                    "report_content": f"Protokoll {start + i}\nPrio: Normal\n---\nTermin.",
+                }
+                for i in range(min(batch_size, number_of_reports - start))
+            ]
+            conn.execute(insert(Report), rows)
+
+
+def timed(
+    fn: Callable[[], object], iterations: int = 20, warmup: int = 1
+) -> Dict[str, float]:
+    """Runs ``fn`` repeatedly and returns latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)],
+    }
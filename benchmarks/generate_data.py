@@ -0,0 +1,328 @@
+"""High-volume synthetic dataset from the dummy_data templates and name lists.
+
+Reports and KPIs are written in batches with Core ``insert()`` executemany,
+or ``COPY ... FROM STDIN`` on PostgreSQL via psycopg2. Report generation can
+be split across processes; each worker seeds its own RNG from ``--seed`` so
+a run is reproducible for a given worker count. Extra workers help most on
+PostgreSQL; SQLite serializes the writes.
+
+Usage:
+    python -m benchmarks.generate_data --reports 1000000 --kpis 5000 --workers 4
+    python -m benchmarks.generate_data --database-url postgresql://... \\
+        --reports 5000000 --allow-destructive
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from faker import Faker
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Connection, Engine
+
+from benchmarks.common import make_engine, reset_schema
+from database import KPI, InsuranceCompany, PracticeArea, Report
+from dummy_data import (
+    CITIES,
+    DEPARTMENTS,
+    INSURANCE_COMPANY_NAMES,
+    PRACTICE_AREA_NAMES,
+    REPORT_TEMPLATES,
+)
+from service_layer.data_version import bump_data_version
+from service_layer.kpi_rollup import rebuild_kpi_rollups
+
+# (company_id, company_name, area_id, area_name)
+Combination = Tuple[int, str, int, str]
+
+REPORT_COLUMNS = [
+    "insurance_company_id",
+    "practice_area_id",
+    "department_visited",
+    "visited_key_personnel",
+    "report_date",
+    "report_content",
+]
+KPI_COLUMNS = [
+    "insurance_company_id",
+    "practice_area_id",
+    "incoming_fees",
+    "fees_collected",
+    "new_mandates",
+]
+# Faker is far too slow to call per row at this volume
+PERSON_POOL_SIZE = 2_000
+REPORT_WINDOW_SECONDS = 2 * 365 * 24 * 3600
+
+
+def active_combinations(rng: random.Random) -> List[Combination]:
+    """Each company works with a random subset of practice areas, as in
+    ``dummy_data.populate_database``."""
+    areas = list(enumerate(PRACTICE_AREA_NAMES, start=1))
+    combinations = []
+    for company_id, company_name in enumerate(INSURANCE_COMPANY_NAMES, start=1):
+        for area_id, area_name in rng.sample(areas, k=rng.randint(4, len(areas))):
+            combinations.append((company_id, company_name, area_id, area_name))
+    return combinations
+
+
+def person_pool(random_seed: int, size: int = PERSON_POOL_SIZE) -> List[str]:
+    fake = Faker("de_DE")
+    fake.seed_instance(random_seed)
+    rng = random.Random(random_seed)
+    return [
+        f"{fake.prefix()} {fake.last_name()}" if rng.random() > 0.4 else fake.name()
+        for _ in range(size)
+    ]
+
+
+def kpi_rows(
+    combinations: List[Combination], count: int, rng: random.Random
+) -> Iterator[Dict]:
+    """``count`` KPI rows spread round-robin over the active combinations."""
+    for i in range(count):
+        company_id, _, area_id, _ = combinations[i % len(combinations)]
+        mandates = rng.randint(15, 200)
+        incoming = mandates * rng.randint(900, 3500)
+        yield {
+            "insurance_company_id": company_id,
+            "practice_area_id": area_id,
+            "new_mandates": mandates,
+            "incoming_fees": incoming,
+            "fees_collected": int(incoming * rng.uniform(0.88, 0.99)),
+        }
+
+
+def report_rows(
+    combinations: List[Combination],
+    count: int,
+    rng: random.Random,
+    persons: List[str],
+    now: datetime,
+) -> Iterator[Dict]:
+    for _ in range(count):
+        company_id, co_name, area_id, area = rng.choice(combinations)
+        dept = rng.choice(DEPARTMENTS)
+        city = rng.choice(CITIES)
+        person = rng.choice(persons)
+        base_text = rng.choice(REPORT_TEMPLATES).format(
+            area=area, person=person, dept=dept, co_name=co_name, city=city
+        )
+        case_id = f"{co_name[:2].upper()}-{rng.randint(100, 999)}/{rng.randint(23, 25)}"
+        yield {
+            "insurance_company_id": company_id,
+            "practice_area_id": area_id,
+            "department_visited": dept,
+            "visited_key_personnel": person,
+            "report_date": now
+            - timedelta(seconds=rng.randint(0, REPORT_WINDOW_SECONDS)),
+            "report_content": f"Protokoll {case_id}\nOrt: {city} | "
+            f"Prio: {rng.choice(['Normal', 'Hoch'])}\n---\n{base_text}",
+        }
+
+
+def supports_copy(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def _copy_batch(conn: Connection, table_name: str, columns: List[str], rows) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row[column] for column in columns)
+    buffer.seek(0)
+    with conn.connection.driver_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def write_batches(
+    engine: Engine,
+    model,
+    columns: List[str],
+    rows: Iterator[Dict],
+    batch_size: int,
+    use_copy: bool,
+) -> int:
+    """Writes ``rows`` in one transaction per batch and returns the row count."""
+    written = 0
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            return written
+        with engine.begin() as conn:
+            if use_copy:
+                _copy_batch(conn, model.__tablename__, columns, batch)
+            else:
+                conn.execute(insert(model), batch)
+        written += len(batch)
+
+
+def _report_worker(
+    url: str,
+    combinations: List[Combination],
+    count: int,
+    random_seed: int,
+    batch_size: int,
+    use_copy: bool,
+    now: datetime,
+) -> int:
+    # SQLite serializes writers; let them queue for the write lock
+    connect_args = {"timeout": 300} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    try:
+        rng = random.Random(random_seed)
+        rows = report_rows(combinations, count, rng, person_pool(random_seed), now)
+        return write_batches(engine, Report, REPORT_COLUMNS, rows, batch_size, use_copy)
+    finally:
+        engine.dispose()
+
+
+def _split(total: int, parts: int) -> List[int]:
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def generate(
+    engine: Engine,
+    reports: int,
+    kpis: int | None = None,
+    random_seed: int = 42,
+    batch_size: int = 10_000,
+    workers: int = 1,
+    use_copy: bool | None = None,
+    allow_destructive: bool = False,
+) -> Dict[str, Dict[str, float]]:
+    """Recreates the schema and loads the dataset.
+
+    ``kpis`` defaults to one row per active company/area combination.
+    ``use_copy`` defaults to COPY whenever the engine supports it. Returns
+    rows, seconds and rows/sec per table.
+    """
+    reset_schema(engine, allow_destructive)
+    use_copy = supports_copy(engine) if use_copy is None else use_copy
+    rng = random.Random(random_seed)
+    combinations = active_combinations(rng)
+    kpis = len(combinations) if kpis is None else kpis
+    results = {}
+
+    # Fresh tables number the rows 1..n in list order, matching the
+    # combinations; leaving the ids to the database keeps sequences in step
+    with engine.begin() as conn:
+        conn.execute(
+            insert(PracticeArea), [{"name": name} for name in PRACTICE_AREA_NAMES]
+        )
+        conn.execute(
+            insert(InsuranceCompany),
+            [{"name": name} for name in INSURANCE_COMPANY_NAMES],
+        )
+
+    start = time.perf_counter()
+    written = write_batches(
+        engine,
+        KPI,
+        KPI_COLUMNS,
+        kpi_rows(combinations, kpis, rng),
+        batch_size,
+        use_copy,
+    )
+    # Bulk writes bypass the ORM listeners that maintain the rollups
+    # and data versions
+    with engine.begin() as conn:
+        rebuild_kpi_rollups(conn)
+        bump_data_version(conn, "kpis")
+    results["kpis"] = _rate(written, time.perf_counter() - start)
+
+    now = datetime.now()
+    start = time.perf_counter()
+    if workers <= 1:
+        written = _report_worker(
+            engine.url.render_as_string(hide_password=False),
+            combinations,
+            reports,
+            random_seed,
+            batch_size,
+            use_copy,
+            now,
+        )
+    else:
+        # Workers open their own connections; don't share pooled ones
+        engine.dispose()
+        url = engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _report_worker,
+                    url,
+                    combinations,
+                    share,
+                    random_seed + index,
+                    batch_size,
+                    use_copy,
+                    now,
+                )
+                for index, share in enumerate(_split(reports, workers))
+            ]
+            written = sum(future.result() for future in futures)
+    with engine.begin() as conn:
+        bump_data_version(conn, "reports")
+    results["reports"] = _rate(written, time.perf_counter() - start)
+    return results
+
+
+def _rate(rows: int, seconds: float) -> Dict[str, float]:
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument(
+        "--kpis", type=int, default=None, help="default: one per company/area pair"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--no-copy",
+        action="store_true",
+        help="use executemany even where COPY is available",
+    )
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    print(f"Generating into {engine.url.render_as_string()}...")
+    results = generate(
+        engine,
+        reports=args.reports,
+        kpis=args.kpis,
+        random_seed=args.seed,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        use_copy=False if args.no_copy else None,
+        allow_destructive=args.allow_destructive,
+    )
+    engine.dispose()
+
+    print(f"\n{'table':>8} {'rows':>10} {'seconds':>9} {'rows/sec':>10}")
+    for table, stats in results.items():
+        print(
+            f"{table:>8} {stats['rows']:>10} {stats['seconds']:>9.2f} "
+            f"{stats['rows_per_sec']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Service-layer and HTTP route benchmarks at several dataset sizes.
+
+Seeds a scratch SQLite database per scale, plus PostgreSQL when
+``DATABASE_URL`` points at one (that database is wiped, so it also needs
+``--allow-destructive``). Service functions are timed on a plain session,
+routes through FastAPI's TestClient against the same data. Results are
+written as JSON; pass a previous file to ``--compare`` to flag regressions.
+
+The app is imported, so SUPABASE_URL, SUPABASE_ANON_KEY and MISTRAL_API_KEY
+must be set (dummy values are fine).
+
+Usage:
+    python -m benchmarks.suite --scales 1000 100000 1000000 --output bench.json
+    python -m benchmarks.suite --scales 1000 --compare bench.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+from datetime import datetime, timezone
+
+# Read before benchmarks.common fills in its SQLite default
+USER_DATABASE_URL = os.getenv("DATABASE_URL")
+
+import sqlalchemy  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from benchmarks.common import make_engine, timed  # noqa: E402
+from benchmarks.generate_data import generate  # noqa: E402
+from database import Report, load_pool_options, to_async_url  # noqa: E402
+from service_layer.dropdown_queries import (  # noqa: E402
+    get_insurance_companies_for_dropdowns,
+    get_practice_areas_for_dropdowns,
+    reference_data_cache,
+)
+from service_layer.kpi_query import (  # noqa: E402
+    get_analytics_payload,
+    get_kpis_by_insurance_company_and_practice_area,
+)
+from service_layer.reports_query import (  # noqa: E402
+    get_report_analysis_payload,
+    get_report_by_id,
+)
+
+DEFAULT_SCALES = [1_000, 100_000, 1_000_000]
+REGRESSION_THRESHOLD = 1.2
+
+
+def _busiest_pair(session: Session) -> tuple[int, int]:
+    return session.execute(
+        select(Report.insurance_company_id, Report.practice_area_id)
+        .group_by(Report.insurance_company_id, Report.practice_area_id)
+        .order_by(func.count(Report.id).desc())
+        .limit(1)
+    ).one()
+
+
+def _report_ids(session: Session, count: int = 100) -> list[int]:
+    ids = session.scalars(select(Report.id)).all()
+    return random.Random(1).sample(ids, min(count, len(ids)))
+
+
+def bench_service_layer(engine, iterations: int) -> dict:
+    with Session(engine) as session:
+        company_id, area_id = _busiest_pair(session)
+        report_ids = itertools.cycle(_report_ids(session))
+
+        def fresh(call):
+            # New identity map per call, like a new request
+            return lambda: (call(), session.expunge_all())
+
+        targets = {
+            "get_analytics_payload": lambda: get_analytics_payload(session),
+            "get_kpis_by_insurance_company_and_practice_area": lambda: (
+                get_kpis_by_insurance_company_and_practice_area(
+                    session, company_id, area_id
+                )
+            ),
+            "get_report_analysis_payload": lambda: get_report_analysis_payload(
+                session, company_id, area_id
+            ),
+            "get_report_by_id": lambda: get_report_by_id(session, next(report_ids)),
+            "get_insurance_companies_for_dropdowns": lambda: (
+                get_insurance_companies_for_dropdowns(session)
+            ),
+            "get_practice_areas_for_dropdowns": lambda: (
+                get_practice_areas_for_dropdowns(session)
+            ),
+        }
+        return {name: timed(fresh(call), iterations) for name, call in targets.items()}
+
+
+def bench_routes(engine, iterations: int) -> dict:
+    from app import app
+    from dependencies import get_async_db
+
+    url = engine.url.render_as_string(hide_password=False)
+    async_engine = create_async_engine(
+        to_async_url(url), **load_pool_options("benchmark", url)
+    )
+    BenchSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def bench_db():
+        async with BenchSession() as db:
+            yield db
+
+    with Session(engine) as session:
+        report_ids = itertools.cycle(_report_ids(session))
+
+    app.dependency_overrides[get_async_db] = bench_db
+    # The dropdown cache would otherwise carry data over from the previous run
+    reference_data_cache.clear()
+    results = {}
+    try:
+        # localhost skips the auth check
+        with TestClient(app, base_url="http://localhost") as client:
+            try:
+                for name, path in (
+                    ("GET /dashboard", lambda: "/dashboard"),
+                    ("GET /api/analytics", lambda: "/api/analytics"),
+                    ("GET /report/{id}", lambda: f"/report/{next(report_ids)}"),
+                ):
+
+                    def request(path=path, name=name):
+                        response = client.get(path())
+                        if response.status_code != 200:
+                            raise RuntimeError(f"{name} -> {response.status_code}")
+
+                    results[name] = timed(request, iterations)
+            finally:
+                client.portal.call(async_engine.dispose)
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+    return results
+
+
+def run_scale(
+    backend: str,
+    database_url: str | None,
+    scale: int,
+    iterations: int,
+    workers: int,
+    allow_destructive: bool,
+) -> list[dict]:
+    engine = make_engine(database_url)
+    try:
+        print(f"[{backend}] seeding {scale} reports...")
+        generate(
+            engine,
+            reports=scale,
+            workers=workers,
+            allow_destructive=allow_destructive,
+        )
+        timings = {
+            **{
+                f"service.{name}": stats
+                for name, stats in bench_service_layer(engine, iterations).items()
+            },
+            **{
+                f"http.{name}": stats
+                for name, stats in bench_routes(engine, iterations).items()
+            },
+        }
+    finally:
+        engine.dispose()
+    return [
+        {"backend": backend, "scale": scale, "target": target, **stats}
+        for target, stats in timings.items()
+    ]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    """Entries whose median got slower than ``threshold`` times the baseline."""
+    before = {
+        (r["backend"], r["scale"], r["target"]): r["median_ms"]
+        for r in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        key = (result["backend"], result["scale"], result["target"])
+        if key in before and result["median_ms"] > before[key] * threshold:
+            regressions.append(
+                {
+                    "backend": key[0],
+                    "scale": key[1],
+                    "target": key[2],
+                    "baseline_ms": before[key],
+                    "median_ms": result["median_ms"],
+                    "ratio": result["median_ms"] / before[key],
+                }
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--allow-destructive", action="store_true")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    backends = [("sqlite", None)]
+    if USER_DATABASE_URL and USER_DATABASE_URL.startswith("postgresql"):
+        if args.allow_destructive:
+            backends.append(("postgresql", USER_DATABASE_URL))
+        else:
+            print(
+                "Skipping PostgreSQL: DATABASE_URL is wiped, pass --allow-destructive."
+            )
+
+    results = []
+    for backend, url in backends:
+        for scale in args.scales:
+            results.extend(
+                run_scale(
+                    backend,
+                    url,
+                    scale,
+                    args.iterations,
+                    args.workers,
+                    args.allow_destructive,
+                )
+            )
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"\n{'backend':<10} {'scale':>8} {'target':<58} {'median ms':>10} {'p95 ms':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['backend']:<10} {r['scale']:>8} {r['target']:<58} "
+            f"{r['median_ms']:>10.2f} {r['p95_ms']:>9.2f}"
+        )
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['backend']} {r['scale']} {r['target']}: "
+                f"{r['baseline_ms']:.2f} -> {r['median_ms']:.2f} ms ({r['ratio']:.2f}x)"
+            )
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
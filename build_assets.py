@@ -0,0 +1,121 @@
+"""Builds the static assets the templates link with ``asset_url``.
+
+Compiles one minified Tailwind stylesheet containing only the classes
+used in ``templates/`` and copies the scripts committed to
+``static/vendor``, each to ``static/dist`` under a content-hashed name,
+then rewrites the manifest. Rerun after changing classes in a template.
+
+The build never reaches the network. After bumping a pinned release
+below, ``--update-vendor`` downloads it into ``static/vendor``; commit
+the result.
+
+Usage:
+    python build_assets.py [--tailwind tailwindcss] [--update-vendor]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from assets import DIST_DIR, MANIFEST_PATH, STATIC_DIR
+
+TAILWIND_INPUT = STATIC_DIR / "src" / "app.css"
+VENDOR_DIR = STATIC_DIR / "vendor"
+APEXCHARTS_VERSION = "4.7.0"
+# Logical name -> (vendored file, pinned release it is updated from)
+VENDORED = {
+    "apexcharts.js": (
+        "apexcharts.min.js",
+        f"https://cdn.jsdelivr.net/npm/apexcharts@{APEXCHARTS_VERSION}"
+        "/dist/apexcharts.min.js",
+    )
+}
+
+
+def hashed_name(name: str, content: bytes) -> str:
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{suffix}"
+
+
+def build_stylesheet(tailwind: str) -> bytes:
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory, "app.css")
+        subprocess.run(
+            [
+                tailwind,
+                "--input",
+                str(TAILWIND_INPUT),
+                "--output",
+                str(output),
+                "--minify",
+            ],
+            check=True,
+        )
+        return output.read_bytes()
+
+
+def update_vendor():
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for filename, url in VENDORED.values():
+        with urllib.request.urlopen(url, timeout=30) as response:
+            (VENDOR_DIR / filename).write_bytes(response.read())
+        print(f"Fetched {url} -> {VENDOR_DIR / filename}")
+
+
+def vendored_script(filename: str) -> bytes:
+    path = VENDOR_DIR / filename
+    if not path.exists():
+        raise SystemExit(
+            f"{path} is missing; run python build_assets.py --update-vendor "
+            "and commit it"
+        )
+    return path.read_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tailwind",
+        default=os.getenv("TAILWIND_CLI", "tailwindcss"),
+        help="Tailwind CLI executable (pip install tailwindcss-bin)",
+    )
+    parser.add_argument(
+        "--update-vendor",
+        action="store_true",
+        help="download the pinned vendored scripts before building",
+    )
+    args = parser.parse_args()
+
+    if args.update_vendor:
+        update_vendor()
+    built = {"app.css": build_stylesheet(args.tailwind)}
+    for name, (filename, _url) in VENDORED.items():
+        built[name] = vendored_script(filename)
+
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name, content in built.items():
+        manifest[name] = hashed_name(name, content)
+        (DIST_DIR / manifest[name]).write_bytes(content)
+    # Drop builds no manifest entry points to anymore
+    for path in DIST_DIR.iterdir():
+        if path.name not in manifest.values():
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+    for name, filename in sorted(manifest.items()):
+        size = (DIST_DIR / filename).stat().st_size
+        print(f"{name:<16} -> {filename:<32} {size / 1024:>8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
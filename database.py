@@ -1,22 +1,128 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, create_engine
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    JSON,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    make_url,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
+from pool_stats import instrument_engine
+
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    pool_size=1,
-    max_overflow=20,
-)
+# Pool settings per deployment profile, selected with DB_POOL_PROFILE and
+# individually overridable via DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+# DB_POOL_RECYCLE and DB_ECHO.
+POOL_PROFILES = {
+    "dev": {
+        "echo": True,
+        "pool_pre_ping": True,
+        "pool_recycle": 300,
+        "pool_size": 2,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+    },
+    "prod": {
+        "echo": False,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+    },
+    "benchmark": {
+        "echo": False,
+        "pool_pre_ping": False,
+        "pool_recycle": -1,
+        "pool_size": 20,
+        "max_overflow": 0,
+        "pool_timeout": 30,
+    },
+}
+POOL_ENV_OVERRIDES = {
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+    "DB_ECHO": ("echo", lambda v: v.lower() in ("1", "true", "yes")),
+}
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+def load_pool_options(profile: str | None = None, url: str | None = None) -> dict:
+    """Engine options for a pool profile plus environment overrides.
+
+    In-memory SQLite does not use a queue pool, so its sizing options are
+    dropped.
+    """
+    profile = profile or os.getenv("DB_POOL_PROFILE", "dev")
+    if profile not in POOL_PROFILES:
+        raise ValueError(
+            f"Unknown DB_POOL_PROFILE {profile!r}, expected one of {list(POOL_PROFILES)}"
+        )
+    options = dict(POOL_PROFILES[profile])
+    for env_var, (option, parse) in POOL_ENV_OVERRIDES.items():
+        value = os.getenv(env_var)
+        if value is not None:
+            options[option] = parse(value)
+
+    if url is not None:
+        parsed = make_url(url)
+        if parsed.get_backend_name() == "sqlite" and parsed.database in (
+            None,
+            "",
+            ":memory:",
+        ):
+            for option in QUEUE_POOL_OPTIONS:
+                options.pop(option, None)
+    return options
+
+
+POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "dev")
+# Shared by the sync and async engines so both pools stay configured alike
+POOL_OPTIONS = load_pool_options(POOL_PROFILE, DATABASE_URL)
+
+engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the sync URLs in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Maps a sync database URL onto its asyncio driver."""
+    sync_url = make_url(url)
+    if sync_url.get_dialect().is_async:
+        return url
+    drivername = ASYNC_DRIVERS.get(sync_url.get_backend_name(), sync_url.drivername)
+    return sync_url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+async_engine = create_async_engine(to_async_url(DATABASE_URL), **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+pool_stats = {
+    "sync": instrument_engine(engine),
+    "async": instrument_engine(async_engine.sync_engine),
+}
+
 
 Base = declarative_base()
 
@@ -49,6 +155,11 @@ class KPI(Base):
     insurance_company = relationship("InsuranceCompany", backref="kpis")
     practice_area = relationship("PracticeArea", backref="kpis")
 
+    # Every 360 analysis filters on (company, area)
+    __table_args__ = (
+        Index("ix_kpis_company_area", "insurance_company_id", "practice_area_id"),
+    )
+
 
 class Report(Base):
     __tablename__ = "reports"
@@ -66,3 +177,84 @@ class Report(Base):
 
     insurance_company = relationship("InsuranceCompany", backref="reports")
     practice_area = relationship("PracticeArea", backref="reports")
+
+    # Serves the (company, area) lookup and returns the newest reports first
+    __table_args__ = (
+        Index(
+            "ix_reports_company_area_date",
+            "insurance_company_id",
+            "practice_area_id",
+            report_date.desc(),
+        ),
+    )
+
+
+class KPIAreaRollup(Base):
+    """Fee totals per practice area, kept in sync with ``kpis``."""
+
+    __tablename__ = "kpi_area_rollups"
+    practice_area_id = Column(
+        Integer, ForeignKey("practice_areas.id"), primary_key=True
+    )
+    incoming_fees = Column(BigInteger, nullable=False, default=0)
+    fees_collected = Column(BigInteger, nullable=False, default=0)
+    kpi_count = Column(Integer, nullable=False, default=0)
+
+
+class KPICompanyRollup(Base):
+    """Mandate totals per insurance company, kept in sync with ``kpis``."""
+
+    __tablename__ = "kpi_company_rollups"
+    insurance_company_id = Column(
+        Integer, ForeignKey("insurance_companies.id"), primary_key=True
+    )
+    new_mandates = Column(BigInteger, nullable=False, default=0)
+    kpi_count = Column(Integer, nullable=False, default=0)
+
+
+class AnalysisJob(Base):
+    """A queued, running or finished 360 analysis of one company/area pair.
+
+    ``batch_id`` groups the jobs of one precompute run so an interrupted run
+    can be resumed; on-demand jobs have none.
+    """
+
+    __tablename__ = "analysis_jobs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    insurance_company_id = Column(
+        Integer, ForeignKey("insurance_companies.id"), nullable=False
+    )
+    practice_area_id = Column(Integer, ForeignKey("practice_areas.id"), nullable=False)
+    batch_id = Column(String, nullable=True)
+
+    status = Column(String, nullable=False, default="queued")
+    params = Column(JSON, nullable=False, default=dict)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Latest finished analysis of a pair
+        Index(
+            "ix_analysis_jobs_company_area_status",
+            "insurance_company_id",
+            "practice_area_id",
+            "status",
+            finished_at.desc(),
+        ),
+        Index("ix_analysis_jobs_batch", "batch_id"),
+    )
+
+
+class DataVersion(Base):
+    """Write counter per data scope (``kpis``, ``reports``) for HTTP caching."""
+
+    __tablename__ = "data_versions"
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
@@ -1,10 +1,16 @@
-from fastapi import HTTPException, Request, status
+from typing import Optional
 
-from database import SessionLocal
+import jwt
+from fastapi import Depends, HTTPException, Request, status
+
+from auth import AUTH_REMOTE_FALLBACK, SigningKeyUnavailable, token_verifier
+from database import AsyncSessionLocal, SessionLocal
 from supabase_client import supabase
 
 
 def get_db():
+    # The connection is checked out on the first query, so requests served
+    # from caches never touch the pool
     db = SessionLocal()
     try:
         yield db
@@ -12,24 +18,72 @@ def get_db():
         db.close()
 
 
-def get_current_user(request: Request):
-    if request.url.hostname in ["localhost", "127.0.0.1"]:
-        return None
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_session_factory():
+    """For routes that run lookups concurrently, one session each."""
+    return AsyncSessionLocal
+
+
+def _request_token(request: Request) -> Optional[str]:
     token = request.cookies.get("access_token")
     if not token:
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split(" ")[1]
+    return token
+
+
+def _remote_user(token: str):
+    try:
+        user_data = supabase.auth.get_user(token)
+        return user_data.user
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired"
+        )
+
+
+def get_current_user(request: Request):
+    """Verifies the access token locally (see :mod:`auth`); the user is
+    resolved once per request and kept on ``request.state``."""
+    if request.url.hostname in ["localhost", "127.0.0.1"]:
+        return None
+    if hasattr(request.state, "user"):
+        return request.state.user
 
+    token = _request_token(request)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Log in required"
         )
 
     try:
-        user_data = supabase.auth.get_user(token)
-        return user_data.user
-    except Exception:
+        user = token_verifier.verify(token)
+    except SigningKeyUnavailable:
+        if not AUTH_REMOTE_FALLBACK:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired"
+            )
+        user = _remote_user(token)
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired"
         )
+
+    request.state.user = user
+    return user
+
+
+def get_user_profile(request: Request, user=Depends(get_current_user)):
+    """The full Supabase user (sign-in times, identities) for the profile
+    page, which the token claims do not carry. Falls back to the claims."""
+    if user is None:
+        return None
+    try:
+        return supabase.auth.get_user(_request_token(request)).user
+    except Exception:
+        return user
@@ -6,7 +6,9 @@ from faker import Faker
 from sqlalchemy import create_engine, delete
 from sqlalchemy.orm import sessionmaker
 
-from database import KPI, Base, InsuranceCompany, PracticeArea, Report
+from database import KPI, AnalysisJob, Base, InsuranceCompany, PracticeArea, Report
+import service_layer.data_version  # noqa: F401  (registers the version listeners)
+from service_layer.kpi_rollup import rebuild_kpi_rollups
 
 # Setup
 load_dotenv()
@@ -17,10 +19,106 @@ engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 session = Session()
 
+# Content source for the demo seed and benchmarks/generate_data.py
+PRACTICE_AREA_NAMES = [
+    "Verkehrsrecht",
+    "Haftpflichtrecht",
+    "Versicherungsbetrug",
+    "Personenschaden",
+    "Sachversicherungsrecht",
+    "D&O Versicherung",
+    "Rechtsschutz",
+    "Cyber-Risiken",
+    "Arbeitsrecht (AVB)",
+]
+
+INSURANCE_COMPANY_NAMES = [
+    "Allianz SE",
+    "AXA Konzern AG",
+    "HUK-COBURG",
+    "Signal Iduna",
+    "R+V Versicherung",
+    "Ergo Group",
+    "DEVK Versicherungen",
+    "Generali Deutschland",
+    "Barmenia",
+    "Gothaer",
+    "VHV Versicherungen",
+]
+
+DEPARTMENTS = [
+    "Schadenabteilung",
+    "Rechtsabteilung",
+    "Betrugsprävention",
+    "Zentraler Regress",
+    "Compliance",
+    "Key Account",
+]
+
+CITIES = [
+    "Berlin",
+    "München",
+    "Hamburg",
+    "Köln",
+    "Frankfurt",
+    "Stuttgart",
+    "Hannover",
+    "Düsseldorf",
+]
+
+REPORT_TEMPLATES = [
+    # Strategie & Akquise
+    "Strategiemeeting mit {co_name} in {city}. {person} plant die Ausweitung der Zusammenarbeit im Bereich {area}.",
+    "Vorstellung unserer neuen digitalen Schnittstelle in der {dept}. Ziel ist die papierlose Aktenübertragung bei {area}-Fällen.",
+    "Pitch-Termin bei der {dept}. Diskussion über Pauschalhonorar-Modelle für standardisierte {area}-Verfahren.",
+    "Marktanalyse mit {person}: Wettbewerbsvergleich der Schadenquoten im Segment {area}.",
+    "Sondierungsgespräch über die Übernahme eines Altschaden-Portfolios im Bereich {area}.",
+    "Diskussion über Kapazitätserweiterungen: {co_name} benötigt zusätzliche Ressourcen in der {dept}.",
+    "Präsentation der Kanzlei-Erfolgsbilanz vor dem Vorstand. Fokus auf Kosteneinsparung bei {area}.",
+    "Abstimmung über Key-Performance-Indikatoren (KPI) für das nächste Quartal mit {person}.",
+    # Fachliches & Recht
+    "Inhouse-Schulung für Sachbearbeiter der {dept}. Thema: 'Aktuelle Beweislastumkehr im {area}'.",
+    "Sonderbericht zu einer Grundsatzentscheidung im {area}. {person} bittet um Einschätzung der Auswirkungen.",
+    "Workshop zur Betrugsprävention im Bereich {area}. Identifikation neuer Auffälligkeitsmuster in {city}.",
+    "Fachvortrag zum Thema 'Digitalisierung der Beweisaufnahme' im {area}. {person} war sehr interessiert.",
+    "Update-Termin: Neue Richtlinien der BaFin zur Schadenregulierung im Bereich {area}.",
+    "Deep-Dive-Session: Analyse der Rechtsprechung des OLG zur Kausalität im {area}.",
+    "Erstellung eines Leitfadens für die {dept} zur Erstbewertung von {area}-Schäden.",
+    "Diskussion über die Auswirkungen der neuen Gesetzesänderung auf laufende {area}-Mandate.",
+    # Operatives & Controlling
+    "Review der Durchlaufzeiten im Bereich {area}. {person} mahnt eine schnellere Bearbeitung an.",
+    "Audit-Termin durch {co_name}. Die Prüfung der {dept} ergab eine exzellente Einhaltung der SLA.",
+    "Besprechung von komplexen Großschadenfällen im {area}. Strategiewechsel durch {person} empfohlen.",
+    "Qualitätskontrolle der Aktenführung in der {dept}. Keine nennenswerten Beanstandungen im {area}.",
+    "Analyse der Prozessverluste im letzten Halbjahr. {person} fordert Ursachenforschung für {area}.",
+    "Abstimmung der Vergleichs-Vollmachten: {co_name} erhöht das Limit für Vergleiche im {area}.",
+    "Reporting-Termin: Vorstellung der Einsparungen durch konsequente Regressprüfung im {area}.",
+    "Prüfung der Rückstellungsbildung für drohende Großschäden im {area} gemeinsam mit der {dept}.",
+    # Beziehungsmanagement
+    "Informeller Austausch mit {person} ({dept}) am Rande der Fachkonferenz in {city}.",
+    "Jahresabschlussgespräch mit der Leitung der {dept}. Dank für die kompetente Vertretung im {area}.",
+    "Klärung von Abrechnungsdifferenzen bei {co_name}. {person} bestätigt die Freigabe der Honorarnoten.",
+    "Lunch-Termin with {person}: Networking und Austausch über Markttrends in der {area}-Sparte.",
+    "Besuch der neuen Räumlichkeiten der {dept}. Kurzes Update zu laufenden Projekten im {area}.",
+    "Feedback-Gespräch: {person} lobt die Erreichbarkeit unserer Anwälte bei {area}-Anfragen.",
+    "Teilnahme am Sommerfest von {co_name}. Vertiefung der Kontakte zur gesamten {dept}.",
+    "Glückwünsche zur Beförderung von {person}. Neue Zuständigkeiten im Bereich {area}.",
+    # Sonderfälle
+    "Eilige Prüfung einer Deckungszusage für ein medienwirksames Verfahren im {area}.",
+    "Task-Force-Meeting zur Bekämpfung organisierter Kriminalität im {area}-Sektor der {dept}.",
+    "Unterstützung bei einer internen Revision von {co_name} bezüglich {area}-Prozessen.",
+    "Ad-hoc-Einsatz wegen eines drohenden Reputationsschadens im Bereich {area}.",
+    "Besprechung der Digitalisierungsstrategie 2026 für die Sparte {area} with {person}.",
+    "Vorbereitung einer Panel-Diskussion zum Thema {area} mit Vertretern der {dept}.",
+    "Analyse von Deckungslücken in neuen Versicherungsprodukten der {co_name} ({area}).",
+    "Quartals-Review der Prozesskostenentwicklung im Fachbereich {area}.",
+]
+
 
 def clear_database():
     """Wipes data in correct order to respect Foreign Key constraints."""
     print("Cleaning database...")
+    session.execute(delete(AnalysisJob))
     session.execute(delete(Report))
     session.execute(delete(KPI))
     session.execute(delete(InsuranceCompany))
@@ -33,36 +131,12 @@ def populate_database(number_of_rows: int):
     clear_database()
 
     # 1. Practice Areas
-    practice_names = [
-        "Verkehrsrecht",
-        "Haftpflichtrecht",
-        "Versicherungsbetrug",
-        "Personenschaden",
-        "Sachversicherungsrecht",
-        "D&O Versicherung",
-        "Rechtsschutz",
-        "Cyber-Risiken",
-        "Arbeitsrecht (AVB)",
-    ]
-    p_areas = [PracticeArea(name=name) for name in practice_names]
+    p_areas = [PracticeArea(name=name) for name in PRACTICE_AREA_NAMES]
     session.add_all(p_areas)
     session.flush()
 
     # 2. Insurance Companies
-    insurance_names = [
-        "Allianz SE",
-        "AXA Konzern AG",
-        "HUK-COBURG",
-        "Signal Iduna",
-        "R+V Versicherung",
-        "Ergo Group",
-        "DEVK Versicherungen",
-        "Generali Deutschland",
-        "Barmenia",
-        "Gothaer",
-        "VHV Versicherungen",
-    ]
-    companies = [InsuranceCompany(name=name) for name in insurance_names]
+    companies = [InsuranceCompany(name=name) for name in INSURANCE_COMPANY_NAMES]
     session.add_all(companies)
     session.flush()
 
@@ -91,85 +165,18 @@ def populate_database(number_of_rows: int):
 
     print(f"Generating {number_of_rows} Reports...")
 
-    departments = [
-        "Schadenabteilung",
-        "Rechtsabteilung",
-        "Betrugsprävention",
-        "Zentraler Regress",
-        "Compliance",
-        "Key Account",
-    ]
-    cities = [
-        "Berlin",
-        "München",
-        "Hamburg",
-        "Köln",
-        "Frankfurt",
-        "Stuttgart",
-        "Hannover",
-        "Düsseldorf",
-    ]
-
-    report_templates = [
-        # Strategie & Akquise
-        "Strategiemeeting mit {co_name} in {city}. {person} plant die Ausweitung der Zusammenarbeit im Bereich {area}.",
-        "Vorstellung unserer neuen digitalen Schnittstelle in der {dept}. Ziel ist die papierlose Aktenübertragung bei {area}-Fällen.",
-        "Pitch-Termin bei der {dept}. Diskussion über Pauschalhonorar-Modelle für standardisierte {area}-Verfahren.",
-        "Marktanalyse mit {person}: Wettbewerbsvergleich der Schadenquoten im Segment {area}.",
-        "Sondierungsgespräch über die Übernahme eines Altschaden-Portfolios im Bereich {area}.",
-        "Diskussion über Kapazitätserweiterungen: {co_name} benötigt zusätzliche Ressourcen in der {dept}.",
-        "Präsentation der Kanzlei-Erfolgsbilanz vor dem Vorstand. Fokus auf Kosteneinsparung bei {area}.",
-        "Abstimmung über Key-Performance-Indikatoren (KPI) für das nächste Quartal mit {person}.",
-        # Fachliches & Recht
-        "Inhouse-Schulung für Sachbearbeiter der {dept}. Thema: 'Aktuelle Beweislastumkehr im {area}'.",
-        "Sonderbericht zu einer Grundsatzentscheidung im {area}. {person} bittet um Einschätzung der Auswirkungen.",
-        "Workshop zur Betrugsprävention im Bereich {area}. Identifikation neuer Auffälligkeitsmuster in {city}.",
-        "Fachvortrag zum Thema 'Digitalisierung der Beweisaufnahme' im {area}. {person} war sehr interessiert.",
-        "Update-Termin: Neue Richtlinien der BaFin zur Schadenregulierung im Bereich {area}.",
-        "Deep-Dive-Session: Analyse der Rechtsprechung des OLG zur Kausalität im {area}.",
-        "Erstellung eines Leitfadens für die {dept} zur Erstbewertung von {area}-Schäden.",
-        "Diskussion über die Auswirkungen der neuen Gesetzesänderung auf laufende {area}-Mandate.",
-        # Operatives & Controlling
-        "Review der Durchlaufzeiten im Bereich {area}. {person} mahnt eine schnellere Bearbeitung an.",
-        "Audit-Termin durch {co_name}. Die Prüfung der {dept} ergab eine exzellente Einhaltung der SLA.",
-        "Besprechung von komplexen Großschadenfällen im {area}. Strategiewechsel durch {person} empfohlen.",
-        "Qualitätskontrolle der Aktenführung in der {dept}. Keine nennenswerten Beanstandungen im {area}.",
-        "Analyse der Prozessverluste im letzten Halbjahr. {person} fordert Ursachenforschung für {area}.",
-        "Abstimmung der Vergleichs-Vollmachten: {co_name} erhöht das Limit für Vergleiche im {area}.",
-        "Reporting-Termin: Vorstellung der Einsparungen durch konsequente Regressprüfung im {area}.",
-        "Prüfung der Rückstellungsbildung für drohende Großschäden im {area} gemeinsam mit der {dept}.",
-        # Beziehungsmanagement
-        "Informeller Austausch mit {person} ({dept}) am Rande der Fachkonferenz in {city}.",
-        "Jahresabschlussgespräch mit der Leitung der {dept}. Dank für die kompetente Vertretung im {area}.",
-        "Klärung von Abrechnungsdifferenzen bei {co_name}. {person} bestätigt die Freigabe der Honorarnoten.",
-        "Lunch-Termin with {person}: Networking und Austausch über Markttrends in der {area}-Sparte.",
-        "Besuch der neuen Räumlichkeiten der {dept}. Kurzes Update zu laufenden Projekten im {area}.",
-        "Feedback-Gespräch: {person} lobt die Erreichbarkeit unserer Anwälte bei {area}-Anfragen.",
-        "Teilnahme am Sommerfest von {co_name}. Vertiefung der Kontakte zur gesamten {dept}.",
-        "Glückwünsche zur Beförderung von {person}. Neue Zuständigkeiten im Bereich {area}.",
-        # Sonderfälle
-        "Eilige Prüfung einer Deckungszusage für ein medienwirksames Verfahren im {area}.",
-        "Task-Force-Meeting zur Bekämpfung organisierter Kriminalität im {area}-Sektor der {dept}.",
-        "Unterstützung bei einer internen Revision von {co_name} bezüglich {area}-Prozessen.",
-        "Ad-hoc-Einsatz wegen eines drohenden Reputationsschadens im Bereich {area}.",
-        "Besprechung der Digitalisierungsstrategie 2026 für die Sparte {area} with {person}.",
-        "Vorbereitung einer Panel-Diskussion zum Thema {area} mit Vertretern der {dept}.",
-        "Analyse von Deckungslücken in neuen Versicherungsprodukten der {co_name} ({area}).",
-        "Quartals-Review der Prozesskostenentwicklung im Fachbereich {area}.",
-    ]
-
     for i in range(number_of_rows):
         # Anchor to a valid combination
         co, area = random.choice(active_combinations)
-        dept = random.choice(departments)
-        city = random.choice(cities)
+        dept = random.choice(DEPARTMENTS)
+        city = random.choice(CITIES)
         person = (
             f"{fake.prefix()} {fake.last_name()}"
             if random.random() > 0.4
             else fake.name()
         )
 
-        base_text = random.choice(report_templates).format(
+        base_text = random.choice(REPORT_TEMPLATES).format(
             area=area.name, person=person, dept=dept, co_name=co.name, city=city
         )
 
@@ -191,6 +198,7 @@ def populate_database(number_of_rows: int):
         if i % 100 == 0:
             session.flush()
 
+    rebuild_kpi_rollups(session.connection())
     session.commit()
     print(
         f"Done! Database populated with {number_of_rows} reports using all templates and correct relational pairs."
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PoolStats:
+    """Connection-pool telemetry for one engine, fed by SQLAlchemy events.
+
+    ``checkout_wait`` is the time spent getting a connection from the pool,
+    including any new connects; ``connect`` is the DBAPI connect latency alone.
+    Both are measured when a session first needs its connection, so requests
+    that never query don't check one out.
+    """
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {
+                "connects": 0,
+                "closes": 0,
+                "invalidations": 0,
+                "checkouts": 0,
+                "checkins": 0,
+            }
+            self._timings = {
+                "connect": [0, 0.0, 0.0],
+                "checkout_wait": [0, 0.0, 0.0],
+            }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _record(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            timing = self._timings[name]
+            timing[0] += 1
+            timing[1] += elapsed_ms
+            timing[2] = max(timing[2], elapsed_ms)
+
+    def snapshot(self) -> dict:
+        pool = self._engine.pool
+        gauges = {
+            name: getattr(pool, name)()
+            for name in ("size", "checkedin", "checkedout", "overflow")
+            if hasattr(pool, name)
+        }
+        with self._lock:
+            timings = {
+                f"{name}_ms": {
+                    "count": count,
+                    "avg": total / count if count else 0.0,
+                    "max": worst,
+                }
+                for name, (count, total, worst) in self._timings.items()
+            }
+            return {
+                "pool": type(pool).__name__,
+                **gauges,
+                **self._counters,
+                **timings,
+            }
+
+
+def instrument_engine(engine: Engine) -> PoolStats:
+    """Attaches pool and connect listeners to ``engine`` (a sync engine; pass
+    ``async_engine.sync_engine`` for async ones)."""
+    stats = PoolStats(engine)
+
+    # The pool has no event before a checkout starts, so its connect() is
+    # timed directly; dispose() replaces the pool, which is then timed anew
+    def _time_checkouts(pool):
+        checkout = pool.connect
+
+        def timed_checkout():
+            start = time.perf_counter()
+            try:
+                return checkout()
+            finally:
+                stats._record("checkout_wait", (time.perf_counter() - start) * 1000)
+
+        pool.connect = timed_checkout
+
+    _time_checkouts(engine.pool)
+    event.listen(engine, "engine_disposed", lambda engine: _time_checkouts(engine.pool))
+
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, conn_rec, cargs, cparams):
+        start = time.perf_counter()
+        connection = dialect.connect(*cargs, **cparams)
+        stats._record("connect", (time.perf_counter() - start) * 1000)
+        stats._count("connects")
+        return connection
+
+    for pool_event, counter in (
+        ("checkout", "checkouts"),
+        ("checkin", "checkins"),
+        ("close", "closes"),
+        ("invalidate", "invalidations"),
+    ):
+        event.listen(
+            engine,
+            pool_event,
+            lambda *args, _counter=counter: stats._count(_counter),
+        )
+
+    return stats
@@ -0,0 +1,24 @@
+from typing import Any, Optional
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+# What an analysis echoes back of its inputs; clients that already hold the
+# KPIs and reports can leave them out
+ECHOED_DATA_FIELDS = {"kpi_data", "visit_reports"}
+
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON rendered by pydantic-core in a single pass.
+
+    Takes models, lists of models and plain dicts alike; ``exclude`` uses
+    Pydantic's nested include/exclude syntax. Routes return it directly,
+    which skips FastAPI's ``jsonable_encoder`` walk over every nested item.
+    """
+
+    def __init__(self, content: Any, *args, exclude: Optional[Any] = None, **kwargs):
+        self.exclude = exclude
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content, exclude=self.exclude)
@@ -0,0 +1,179 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import KPI, AnalysisJob
+
+
+class AnalysisJobSchema(BaseModel):
+    """State of an analysis job; ``result`` is set once it succeeded."""
+
+    id: int
+    insurance_company_id: int
+    practice_area_id: int
+    batch_id: Optional[str]
+    status: str
+    params: Dict[str, Any]
+    attempts: int
+    error: Optional[str]
+    result: Optional[Dict[str, Any]]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+async def create_job_async(
+    session: AsyncSession,
+    insurance_company_id: int,
+    practice_area_id: int,
+    params: Optional[Dict[str, Any]] = None,
+    batch_id: Optional[str] = None,
+) -> AnalysisJobSchema:
+    job = AnalysisJob(
+        insurance_company_id=insurance_company_id,
+        practice_area_id=practice_area_id,
+        batch_id=batch_id,
+        status="queued",
+        params=params or {},
+        attempts=0,
+        created_at=datetime.now(),
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return AnalysisJobSchema.model_validate(job)
+
+
+async def get_job_async(
+    session: AsyncSession, job_id: int
+) -> Optional[AnalysisJobSchema]:
+    job = await session.get(AnalysisJob, job_id)
+    return AnalysisJobSchema.model_validate(job) if job else None
+
+
+async def mark_job_running_async(
+    session: AsyncSession, job_id: int
+) -> AnalysisJobSchema:
+    """Starts the next attempt of a job."""
+    job = await session.get(AnalysisJob, job_id)
+    job.status = "running"
+    job.attempts += 1
+    job.error = None
+    job.started_at = datetime.now()
+    await session.commit()
+    return AnalysisJobSchema.model_validate(job)
+
+
+async def finish_job_async(
+    session: AsyncSession,
+    job_id: int,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Stores the result, or the error of the final failed attempt."""
+    job = await session.get(AnalysisJob, job_id)
+    job.status = "failed" if error is not None else "succeeded"
+    job.result = result
+    job.error = error
+    job.finished_at = datetime.now()
+    await session.commit()
+
+
+async def get_unfinished_jobs_async(session: AsyncSession) -> List[AnalysisJobSchema]:
+    """Queued or running jobs submitted outside a precompute batch, oldest
+    first."""
+    statement = (
+        select(AnalysisJob)
+        .where(
+            AnalysisJob.status.in_(("queued", "running")),
+            AnalysisJob.batch_id.is_(None),
+        )
+        .order_by(AnalysisJob.id)
+    )
+    jobs = (await session.execute(statement)).scalars().all()
+    return [AnalysisJobSchema.model_validate(job) for job in jobs]
+
+
+async def get_latest_result_async(
+    session: AsyncSession, insurance_company_id: int, practice_area_id: int
+) -> Optional[AnalysisJobSchema]:
+    """The most recently finished successful analysis of a pair."""
+    statement = (
+        select(AnalysisJob)
+        .where(
+            AnalysisJob.insurance_company_id == insurance_company_id,
+            AnalysisJob.practice_area_id == practice_area_id,
+            AnalysisJob.status == "succeeded",
+        )
+        .order_by(AnalysisJob.finished_at.desc())
+        .limit(1)
+    )
+    job = (await session.execute(statement)).scalar_one_or_none()
+    return AnalysisJobSchema.model_validate(job) if job else None
+
+
+async def get_recent_results_async(
+    session: AsyncSession, limit: int = 5
+) -> List[AnalysisJobSchema]:
+    """The latest successful analysis of the ``limit`` most recently
+    analysed pairs, newest first."""
+    latest = (
+        select(
+            AnalysisJob.insurance_company_id,
+            AnalysisJob.practice_area_id,
+            func.max(AnalysisJob.finished_at).label("finished_at"),
+        )
+        .where(AnalysisJob.status == "succeeded")
+        .group_by(AnalysisJob.insurance_company_id, AnalysisJob.practice_area_id)
+        .subquery()
+    )
+    statement = (
+        select(AnalysisJob)
+        .join(
+            latest,
+            and_(
+                AnalysisJob.insurance_company_id == latest.c.insurance_company_id,
+                AnalysisJob.practice_area_id == latest.c.practice_area_id,
+                AnalysisJob.finished_at == latest.c.finished_at,
+            ),
+        )
+        .where(AnalysisJob.status == "succeeded")
+        .order_by(AnalysisJob.finished_at.desc(), AnalysisJob.id.desc())
+        .limit(limit)
+    )
+    jobs = (await session.execute(statement)).scalars().all()
+    return [AnalysisJobSchema.model_validate(job) for job in jobs]
+
+
+async def get_batch_jobs_async(
+    session: AsyncSession, batch_id: str
+) -> Dict[Tuple[int, int], AnalysisJobSchema]:
+    """Jobs of a precompute run by (company, area); the newest per pair."""
+    statement = (
+        select(AnalysisJob)
+        .where(AnalysisJob.batch_id == batch_id)
+        .order_by(AnalysisJob.id)
+    )
+    jobs = (await session.execute(statement)).scalars().all()
+    return {
+        (
+            job.insurance_company_id,
+            job.practice_area_id,
+        ): AnalysisJobSchema.model_validate(job)
+        for job in jobs
+    }
+
+
+async def get_active_pairs_async(session: AsyncSession) -> List[Tuple[int, int]]:
+    """Every (company, area) pair that has KPIs."""
+    statement = (
+        select(KPI.insurance_company_id, KPI.practice_area_id)
+        .distinct()
+        .order_by(KPI.insurance_company_id, KPI.practice_area_id)
+    )
+    return [tuple(row) for row in (await session.execute(statement)).all()]
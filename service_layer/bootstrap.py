@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from service_layer.analysis_jobs import AnalysisJobSchema, get_recent_results_async
+from service_layer.dropdown_queries import (
+    get_insurance_companies_for_dropdowns_cached_async,
+    get_practice_areas_for_dropdowns_cached_async,
+)
+from service_layer.kpi_query import get_analytics_payload_async
+
+T = TypeVar("T")
+
+
+class BootstrapSchema(BaseModel):
+    """Everything the dashboard and analytics pages load after the HTML."""
+
+    insurance_companies: List[dict]
+    practice_areas: List[dict]
+    analytics: Dict[str, Any]
+    recent_analyses: List[AnalysisJobSchema]
+
+
+async def _in_own_session(
+    session_factory: async_sessionmaker,
+    lookup: Callable[[AsyncSession], Awaitable[T]],
+) -> T:
+    # A session runs one query at a time, so concurrent lookups need their own
+    async with session_factory() as session:
+        return await lookup(session)
+
+
+async def get_bootstrap_payload_async(
+    session_factory: async_sessionmaker, recent_limit: int = 5
+) -> BootstrapSchema:
+    """Runs the page lookups concurrently, each in its own session.
+
+    Cached dropdowns never check out a connection; the others hold one
+    each for the duration of their query.
+    """
+    companies, areas, analytics, recent = await asyncio.gather(
+        _in_own_session(
+            session_factory,
+            lambda session: get_insurance_companies_for_dropdowns_cached_async(
+                db_session=session
+            ),
+        ),
+        _in_own_session(
+            session_factory,
+            lambda session: get_practice_areas_for_dropdowns_cached_async(
+                db_session=session
+            ),
+        ),
+        _in_own_session(session_factory, get_analytics_payload_async),
+        _in_own_session(
+            session_factory,
+            lambda session: get_recent_results_async(session, limit=recent_limit),
+        ),
+    )
+    return BootstrapSchema(
+        insurance_companies=companies,
+        practice_areas=areas,
+        analytics=analytics,
+        recent_analyses=recent,
+    )
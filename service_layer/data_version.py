@@ -0,0 +1,122 @@
+"""Write counters for HTTP caching of KPI and report data.
+
+ORM writes to ``kpis`` and ``reports`` bump the version of their scope
+within the same transaction; bulk ORM statements bump it as well. Core
+inserts that bypass the ORM (bulk loaders, benchmarks) must call
+:func:`bump_data_version` themselves.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import KPI, DataVersion, Report
+from service_layer.kpi_rollup import UPSERT_DIALECTS
+
+VERSIONED_MODELS = {KPI: "kpis", Report: "reports"}
+
+
+class DataVersionSchema(BaseModel):
+    scope: str
+    version: int = 0
+    updated_at: Optional[datetime] = None
+
+
+def bump_data_version(conn: Connection, scope: str) -> None:
+    """Counts one write to ``scope``."""
+    now = datetime.now()
+    dialect_insert = UPSERT_DIALECTS.get(conn.dialect.name)
+    if dialect_insert is None:
+        updated = conn.execute(
+            update(DataVersion)
+            .where(DataVersion.scope == scope)
+            .values(version=DataVersion.version + 1, updated_at=now)
+        ).rowcount
+        if not updated:
+            conn.execute(
+                insert(DataVersion).values(scope=scope, version=1, updated_at=now)
+            )
+        return
+    statement = dialect_insert(DataVersion).values(
+        scope=scope, version=1, updated_at=now
+    )
+    conn.execute(
+        statement.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={"version": DataVersion.version + 1, "updated_at": now},
+        )
+    )
+
+
+def _version_statement(scope: str):
+    return select(DataVersion.version, DataVersion.updated_at).where(
+        DataVersion.scope == scope
+    )
+
+
+def _to_schema(scope: str, row) -> DataVersionSchema:
+    if row is None:
+        return DataVersionSchema(scope=scope)
+    return DataVersionSchema(
+        scope=scope, version=row.version, updated_at=row.updated_at
+    )
+
+
+def get_data_version(session: Session, scope: str) -> DataVersionSchema:
+    return _to_schema(scope, session.execute(_version_statement(scope)).first())
+
+
+async def get_data_version_async(
+    session: AsyncSession, scope: str
+) -> DataVersionSchema:
+    """Async variant of :func:`get_data_version`."""
+    row = (await session.execute(_version_statement(scope))).first()
+    return _to_schema(scope, row)
+
+
+def _track_write(mapper, connection, target):
+    session = inspect(target).session
+    session.info.setdefault("data_version_scopes", set()).add(
+        VERSIONED_MODELS[mapper.class_]
+    )
+
+
+for _model in VERSIONED_MODELS:
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _track_write)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_written_scopes(session, flush_context):
+    scopes = session.info.pop("data_version_scopes", None)
+    if not scopes:
+        return
+    conn = session.connection()
+    for scope in sorted(scopes):
+        bump_data_version(conn, scope)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_scopes(session):
+    session.info.pop("data_version_scopes", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_after_bulk_statement(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if (
+        orm_execute_state.is_select
+        or mapper is None
+        or mapper.class_ not in VERSIONED_MODELS
+    ):
+        return None
+    result = orm_execute_state.invoke_statement()
+    bump_data_version(
+        orm_execute_state.session.connection(), VERSIONED_MODELS[mapper.class_]
+    )
+    return result
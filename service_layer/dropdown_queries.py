@@ -1,9 +1,125 @@
-from typing import List
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
-from requests import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from database import InsuranceCompany, PracticeArea
 
+REFERENCE_MODELS = (InsuranceCompany, PracticeArea)
+
+
+class ReferenceDataCache:
+    """Process-wide TTL cache for rarely changing dropdown data.
+
+    Every invalidation bumps :attr:`generation`. Readers take it before
+    querying and pass it to :meth:`set`, which drops the value if an
+    invalidation happened meanwhile, so a query that raced a write never
+    caches what it read before that write.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, List[dict]]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[0]:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: List[dict], generation: int) -> None:
+        """Stores ``value`` unless the cache was invalidated after
+        ``generation`` was read."""
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (self._clock() + self.ttl_seconds, value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            # Still bumped: reads started before the clear must not store
+            self.generation += 1
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+reference_data_cache = ReferenceDataCache(
+    ttl_seconds=float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def _touches_reference_data(session: Session) -> bool:
+    return any(
+        isinstance(obj, REFERENCE_MODELS)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_reference_data_changes(session, flush_context, instances):
+    if _touches_reference_data(session):
+        session.info["reference_data_changed"] = True
+        reference_data_cache.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_reference_data_bulk_changes(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_select or mapper is None:
+        return
+    if mapper.class_ in REFERENCE_MODELS:
+        orm_execute_state.session.info["reference_data_changed"] = True
+        reference_data_cache.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Readers may have re-filled the cache between flush and commit
+    if session.info.pop("reference_data_changed", False):
+        reference_data_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_changes(session):
+    session.info.pop("reference_data_changed", None)
+
+
+def _insurance_companies_statement():
+    return select(InsuranceCompany.id, InsuranceCompany.name)
+
+
+def _practice_areas_statement():
+    return select(PracticeArea.id, PracticeArea.name)
+
 
 def get_insurance_companies_for_dropdowns(db_session: Session) -> List[dict]:
     """
@@ -15,7 +131,7 @@ def get_insurance_companies_for_dropdowns(db_session: Session) -> List[dict]:
     Returns:
         A list of dictionaries containing insurance company names and IDs.
     """
-    insurance_companies = db_session.query(InsuranceCompany).all()
+    insurance_companies = db_session.execute(_insurance_companies_statement()).all()
     return [{"id": company.id, "name": company.name} for company in insurance_companies]
 
 
@@ -29,5 +145,65 @@ def get_practice_areas_for_dropdowns(db_session: Session) -> List[dict]:
     Returns:
         A list of dictionaries containing practice area names and IDs.
     """
-    practice_areas = db_session.query(PracticeArea).all()
+    practice_areas = db_session.execute(_practice_areas_statement()).all()
     return [{"id": area.id, "name": area.name} for area in practice_areas]
+
+
+async def get_insurance_companies_for_dropdowns_async(
+    db_session: AsyncSession,
+) -> List[dict]:
+    """Async variant of :func:`get_insurance_companies_for_dropdowns`."""
+    result = await db_session.execute(_insurance_companies_statement())
+    return [{"id": company.id, "name": company.name} for company in result.all()]
+
+
+async def get_practice_areas_for_dropdowns_async(
+    db_session: AsyncSession,
+) -> List[dict]:
+    """Async variant of :func:`get_practice_areas_for_dropdowns`."""
+    result = await db_session.execute(_practice_areas_statement())
+    return [{"id": area.id, "name": area.name} for area in result.all()]
+
+
+def get_insurance_companies_for_dropdowns_cached(db_session: Session) -> List[dict]:
+    """Cached variant of :func:`get_insurance_companies_for_dropdowns`."""
+    generation = reference_data_cache.generation
+    companies = reference_data_cache.get("insurance_companies")
+    if companies is None:
+        companies = get_insurance_companies_for_dropdowns(db_session)
+        reference_data_cache.set("insurance_companies", companies, generation)
+    return companies
+
+
+def get_practice_areas_for_dropdowns_cached(db_session: Session) -> List[dict]:
+    """Cached variant of :func:`get_practice_areas_for_dropdowns`."""
+    generation = reference_data_cache.generation
+    areas = reference_data_cache.get("practice_areas")
+    if areas is None:
+        areas = get_practice_areas_for_dropdowns(db_session)
+        reference_data_cache.set("practice_areas", areas, generation)
+    return areas
+
+
+async def get_insurance_companies_for_dropdowns_cached_async(
+    db_session: AsyncSession,
+) -> List[dict]:
+    """Cached variant of :func:`get_insurance_companies_for_dropdowns_async`."""
+    generation = reference_data_cache.generation
+    companies = reference_data_cache.get("insurance_companies")
+    if companies is None:
+        companies = await get_insurance_companies_for_dropdowns_async(db_session)
+        reference_data_cache.set("insurance_companies", companies, generation)
+    return companies
+
+
+async def get_practice_areas_for_dropdowns_cached_async(
+    db_session: AsyncSession,
+) -> List[dict]:
+    """Cached variant of :func:`get_practice_areas_for_dropdowns_async`."""
+    generation = reference_data_cache.generation
+    areas = reference_data_cache.get("practice_areas")
+    if areas is None:
+        areas = await get_practice_areas_for_dropdowns_async(db_session)
+        reference_data_cache.set("practice_areas", areas, generation)
+    return areas
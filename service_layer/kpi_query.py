@@ -1,10 +1,19 @@
 from typing import Any, Dict, List
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from database import KPI, InsuranceCompany, PracticeArea
+import service_layer.data_version  # noqa: F401  (registers the version listeners)
+import service_layer.kpi_rollup  # noqa: F401  (registers the rollup listeners)
+from database import (
+    KPI,
+    InsuranceCompany,
+    KPIAreaRollup,
+    KPICompanyRollup,
+    PracticeArea,
+)
 
 
 class KPISchema(BaseModel):
@@ -28,22 +37,18 @@ class KPISchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-def get_kpis_by_insurance_company_and_practice_area(
-    session: Session, insurance_company_id: int, practice_area_id: int
-) -> List[KPISchema]:
-    """
-    Fetches KPIs and eagerly loads related names to populate the schema.
-    """
-    kpis = (
-        session.query(KPI)
+def _kpis_statement(insurance_company_id: int, practice_area_id: int):
+    return (
+        select(KPI)
         .options(joinedload(KPI.insurance_company), joinedload(KPI.practice_area))
-        .filter(
+        .where(
             KPI.insurance_company_id == insurance_company_id,
             KPI.practice_area_id == practice_area_id,
         )
-        .all()
     )
 
+
+def _to_kpi_schemas(kpis) -> List[KPISchema]:
     result = []
     for k in kpis:
         data = KPISchema(
@@ -59,10 +64,79 @@ def get_kpis_by_insurance_company_and_practice_area(
     return result
 
 
-def _get_raw_kpi_stats(session: Session):
-    """Only responsible for the database join and aggregation."""
+def _kpi_rows_statement(insurance_company_id: int, practice_area_id: int):
+    """Projects only the schema columns, with the names already joined in."""
     return (
-        session.query(
+        select(
+            KPI.id,
+            KPI.incoming_fees,
+            KPI.fees_collected,
+            KPI.new_mandates,
+            InsuranceCompany.name.label("insurance_company_name"),
+            PracticeArea.name.label("practice_area_name"),
+        )
+        .join(InsuranceCompany, KPI.insurance_company_id == InsuranceCompany.id)
+        .join(PracticeArea, KPI.practice_area_id == PracticeArea.id)
+        .where(
+            KPI.insurance_company_id == insurance_company_id,
+            KPI.practice_area_id == practice_area_id,
+        )
+    )
+
+
+def _rows_to_kpi_schemas(rows) -> List[KPISchema]:
+    # Trusted DB data: skip hydration and validation
+    return [KPISchema.model_construct(**row._mapping) for row in rows]
+
+
+def get_kpis_by_insurance_company_and_practice_area(
+    session: Session,
+    insurance_company_id: int,
+    practice_area_id: int,
+    validate: bool = True,
+) -> List[KPISchema]:
+    """
+    Fetches KPIs and eagerly loads related names to populate the schema.
+
+    With ``validate=False`` only the needed columns are selected and the
+    schemas are built without ORM objects or Pydantic validation.
+    """
+    if not validate:
+        rows = session.execute(
+            _kpi_rows_statement(insurance_company_id, practice_area_id)
+        ).all()
+        return _rows_to_kpi_schemas(rows)
+
+    kpis = session.scalars(
+        _kpis_statement(insurance_company_id, practice_area_id)
+    ).all()
+    return _to_kpi_schemas(kpis)
+
+
+async def get_kpis_by_insurance_company_and_practice_area_async(
+    session: AsyncSession,
+    insurance_company_id: int,
+    practice_area_id: int,
+    validate: bool = True,
+) -> List[KPISchema]:
+    """Async variant of :func:`get_kpis_by_insurance_company_and_practice_area`."""
+    if not validate:
+        rows = (
+            await session.execute(
+                _kpi_rows_statement(insurance_company_id, practice_area_id)
+            )
+        ).all()
+        return _rows_to_kpi_schemas(rows)
+
+    kpis = (
+        await session.scalars(_kpis_statement(insurance_company_id, practice_area_id))
+    ).all()
+    return _to_kpi_schemas(kpis)
+
+
+def _raw_kpi_stats_statement():
+    return (
+        select(
             InsuranceCompany.name.label("company"),
             PracticeArea.name.label("area"),
             func.sum(KPI.incoming_fees).label("incoming"),
@@ -72,20 +146,29 @@ def _get_raw_kpi_stats(session: Session):
         .join(KPI, KPI.insurance_company_id == InsuranceCompany.id)
         .join(PracticeArea, KPI.practice_area_id == PracticeArea.id)
         .group_by("company", "area")
-        .all()
     )
 
 
-def get_analytics_payload(session: Session) -> Dict[str, Any]:
-    """Generates the analytics payload for the dashboard.
+def _get_raw_kpi_stats(session: Session):
+    """Only responsible for the database join and aggregation."""
+    return session.execute(_raw_kpi_stats_statement()).all()
 
-    :param session: The database session
-    :type session: Session
-    :return: The analytics payload
-    :rtype: Dict[str, Any]
-    """
-    stats = _get_raw_kpi_stats(session)
 
+def _chart_payload(area_totals: dict, company_mandates: dict) -> Dict[str, Any]:
+    return {
+        "bar": {
+            "labels": list(area_totals.keys()),
+            "incoming": [v["in"] for v in area_totals.values()],
+            "collected": [v["out"] for v in area_totals.values()],
+        },
+        "donut": {
+            "labels": list(company_mandates.keys()),
+            "series": list(company_mandates.values()),
+        },
+    }
+
+
+def _build_analytics_payload(stats) -> Dict[str, Any]:
     area_totals = {}
     company_mandates = {}
 
@@ -98,14 +181,83 @@ def get_analytics_payload(session: Session) -> Dict[str, Any]:
             company_mandates.get(row.company, 0) + row.mandates
         )
 
-    return {
-        "bar": {
-            "labels": list(area_totals.keys()),
-            "incoming": [v["in"] for v in area_totals.values()],
-            "collected": [v["out"] for v in area_totals.values()],
-        },
-        "donut": {
-            "labels": list(company_mandates.keys()),
-            "series": list(company_mandates.values()),
-        },
-    }
+    return _chart_payload(area_totals, company_mandates)
+
+
+def _area_rollup_statement():
+    return (
+        select(
+            PracticeArea.name.label("area"),
+            KPIAreaRollup.incoming_fees.label("incoming"),
+            KPIAreaRollup.fees_collected.label("collected"),
+        )
+        .join(PracticeArea, KPIAreaRollup.practice_area_id == PracticeArea.id)
+        .order_by(PracticeArea.id)
+    )
+
+
+def _company_rollup_statement():
+    return (
+        select(
+            InsuranceCompany.name.label("company"),
+            KPICompanyRollup.new_mandates.label("mandates"),
+        )
+        .join(
+            InsuranceCompany,
+            KPICompanyRollup.insurance_company_id == InsuranceCompany.id,
+        )
+        .order_by(InsuranceCompany.id)
+    )
+
+
+def _build_rollup_payload(area_rows, company_rows) -> Dict[str, Any]:
+    area_totals = {}
+    company_mandates = {}
+
+    # Rows are per id; names are folded the same way as in the live payload
+    for row in area_rows:
+        area_totals.setdefault(row.area, {"in": 0, "out": 0})
+        area_totals[row.area]["in"] += row.incoming
+        area_totals[row.area]["out"] += row.collected
+
+    for row in company_rows:
+        company_mandates[row.company] = (
+            company_mandates.get(row.company, 0) + row.mandates
+        )
+
+    return _chart_payload(area_totals, company_mandates)
+
+
+def get_live_analytics_payload(session: Session) -> Dict[str, Any]:
+    """Aggregates the analytics payload directly from ``kpis``.
+
+    Used to cross-check the rollups and as the benchmark baseline.
+    """
+    return _build_analytics_payload(_get_raw_kpi_stats(session))
+
+
+def get_analytics_payload(session: Session) -> Dict[str, Any]:
+    """Generates the analytics payload for the dashboard from the KPI rollups.
+
+    :param session: The database session
+    :type session: Session
+    :return: The analytics payload
+    :rtype: Dict[str, Any]
+    """
+    return _build_rollup_payload(
+        session.execute(_area_rollup_statement()).all(),
+        session.execute(_company_rollup_statement()).all(),
+    )
+
+
+async def get_analytics_payload_async(session: AsyncSession) -> Dict[str, Any]:
+    """Async variant of :func:`get_analytics_payload`.
+
+    :param session: The async database session
+    :type session: AsyncSession
+    :return: The analytics payload
+    :rtype: Dict[str, Any]
+    """
+    area_rows = (await session.execute(_area_rollup_statement())).all()
+    company_rows = (await session.execute(_company_rollup_statement())).all()
+    return _build_rollup_payload(area_rows, company_rows)
@@ -0,0 +1,239 @@
+"""Incrementally maintained KPI rollups for the analytics dashboard.
+
+ORM writes to ``kpis`` add the change they make (old values out, new values
+in) to the rollup rows of the affected practice areas and insurance
+companies within the same transaction. Bulk ORM statements trigger a full
+rebuild. Core inserts that bypass the ORM (bulk loaders,
+benchmarks) must call :func:`rebuild_kpi_rollups` themselves, or run:
+
+    python -m service_layer.kpi_rollup rebuild
+"""
+
+import argparse
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database import KPI, KPIAreaRollup, KPICompanyRollup, engine
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _add_delta(conn: Connection, model, key: str, key_value: int, delta: dict) -> None:
+    """Adds ``delta`` to the rollup row of ``key_value``, creating it if needed.
+
+    The addition happens in the database, so concurrent transactions on the
+    same key serialize on the row instead of overwriting each other.
+    """
+    increments = {
+        column: getattr(model, column) + value for column, value in delta.items()
+    }
+    dialect_insert = UPSERT_DIALECTS.get(conn.dialect.name)
+    if dialect_insert is None:
+        updated = conn.execute(
+            update(model).where(getattr(model, key) == key_value).values(**increments)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(model).values({key: key_value, **delta}))
+    else:
+        statement = dialect_insert(model).values({key: key_value, **delta})
+        conn.execute(
+            statement.on_conflict_do_update(index_elements=[key], set_=increments)
+        )
+    if delta["kpi_count"] < 0:
+        conn.execute(
+            delete(model).where(getattr(model, key) == key_value, model.kpi_count <= 0)
+        )
+
+
+def apply_area_delta(
+    conn: Connection,
+    practice_area_id: int,
+    incoming_fees: int,
+    fees_collected: int,
+    kpi_count: int,
+) -> None:
+    """Adds a change in the KPIs of one practice area to its rollup."""
+    _add_delta(
+        conn,
+        KPIAreaRollup,
+        "practice_area_id",
+        practice_area_id,
+        {
+            "incoming_fees": incoming_fees,
+            "fees_collected": fees_collected,
+            "kpi_count": kpi_count,
+        },
+    )
+
+
+def apply_company_delta(
+    conn: Connection, insurance_company_id: int, new_mandates: int, kpi_count: int
+) -> None:
+    """Adds a change in the KPIs of one insurance company to its rollup."""
+    _add_delta(
+        conn,
+        KPICompanyRollup,
+        "insurance_company_id",
+        insurance_company_id,
+        {"new_mandates": new_mandates, "kpi_count": kpi_count},
+    )
+
+
+def rebuild_kpi_rollups(conn: Connection) -> None:
+    """Rebuilds both rollup tables from scratch."""
+    conn.execute(delete(KPIAreaRollup))
+    conn.execute(delete(KPICompanyRollup))
+    conn.execute(
+        insert(KPIAreaRollup).from_select(
+            ["practice_area_id", "incoming_fees", "fees_collected", "kpi_count"],
+            select(
+                KPI.practice_area_id,
+                func.sum(KPI.incoming_fees),
+                func.sum(KPI.fees_collected),
+                func.count(KPI.id),
+            ).group_by(KPI.practice_area_id),
+        )
+    )
+    conn.execute(
+        insert(KPICompanyRollup).from_select(
+            ["insurance_company_id", "new_mandates", "kpi_count"],
+            select(
+                KPI.insurance_company_id,
+                func.sum(KPI.new_mandates),
+                func.count(KPI.id),
+            ).group_by(KPI.insurance_company_id),
+        )
+    )
+
+
+AREA_COLUMNS = ("incoming_fees", "fees_collected")
+COMPANY_COLUMNS = ("new_mandates",)
+
+
+def _pending_deltas(target) -> dict:
+    session = inspect(target).session
+    return session.info.setdefault(
+        "kpi_rollup_deltas",
+        {"areas": defaultdict(Counter), "companies": defaultdict(Counter)},
+    )
+
+
+def _previous_key(state, column: str, relation: str):
+    """The key a KPI was stored under before this flush."""
+    for value in state.attrs[column].history.deleted:
+        if value is not None:
+            return value
+    # Moved through the relationship before the foreign key was synced
+    for obj in state.attrs[relation].history.deleted:
+        if obj is not None:
+            return obj.id
+    return getattr(state.obj(), column)
+
+
+def _previous_value(state, column: str) -> int:
+    history = state.attrs[column].history
+    value = history.deleted[0] if history.deleted else getattr(state.obj(), column)
+    return value or 0
+
+
+def _add_contribution(target, sign: int, previous: bool) -> None:
+    """Adds (``sign`` 1) or removes (-1) a KPI's share of both rollups,
+    as stored before this flush (``previous``) or as it is now."""
+    deltas = _pending_deltas(target)
+    state = inspect(target)
+    for bucket, column, relation, values in (
+        ("areas", "practice_area_id", "practice_area", AREA_COLUMNS),
+        ("companies", "insurance_company_id", "insurance_company", COMPANY_COLUMNS),
+    ):
+        if previous:
+            key = _previous_key(state, column, relation)
+            amounts = {name: _previous_value(state, name) for name in values}
+        else:
+            key = getattr(target, column)
+            amounts = {name: getattr(target, name) or 0 for name in values}
+        delta = deltas[bucket][key]
+        delta["kpi_count"] += sign
+        for name, amount in amounts.items():
+            delta[name] += sign * amount
+
+
+@event.listens_for(KPI.practice_area_id, "set", active_history=True)
+@event.listens_for(KPI.insurance_company_id, "set", active_history=True)
+@event.listens_for(KPI.practice_area, "set", active_history=True)
+@event.listens_for(KPI.insurance_company, "set", active_history=True)
+@event.listens_for(KPI.incoming_fees, "set", active_history=True)
+@event.listens_for(KPI.fees_collected, "set", active_history=True)
+@event.listens_for(KPI.new_mandates, "set", active_history=True)
+def _load_replaced_value(target, value, oldvalue, initiator):
+    """Loads the old value on assignment so the flush can subtract it."""
+
+
+@event.listens_for(KPI, "after_insert")
+def _track_kpi_insert(mapper, connection, target):
+    _add_contribution(target, 1, previous=False)
+
+
+@event.listens_for(KPI, "after_update")
+def _track_kpi_update(mapper, connection, target):
+    _add_contribution(target, -1, previous=True)
+    _add_contribution(target, 1, previous=False)
+
+
+@event.listens_for(KPI, "before_delete")
+def _track_kpi_delete(mapper, connection, target):
+    # Before the DELETE, so expired attributes can still be loaded
+    _add_contribution(target, -1, previous=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_deltas(session, flush_context):
+    deltas = session.info.pop("kpi_rollup_deltas", None)
+    if not deltas:
+        return
+    conn = session.connection()
+    # Sorted, so concurrent transactions lock rollup rows in the same order
+    for practice_area_id, delta in sorted(deltas["areas"].items()):
+        if any(delta.values()):
+            apply_area_delta(conn, practice_area_id, **_complete(delta, AREA_COLUMNS))
+    for insurance_company_id, delta in sorted(deltas["companies"].items()):
+        if any(delta.values()):
+            apply_company_delta(
+                conn, insurance_company_id, **_complete(delta, COMPANY_COLUMNS)
+            )
+
+
+def _complete(delta: Counter, columns) -> dict:
+    return {name: delta[name] for name in (*columns, "kpi_count")}
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_deltas(session):
+    session.info.pop("kpi_rollup_deltas", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _rebuild_after_bulk_statement(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_select or mapper is None or mapper.class_ is not KPI:
+        return None
+    result = orm_execute_state.invoke_statement()
+    rebuild_kpi_rollups(orm_execute_state.session.connection())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the KPI rollup tables.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    with engine.begin() as conn:
+        rebuild_kpi_rollups(conn)
+    print("KPI rollups rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
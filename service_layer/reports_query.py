@@ -1,9 +1,18 @@
-from datetime import datetime
+import base64
+import binascii
+import calendar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy import and_, func, or_, outerjoin, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from database import Report
+import service_layer.data_version  # noqa: F401  (registers the version listeners)
+from database import InsuranceCompany, PracticeArea, Report
+
+UNKNOWN_NAME = "Unbekannt"
 
 
 class ReportSchema(BaseModel):
@@ -20,38 +29,103 @@ class ReportSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-def get_report_analysis_payload(
-    session: Session, insurance_company_id: int, practice_area_id: int
+def _reports_statement():
+    return select(Report).options(
+        joinedload(Report.insurance_company), joinedload(Report.practice_area)
+    )
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """``report_date`` is stored naive in UTC; aware bounds are converted."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _apply_report_window(
+    statement,
+    insurance_company_id: int,
+    practice_area_id: int,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
 ):
-    # Fetch with joinedload to keep it fast
-    db_reports = (
-        session.query(Report)
-        .options(joinedload(Report.insurance_company), joinedload(Report.practice_area))
-        .filter(
-            Report.insurance_company_id == insurance_company_id,
-            Report.practice_area_id == practice_area_id,
-        )
-        .all()
+    """Filters to one company/area pair and orders newest first, optionally
+    restricted to ``[since, until)`` and the first ``limit`` reports."""
+    statement = statement.where(
+        Report.insurance_company_id == insurance_company_id,
+        Report.practice_area_id == practice_area_id,
     )
+    if since is not None:
+        statement = statement.where(Report.report_date >= _as_naive_utc(since))
+    if until is not None:
+        statement = statement.where(Report.report_date < _as_naive_utc(until))
+    statement = statement.order_by(Report.report_date.desc(), Report.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
 
-    if not db_reports:
-        return None
 
-    # Manually map the database objects to the flat Pydantic model
-    report_list = [
-        ReportSchema(
-            id=r.id,
-            insurance_company_name=(
-                r.insurance_company.name if r.insurance_company else "Unbekannt"
-            ),
-            practice_area_name=r.practice_area.name if r.practice_area else "Unbekannt",
-            department_visited=r.department_visited,
-            visited_key_personnel=r.visited_key_personnel,
-            report_date=r.report_date,
-            report_content=r.report_content,
-        )
-        for r in db_reports
-    ]
+def _report_analysis_statement(
+    insurance_company_id: int, practice_area_id: int, **window
+):
+    return _apply_report_window(
+        _reports_statement(), insurance_company_id, practice_area_id, **window
+    )
+
+
+def _to_report_schema(r: Report) -> ReportSchema:
+    # Manually map the database object to the flat Pydantic model
+    return ReportSchema(
+        id=r.id,
+        insurance_company_name=(
+            r.insurance_company.name if r.insurance_company else UNKNOWN_NAME
+        ),
+        practice_area_name=r.practice_area.name if r.practice_area else UNKNOWN_NAME,
+        department_visited=r.department_visited,
+        visited_key_personnel=r.visited_key_personnel,
+        report_date=r.report_date,
+        report_content=r.report_content,
+    )
+
+
+def _report_rows_statement():
+    """Projects only the schema columns, with the names already joined in."""
+    return select(
+        Report.id,
+        func.coalesce(InsuranceCompany.name, UNKNOWN_NAME).label(
+            "insurance_company_name"
+        ),
+        func.coalesce(PracticeArea.name, UNKNOWN_NAME).label("practice_area_name"),
+        Report.department_visited,
+        Report.visited_key_personnel,
+        Report.report_date,
+        Report.report_content,
+    ).select_from(
+        outerjoin(
+            Report,
+            InsuranceCompany,
+            Report.insurance_company_id == InsuranceCompany.id,
+        ).outerjoin(PracticeArea, Report.practice_area_id == PracticeArea.id)
+    )
+
+
+def _report_analysis_rows_statement(
+    insurance_company_id: int, practice_area_id: int, **window
+):
+    return _apply_report_window(
+        _report_rows_statement(), insurance_company_id, practice_area_id, **window
+    )
+
+
+def _rows_to_report_schemas(rows) -> List[ReportSchema]:
+    # Trusted DB data: skip hydration and validation
+    return [ReportSchema.model_construct(**row._mapping) for row in rows]
+
+
+def _build_report_analysis_payload(report_list: List[ReportSchema]):
+    if not report_list:
+        return None
 
     return {
         "insurance_company_name": report_list[0].insurance_company_name,
@@ -60,24 +134,221 @@ def get_report_analysis_payload(
     }
 
 
+def get_report_analysis_payload(
+    session: Session,
+    insurance_company_id: int,
+    practice_area_id: int,
+    validate: bool = True,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Loads the reports of a company/area pair, newest first.
+
+    ``limit`` keeps only the most recent reports and ``since``/``until``
+    restrict them to a date window; by default the full history is loaded.
+    With ``validate=False`` only the needed columns are selected and the
+    schemas are built without ORM objects or Pydantic validation.
+    """
+    window = {"limit": limit, "since": since, "until": until}
+    if not validate:
+        rows = session.execute(
+            _report_analysis_rows_statement(
+                insurance_company_id, practice_area_id, **window
+            )
+        ).all()
+        return _build_report_analysis_payload(_rows_to_report_schemas(rows))
+
+    # Fetch with joinedload to keep it fast
+    db_reports = session.scalars(
+        _report_analysis_statement(insurance_company_id, practice_area_id, **window)
+    ).all()
+    return _build_report_analysis_payload([_to_report_schema(r) for r in db_reports])
+
+
+async def get_report_analysis_payload_async(
+    session: AsyncSession,
+    insurance_company_id: int,
+    practice_area_id: int,
+    validate: bool = True,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Async variant of :func:`get_report_analysis_payload`."""
+    window = {"limit": limit, "since": since, "until": until}
+    if not validate:
+        rows = (
+            await session.execute(
+                _report_analysis_rows_statement(
+                    insurance_company_id, practice_area_id, **window
+                )
+            )
+        ).all()
+        return _build_report_analysis_payload(_rows_to_report_schemas(rows))
+
+    db_reports = (
+        await session.scalars(
+            _report_analysis_statement(insurance_company_id, practice_area_id, **window)
+        )
+    ).all()
+    return _build_report_analysis_payload([_to_report_schema(r) for r in db_reports])
+
+
+def encode_cursor(report_date: datetime, report_id: int) -> str:
+    """Opaque keyset cursor pointing at the last report of a page."""
+    raw = f"{report_date.isoformat()}|{report_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`; raises ValueError for bad cursors."""
+    try:
+        report_date, report_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(report_date), int(report_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def months_ago(months: int, now: Optional[datetime] = None) -> datetime:
+    """Same day-of-month ``months`` calendar months back, clamped to month end."""
+    now = now or datetime.now()
+    month_index = now.year * 12 + now.month - 1 - months
+    year, month = divmod(month_index, 12)
+    day = min(now.day, calendar.monthrange(year, month + 1)[1])
+    return now.replace(year=year, month=month + 1, day=day)
+
+
+def _report_page_statement(
+    insurance_company_id: int,
+    practice_area_id: int,
+    limit: int,
+    cursor: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+):
+    # One extra row tells whether another page exists
+    statement = _report_analysis_rows_statement(
+        insurance_company_id,
+        practice_area_id,
+        limit=limit + 1,
+        since=since,
+        until=until,
+    )
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                Report.report_date < last_date,
+                and_(Report.report_date == last_date, Report.id < last_id),
+            )
+        )
+    return statement
+
+
+def _build_report_page(rows, limit: int) -> Dict[str, Any]:
+    reports = _rows_to_report_schemas(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(reports[-1].report_date, reports[-1].id)
+    return {"reports": reports, "next_cursor": next_cursor}
+
+
+def get_report_page(
+    session: Session,
+    insurance_company_id: int,
+    practice_area_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Keyset-paginated reports of a company/area pair, newest first.
+
+    Pages are seeked on ``(report_date, id)``, so every page costs the same
+    regardless of how deep it is. Pass the returned ``next_cursor`` to get
+    the following page; it is ``None`` on the last page.
+    """
+    rows = session.execute(
+        _report_page_statement(
+            insurance_company_id, practice_area_id, limit, cursor, since, until
+        )
+    ).all()
+    return _build_report_page(rows, limit)
+
+
+async def get_report_page_async(
+    session: AsyncSession,
+    insurance_company_id: int,
+    practice_area_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Async variant of :func:`get_report_page`."""
+    rows = (
+        await session.execute(
+            _report_page_statement(
+                insurance_company_id, practice_area_id, limit, cursor, since, until
+            )
+        )
+    ).all()
+    return _build_report_page(rows, limit)
+
+
 def get_report_by_id(session: Session, report_id: int) -> ReportSchema | None:
-    db_report = session.query(Report).filter(Report.id == report_id).first()
-    if not db_report:
+    """Loads one report with its names joined in, in a single statement."""
+    row = session.execute(
+        _report_rows_statement().where(Report.id == report_id)
+    ).first()
+    if not row:
         return None
-    report = ReportSchema(
-        id=db_report.id,
-        insurance_company_name=(
-            db_report.insurance_company.name
-            if db_report.insurance_company
-            else "Unbekannt"
-        ),
-        practice_area_name=(
-            db_report.practice_area.name if db_report.practice_area else "Unbekannt"
-        ),
-        department_visited=db_report.department_visited,
-        visited_key_personnel=db_report.visited_key_personnel,
-        report_date=db_report.report_date,
-        report_content=db_report.report_content,
-    )
+    return _rows_to_report_schemas([row])[0]
 
-    return report
+
+async def get_report_by_id_async(
+    session: AsyncSession, report_id: int
+) -> ReportSchema | None:
+    """Async variant of :func:`get_report_by_id`."""
+    row = (
+        await session.execute(_report_rows_statement().where(Report.id == report_id))
+    ).first()
+    if not row:
+        return None
+    return _rows_to_report_schemas([row])[0]
+
+
+def _order_like(report_ids: List[int], rows) -> List[ReportSchema]:
+    by_id = {report.id: report for report in _rows_to_report_schemas(rows)}
+    return [by_id[i] for i in dict.fromkeys(report_ids) if i in by_id]
+
+
+def get_reports_by_ids(session: Session, report_ids: List[int]) -> List[ReportSchema]:
+    """Resolves many reports in one query, e.g. all citations of an analysis.
+
+    Results follow the order of ``report_ids``; duplicates are collapsed and
+    unknown IDs are skipped.
+    """
+    if not report_ids:
+        return []
+    rows = session.execute(
+        _report_rows_statement().where(Report.id.in_(set(report_ids)))
+    ).all()
+    return _order_like(report_ids, rows)
+
+
+async def get_reports_by_ids_async(
+    session: AsyncSession, report_ids: List[int]
+) -> List[ReportSchema]:
+    """Async variant of :func:`get_reports_by_ids`."""
+    if not report_ids:
+        return []
+    rows = (
+        await session.execute(
+            _report_rows_statement().where(Report.id.in_(set(report_ids)))
+        )
+    ).all()
+    return _order_like(report_ids, rows)
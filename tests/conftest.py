@@ -0,0 +1,127 @@
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from agent.llm_metrics import LLMCallLog
+from database import KPI, Base, InsuranceCompany, PracticeArea, Report
+
+# Agent modules are imported inside the fixtures that need them: importing
+# agent.agent builds the model, which needs an API key DB-only tests lack
+
+OUTPUT_ARGS = {
+    "insurance_company_name": "Test Insurance",
+    "practice_area_name": "Legal Tech",
+    "kpi_data": [],
+    "visit_reports": [],
+    "kpi_analysis": "Realisierungsquote 80% [KPI-1].",
+    "report_analysis": "Positiv [Report-1].",
+    "final_executive_summary": "Stabil.",
+    "citations": [],
+}
+
+
+def _pair_rows(company_id: int, company_name: str):
+    return [
+        InsuranceCompany(id=company_id, name=company_name),
+        KPI(
+            insurance_company_id=company_id,
+            practice_area_id=1,
+            incoming_fees=5000,
+            fees_collected=4000,
+            new_mandates=10,
+        ),
+        Report(
+            insurance_company_id=company_id,
+            practice_area_id=1,
+            department_visited="Claims",
+            visited_key_personnel="John Doe",
+            report_date=datetime(2025, 1, 1),
+            report_content="The efficiency is high.",
+        ),
+    ]
+
+
+async def _seed_companies(engine, *company_names: str):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(PracticeArea(id=1, name="Legal Tech"))
+        for company_id, name in enumerate(company_names, start=1):
+            session.add_all(_pair_rows(company_id, name))
+        await session.commit()
+
+
+async def seed_pair(engine):
+    """Creates the schema and "Test Insurance" (1) / "Legal Tech" (1) with
+    one KPI and one report."""
+    await _seed_companies(engine, "Test Insurance")
+
+
+async def seed_pairs(engine):
+    """Like :func:`seed_pair`, plus "Other Insurance" (2) in the same area."""
+    await _seed_companies(engine, "Test Insurance", "Other Insurance")
+
+
+@pytest.fixture(autouse=True)
+def llm_call_log(tmp_path, monkeypatch):
+    """Keeps the per-call LLM metrics of each test in its own file."""
+    log = LLMCallLog(str(tmp_path / "llm_calls.db"))
+    # Only where the agent is loaded already
+    agent_module = sys.modules.get("agent.agent")
+    if agent_module is not None:
+        monkeypatch.setattr(agent_module, "llm_call_log", log)
+    return log
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """A fresh agent result cache per test."""
+    import agent.agent as agent_module
+    from agent.result_cache import AgentResultCache
+
+    result_cache = AgentResultCache(str(tmp_path / "agent_results.db"))
+    monkeypatch.setattr(agent_module, "agent_result_cache", result_cache)
+    return result_cache
+
+
+@pytest.fixture
+def db_session():
+    """A sync session on the data of :func:`seed_pair`."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(PracticeArea(id=1, name="Legal Tech"))
+    session.add_all(_pair_rows(1, "Test Insurance"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def test_model():
+    """Makes the 360 agent answer with :data:`OUTPUT_ARGS`."""
+    from pydantic_ai.models.test import TestModel
+
+    from agent.agent import simple_agent
+
+    model = TestModel(custom_output_args=OUTPUT_ARGS)
+    with simple_agent.override(model=model):
+        yield model
+
+
+@pytest.fixture
+def stand_in():
+    """Makes the 360 agent answer with the offline stand-in model."""
+    from agent.agent import simple_agent
+    from agent.ai_model import LocalStandIn
+
+    stand_in = LocalStandIn(latency=0, tokens_per_second=10_000, output_tokens=30)
+    with simple_agent.override(model=stand_in.model()):
+        yield stand_in
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from agent.agent import Insurance360Output, run_simple_360
+from agent.result_cache import AgentResultCache, data_fingerprint, result_cache_key
+from database import Report
+
+
+def test_repeated_analysis_is_served_from_cache(db_session, cache, test_model):
+    first = run_simple_360(db_session, 1, 1)
+    assert test_model.last_model_request_parameters is not None
+    test_model.last_model_request_parameters = None
+
+    second = run_simple_360(db_session, 1, 1)
+
+    assert test_model.last_model_request_parameters is None
+    assert isinstance(second, Insurance360Output)
+    assert second == first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_data_change_and_bypass_call_the_model(db_session, cache, test_model):
+    run_simple_360(db_session, 1, 1)
+
+    db_session.add(
+        Report(
+            insurance_company_id=1,
+            practice_area_id=1,
+            department_visited="Claims",
+            visited_key_personnel="Jane Doe",
+            report_date=datetime(2025, 2, 1),
+            report_content="New complaints.",
+        )
+    )
+    db_session.commit()
+    run_simple_360(db_session, 1, 1)
+    assert cache.stats()["misses"] == 2
+
+    test_model.last_model_request_parameters = None
+    run_simple_360(db_session, 1, 1, bypass_cache=True)
+    assert test_model.last_model_request_parameters is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_key_covers_prompt_model_and_temperature():
+    fingerprint = data_fingerprint([{"id": 1}], {"reports": []})
+    key = result_cache_key("PROMPT", "model-a", 0, fingerprint)
+
+    assert key == result_cache_key("PROMPT", "model-a", 0, fingerprint)
+    assert key != result_cache_key("PROMPT v2", "model-a", 0, fingerprint)
+    assert key != result_cache_key("PROMPT", "model-b", 0, fingerprint)
+    assert key != result_cache_key("PROMPT", "model-a", 0.7, fingerprint)
+    assert key != result_cache_key(
+        "PROMPT", "model-a", 0, data_fingerprint([{"id": 2}], {"reports": []})
+    )
+
+
+def test_cache_evicts_by_age_and_size(tmp_path):
+    now = [1000.0]
+    cache = AgentResultCache(
+        str(tmp_path / "cache.db"),
+        max_entries=2,
+        max_age_seconds=60,
+        clock=lambda: now[0],
+    )
+    cache.set("a", "1")
+    now[0] += 1
+    cache.set("b", "2")
+    now[0] += 1
+    assert cache.get("a") == "1"  # "b" is now least recently used
+    now[0] += 1
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    now[0] += 61
+    assert cache.get("c") is None
+    cache.set("d", "4")
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 3
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    AgentResultCache(path).set("key", "value")
+
+    assert AgentResultCache(path).get("key") == "value"
@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.test import TestModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import agent.agent as agent_module
+import app as app_module
+from agent.agent import run_360, simple_agent, stream_360
+from agent.concurrency import ModelBusyError, ModelCallLimiter, SingleFlight
+from dependencies import get_async_db
+from tests.conftest import OUTPUT_ARGS, seed_pair
+
+
+def test_limiter_fails_fast_without_queue_timeout():
+    async def run():
+        limiter = ModelCallLimiter(limit=1, queue_timeout=0)
+        async with limiter.slot():
+            with pytest.raises(ModelBusyError):
+                async with limiter.slot():
+                    pass
+        async with limiter.slot():
+            pass
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["active"] == 0
+
+
+def test_limiter_queues_until_timeout():
+    async def run():
+        limiter = ModelCallLimiter(limit=1, queue_timeout=0.05)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(ModelBusyError):
+            async with limiter.slot():
+                pass
+
+        # A waiter that gets the slot within the timeout goes through
+        async def wait_for_slot():
+            async with limiter.slot():
+                return True
+
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+        release.set()
+        await holder
+        return await waiter, limiter.stats()
+
+    served, stats = asyncio.run(run())
+    assert served
+    assert stats["rejected"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_run_360_awaits_model_and_caches(cache, monkeypatch):
+    monkeypatch.setattr(
+        agent_module, "model_call_limiter", ModelCallLimiter(limit=1, queue_timeout=0)
+    )
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            await seed_pair(engine)
+            with simple_agent.override(model=TestModel(custom_output_args=OUTPUT_ARGS)):
+                async with AsyncSession(engine) as session:
+                    first = await run_360(session, 1, 1)
+                async with AsyncSession(engine) as session:
+                    second = await run_360(session, 1, 1)
+            return first, second
+        finally:
+            await engine.dispose()
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert first.insurance_company_name == "Test Insurance"
+    assert cache.stats()["hits"] == 1
+    assert agent_module.model_call_limiter.stats()["completed"] == 1
+
+
+def test_prompt_returns_503_when_model_slots_are_busy(cache, monkeypatch):
+    limiter = ModelCallLimiter(limit=1, queue_timeout=0)
+    limiter._semaphore = asyncio.Semaphore(0)  # every slot taken
+    monkeypatch.setattr(agent_module, "model_call_limiter", limiter)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    app_module.app.dependency_overrides[get_async_db] = override_db
+    try:
+        with TestClient(app_module.app, base_url="http://localhost") as client:
+            client.portal.call(seed_pair, engine)
+            response = client.get("/prompt/1/1")
+            client.portal.call(engine.dispose)
+    finally:
+        app_module.app.dependency_overrides.pop(get_async_db, None)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_single_flight_shares_result_and_failure():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return "analysis"
+
+        async def fail():
+            calls.append(1)
+            await release.wait()
+            raise RuntimeError("model down")
+
+        waiters = [asyncio.create_task(flights.run("a", compute)) for _ in range(3)]
+        failing = [asyncio.create_task(flights.run("b", fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        # Callers going away do not cancel the shared computation
+        waiters[0].cancel()
+        release.set()
+        results = await asyncio.gather(*waiters[1:])
+        errors = await asyncio.gather(*failing, return_exceptions=True)
+        return results, errors, len(calls), flights.stats()
+
+    results, errors, calls, stats = asyncio.run(run())
+    assert results == ["analysis", "analysis"]
+    assert [str(e) for e in errors] == ["model down", "model down"]
+    assert calls == 2
+    assert stats == {"in_flight": 0, "started": 2, "coalesced": 3, "failed": 1}
+
+
+def test_concurrent_runs_share_one_model_call(cache, llm_call_log, monkeypatch):
+    monkeypatch.setattr(agent_module, "analysis_flights", SingleFlight())
+    model_calls = []
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        model_calls.append(1)
+        await asyncio.sleep(0.05)
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, OUTPUT_ARGS)]
+        )
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        async def analyse():
+            async with Session() as session:
+                return await run_360(session, 1, 1, bypass_cache=True)
+
+        async def stream():
+            async with Session() as session:
+                return [event async for event in stream_360(session, 1, 1)]
+
+        try:
+            await seed_pair(engine)
+            with simple_agent.override(model=FunctionModel(respond)):
+                return await asyncio.gather(analyse(), analyse(), analyse(), stream())
+        finally:
+            await engine.dispose()
+
+    *outputs, events = asyncio.run(run())
+
+    assert len(model_calls) == 1
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert events[-1] == ("result", outputs[0].model_dump(mode="json"))
+    assert agent_module.analysis_flights.stats()["coalesced"] == 3
+    totals = llm_call_log.summary()["totals"]
+    assert (totals["calls"], totals["coalesced"]) == (4, 3)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import agent.agent as agent_module
+import app as app_module
+from agent.agent import simple_agent, stream_360
+from dependencies import get_async_db
+from tests.conftest import OUTPUT_ARGS, seed_pair
+
+
+async def _stream_output(messages, info: AgentInfo):
+    """Emits the output tool call a few characters at a time."""
+    args = json.dumps(OUTPUT_ARGS)
+    yield {0: DeltaToolCall(name=info.output_tools[0].name, json_args="")}
+    for i in range(0, len(args), 8):
+        yield {0: DeltaToolCall(json_args=args[i : i + 8])}
+
+
+@pytest.fixture
+def streaming_model(monkeypatch):
+    monkeypatch.setattr(agent_module, "STREAM_DEBOUNCE_SECONDS", None)
+    with simple_agent.override(model=FunctionModel(stream_function=_stream_output)):
+        yield
+
+
+def _collect(**kwargs):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            await seed_pair(engine)
+            async with AsyncSession(engine) as session:
+                return [event async for event in stream_360(session, 1, 1, **kwargs)]
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_stream_sends_context_partials_then_result(cache, streaming_model):
+    events = _collect()
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "context"
+    assert kinds[-1] == "result"
+    assert events[0][1]["kpi_data"][0]["incoming_fees"] == 5000
+    assert events[0][1]["insurance_company_name"] == "Test Insurance"
+
+    partials = [data for kind, data in events if kind == "partial"]
+    # Fields arrive in output order, each growing until complete
+    first_seen = list(dict.fromkeys(p["field"] for p in partials))
+    assert first_seen == ["kpi_analysis", "report_analysis", "final_executive_summary"]
+    kpi_texts = [p["text"] for p in partials if p["field"] == "kpi_analysis"]
+    assert len(kpi_texts) > 1
+    assert kpi_texts[-1] == OUTPUT_ARGS["kpi_analysis"]
+    assert events[-1][1]["final_executive_summary"] == "Stabil."
+
+
+def test_stream_serves_cache_hits_without_partials(cache, streaming_model):
+    _collect()
+    events = _collect()
+
+    assert [kind for kind, _ in events] == ["context", "result"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_prompt_stream_route_emits_sse(cache, streaming_model):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    app_module.app.dependency_overrides[get_async_db] = override_db
+    try:
+        with TestClient(app_module.app, base_url="http://localhost") as client:
+            client.portal.call(seed_pair, engine)
+            response = client.get("/prompt/1/1/stream")
+            client.portal.call(engine.dispose)
+    finally:
+        app_module.app.dependency_overrides.pop(get_async_db, None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [b for b in response.text.split("\n\n") if b]
+    assert blocks[0].startswith("event: context\ndata: ")
+    assert blocks[-1].startswith("event: result\ndata: ")
+    result = json.loads(blocks[-1].split("data: ", 1)[1])
+    assert result["kpi_analysis"] == OUTPUT_ARGS["kpi_analysis"]
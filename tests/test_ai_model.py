@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import agent.agent as agent_module
+import app as app_module
+from agent.agent import run_360, stream_360
+from agent.ai_model import build_model
+from dependencies import get_async_db
+from tests.conftest import seed_pair
+
+
+def test_build_model_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        build_model("gpt")
+
+
+def test_stand_in_answers_from_the_prompt(cache, stand_in):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            await seed_pair(engine)
+            async with AsyncSession(engine) as session:
+                output = await run_360(session, 1, 1, bypass_cache=True)
+            async with AsyncSession(engine) as session:
+                events = [
+                    event
+                    async for event in stream_360(session, 1, 1, bypass_cache=True)
+                ]
+            return output, events
+        finally:
+            await engine.dispose()
+
+    output, events = asyncio.run(run())
+    assert output.insurance_company_name == "Test Insurance"
+    assert output.practice_area_name == "Legal Tech"
+    assert output.kpi_analysis.startswith("Befund")
+    assert "[KPI-1]" in output.kpi_analysis
+    assert "partial" in [kind for kind, _ in events]
+    # Streaming and non-streaming runs give the same answer
+    assert events[-1][1]["kpi_analysis"] == output.kpi_analysis
+
+
+def test_prompt_reports_stage_timings(cache, stand_in, monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    monkeypatch.setitem(app_module.app.dependency_overrides, get_async_db, override_db)
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        client.portal.call(seed_pair, engine)
+        first = client.get("/prompt/1/1")
+        cached = client.get("/prompt/1/1")
+        client.portal.call(engine.dispose)
+
+    assert first.status_code == 200
+    assert first.json()["insurance_company_name"] == "Test Insurance"
+    stages = [
+        entry.split(";")[0] for entry in first.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == ["db", "prompt", "queue", "model", "serialize"]
+    assert "model" not in cached.headers["Server-Timing"]
+    assert agent_module.agent_result_cache.stats()["hits"] == 1
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import agent.jobs as jobs_module
+import app as app_module
+from agent.agent import run_360
+from agent.jobs import JobRunner, precompute_all
+from dependencies import get_async_db
+from service_layer.analysis_jobs import (
+    create_job_async,
+    get_job_async,
+    get_latest_result_async,
+    mark_job_running_async,
+)
+from tests.conftest import seed_pairs
+
+
+@pytest.fixture
+def engine():
+    return create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+
+def _flaky(failures: int):
+    """A ranked analysis that fails for company 2 ``failures`` times."""
+    calls = {"failed": 0}
+
+    async def analysis(session, company_id, area_id, **params):
+        if company_id == 2 and calls["failed"] < failures:
+            calls["failed"] += 1
+            raise RuntimeError("model unavailable")
+        return await run_360(session, company_id, area_id, **params)
+
+    return analysis
+
+
+def test_submitted_job_stores_result(engine, cache, test_model):
+    async def run():
+        await seed_pairs(engine)
+        runner = JobRunner(async_sessionmaker(bind=engine, expire_on_commit=False))
+        job = await runner.submit(1, 1)
+        await runner.drain()
+        async with runner.session_factory() as session:
+            return (
+                job,
+                await get_job_async(session, job.id),
+                (await get_latest_result_async(session, 1, 1)),
+            )
+
+    queued, done, latest = asyncio.run(run())
+    assert queued.status == "queued"
+    assert done.status == "succeeded"
+    assert done.attempts == 1
+    assert done.result["insurance_company_name"] == "Test Insurance"
+    assert latest.id == done.id
+
+
+def test_failed_attempts_are_retried(engine, cache, test_model, monkeypatch):
+    monkeypatch.setitem(jobs_module.ANALYSIS_MODES, "ranked", _flaky(failures=2))
+
+    async def run():
+        await seed_pairs(engine)
+        runner = JobRunner(
+            async_sessionmaker(bind=engine, expire_on_commit=False),
+            max_attempts=3,
+            retry_delay=0,
+        )
+        job = await runner.submit(2, 1)
+        await runner.drain()
+        async with runner.session_factory() as session:
+            return await get_job_async(session, job.id)
+
+    job = asyncio.run(run())
+    assert job.status == "succeeded"
+    assert job.attempts == 3
+    assert job.error is None
+
+
+def test_restart_recovers_unfinished_jobs(engine, cache, test_model):
+    async def run():
+        await seed_pairs(engine)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        # What a process killed mid-work leaves behind
+        async with session_factory() as session:
+            queued = await create_job_async(session, 1, 1)
+            running = await create_job_async(session, 2, 1)
+            await mark_job_running_async(session, running.id)
+            exhausted = await create_job_async(session, 1, 1)
+            for _ in range(2):
+                await mark_job_running_async(session, exhausted.id)
+            batch = await create_job_async(session, 2, 1, batch_id="nightly")
+
+        runner = JobRunner(session_factory, max_attempts=2, retry_delay=0)
+        restarted = await runner.recover()
+        await runner.drain()
+        async with session_factory() as session:
+            jobs = [
+                await get_job_async(session, job.id)
+                for job in (queued, running, exhausted, batch)
+            ]
+        return restarted, jobs
+
+    restarted, (queued, running, exhausted, batch) = asyncio.run(run())
+    assert restarted == [queued.id, running.id]
+    assert (queued.status, running.status) == ("succeeded", "succeeded")
+    assert (exhausted.status, exhausted.error) == ("failed", "Interrupted by a restart")
+    # Batches resume through precompute_all
+    assert batch.status == "queued"
+
+
+def test_precompute_resumes_batch(engine, cache, test_model, monkeypatch):
+    monkeypatch.setitem(jobs_module.ANALYSIS_MODES, "ranked", _flaky(failures=1))
+
+    async def run():
+        await seed_pairs(engine)
+        runner = JobRunner(
+            async_sessionmaker(bind=engine, expire_on_commit=False),
+            concurrency=2,
+            max_attempts=1,
+            retry_delay=0,
+        )
+        first = await precompute_all(runner, batch_id="nightly")
+        second = await precompute_all(runner, batch_id="nightly")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == {
+        "batch_id": "nightly",
+        "pairs": 2,
+        "skipped": 0,
+        "succeeded": 1,
+        "failed": 1,
+    }
+    # Only the failed pair runs again
+    assert second == {"batch_id": "nightly", "pairs": 2, "skipped": 1, "succeeded": 2}
+
+
+def test_job_routes(engine, cache, test_model, monkeypatch):
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(app_module, "job_runner", JobRunner(TestSession))
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    monkeypatch.setitem(app_module.app.dependency_overrides, get_async_db, override_db)
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        client.portal.call(seed_pairs, engine)
+        assert client.get("/api/analyses/1/1/latest").status_code == 404
+
+        submitted = client.post("/api/jobs/1/1?months=12")
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+
+        job = client.get(f"/api/jobs/{job_id}?wait=5").json()
+        latest = client.get("/api/analyses/1/1/latest").json()
+        missing = client.get("/api/jobs/999")
+        client.portal.call(engine.dispose)
+
+    assert job["status"] == "succeeded"
+    assert job["params"]["months"] == 12
+    assert latest["id"] == job_id
+    assert latest["result"]["practice_area_name"] == "Legal Tech"
+    assert missing.status_code == 404
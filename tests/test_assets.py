@@ -0,0 +1,62 @@
+import hashlib
+import re
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from assets import DIST_DIR, IMMUTABLE_CACHE_CONTROL, asset_url, load_manifest
+from build_assets import VENDORED
+
+TEMPLATES = sorted(Path(__file__).parent.parent.joinpath("templates").glob("*.html"))
+RUNTIME_CSS_COMPILERS = re.compile(
+    r"cdn\.tailwindcss\.com|@tailwindcss/browser|tailwind\.config"
+)
+
+
+@pytest.mark.parametrize("template", TEMPLATES, ids=lambda path: path.name)
+def test_templates_do_not_compile_css_at_runtime(template):
+    assert not RUNTIME_CSS_COMPILERS.search(template.read_text())
+
+
+def test_pages_link_the_built_stylesheet():
+    pages = [path for path in TEMPLATES if "<html" in path.read_text()]
+    styled = [path for path in pages if "class=" in path.read_text()]
+
+    assert styled
+    for page in styled:
+        assert "asset_url('app.css')" in page.read_text(), page.name
+
+
+def test_linked_assets_come_from_the_build():
+    linked = {
+        name
+        for template in TEMPLATES
+        for name in re.findall(r"asset_url\('([^']+)'\)", template.read_text())
+    }
+
+    assert "apexcharts.js" in linked
+    assert linked <= {"app.css", *VENDORED}
+    with pytest.raises(KeyError):
+        asset_url("missing.js")
+
+
+def test_built_assets_are_named_by_content():
+    manifest = load_manifest()
+
+    assert "app.css" in manifest
+    for filename in manifest.values():
+        digest = hashlib.sha256((DIST_DIR / filename).read_bytes()).hexdigest()
+        assert filename.split(".")[-2] == digest[:12]
+
+
+def test_built_assets_are_served_immutable():
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        response = client.get(asset_url("app.css"))
+        missing = client.get("/static/dist/app.000000000000.css")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert missing.status_code == 404
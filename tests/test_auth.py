@@ -0,0 +1,152 @@
+import functools
+import json
+import threading
+import time
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi.testclient import TestClient
+
+import app as app_module
+import dependencies
+from auth import SigningKeyUnavailable, TokenVerifier
+
+SECRET = "local-test-secret-with-at-least-32-bytes"
+ISSUER = "https://project.supabase.co/auth/v1"
+
+
+def _claims(**overrides):
+    now = int(time.time())
+    return {
+        "sub": "user-1",
+        "aud": "authenticated",
+        "iss": ISSUER,
+        "iat": now,
+        "exp": now + 3600,
+        "email": "analyst@example.com",
+        "role": "authenticated",
+        "user_metadata": {"full_name": "Ana Lyst"},
+        **overrides,
+    }
+
+
+@pytest.fixture
+def verifier():
+    return TokenVerifier(jwt_secret=SECRET, jwks_url=None, issuer=ISSUER)
+
+
+def test_verifies_and_caches_hs256_tokens(verifier):
+    token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+
+    user = verifier.verify(token)
+    again = verifier.verify(token)
+
+    assert user.id == "user-1"
+    assert user.email == "analyst@example.com"
+    assert user.user_metadata == {"full_name": "Ana Lyst"}
+    assert again is user
+    assert verifier.stats() == {"cached": 1, "hits": 1, "misses": 1}
+
+
+@pytest.mark.parametrize(
+    "claims, key",
+    [
+        (_claims(exp=int(time.time()) - 60), SECRET),
+        (_claims(aud="anon"), SECRET),
+        (_claims(iss="https://other.supabase.co/auth/v1"), SECRET),
+        (_claims(), "another-secret-with-at-least-32-bytes!"),
+    ],
+    ids=["expired", "audience", "issuer", "signature"],
+)
+def test_rejects_invalid_tokens(verifier, claims, key):
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(jwt.encode(claims, key, algorithm="HS256"))
+
+
+def test_cache_never_outlives_the_token():
+    clock = [time.time()]
+    verifier = TokenVerifier(
+        jwt_secret=SECRET,
+        jwks_url=None,
+        issuer=ISSUER,
+        cache_seconds=60,
+        leeway=0,
+        clock=lambda: clock[0],
+    )
+    token = jwt.encode(_claims(exp=int(time.time()) + 10), SECRET, algorithm="HS256")
+    verifier.verify(token)
+
+    clock[0] += 30
+    verifier.verify(token)
+    # Still within the cache TTL, but the token expired at the 10s mark
+    assert verifier.stats()["hits"] == 0
+
+
+def test_verifies_es256_tokens_against_cached_jwks(tmp_path):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    (tmp_path / "jwks.json").write_text(
+        json.dumps({"keys": [{**jwk, "kid": "k1", "use": "sig"}]})
+    )
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        verifier = TokenVerifier(
+            jwt_secret=None,
+            jwks_url=f"http://127.0.0.1:{server.server_port}/jwks.json",
+            issuer=ISSUER,
+        )
+        tokens = [
+            jwt.encode(
+                _claims(sub=f"user-{i}"),
+                private_key,
+                algorithm="ES256",
+                headers={"kid": "k1"},
+            )
+            for i in (1, 2)
+        ]
+        users = [verifier.verify(tokens[0])]
+        # The keys are fetched once, then served from the JWKS cache
+        (tmp_path / "jwks.json").unlink()
+        users.append(verifier.verify(tokens[1]))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [user.id for user in users] == ["user-1", "user-2"]
+
+    # HS256 tokens cannot be checked without the project secret
+    with pytest.raises(SigningKeyUnavailable):
+        verifier.verify(jwt.encode(_claims(sub="user-2"), SECRET, algorithm="HS256"))
+
+
+def test_protected_route_resolves_user_locally_once(verifier, monkeypatch):
+    monkeypatch.setattr(dependencies, "token_verifier", verifier)
+
+    def no_remote_calls(token):
+        raise AssertionError("auth server called")
+
+    monkeypatch.setattr(dependencies.supabase.auth, "get_user", no_remote_calls)
+    token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+
+    with TestClient(app_module.app, base_url="http://crm.example.com") as client:
+        allowed = client.get(
+            "/internal/pool-stats", headers={"Authorization": f"Bearer {token}"}
+        )
+        resolved = verifier.stats()
+        expired = client.get(
+            "/internal/pool-stats",
+            headers={
+                "Authorization": "Bearer "
+                + jwt.encode(_claims(exp=1), SECRET, algorithm="HS256")
+            },
+            follow_redirects=False,
+        )
+
+    assert allowed.status_code == 200
+    assert (resolved["misses"], resolved["hits"]) == (1, 0)
+    # 401s redirect to the login page
+    assert expired.status_code == 307
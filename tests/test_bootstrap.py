@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app as app_module
+from agent.jobs import JobRunner
+from dependencies import get_async_session_factory
+from service_layer.bootstrap import get_bootstrap_payload_async
+from service_layer.dropdown_queries import reference_data_cache
+from tests.conftest import seed_pairs
+
+
+@pytest.fixture
+def session_factory():
+    reference_data_cache.clear()
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    reference_data_cache.clear()
+
+
+async def _analyse(session_factory, *pairs):
+    await seed_pairs(session_factory.kw["bind"])
+    runner = JobRunner(session_factory)
+    for pair in pairs:
+        await runner.submit(*pair)
+        await runner.drain()
+
+
+def test_bootstrap_payload_runs_lookups_concurrently(session_factory):
+    open_sessions = {"now": 0, "max": 0}
+
+    class CountingSession:
+        def __init__(self):
+            self.session = session_factory()
+
+        async def __aenter__(self):
+            open_sessions["now"] += 1
+            open_sessions["max"] = max(open_sessions["max"], open_sessions["now"])
+            session = await self.session.__aenter__()
+            # Hold the session so overlapping lookups are visible
+            await asyncio.sleep(0.01)
+            return session
+
+        async def __aexit__(self, *exc_info):
+            open_sessions["now"] -= 1
+            return await self.session.__aexit__(*exc_info)
+
+    async def run():
+        await seed_pairs(session_factory.kw["bind"])
+        return await get_bootstrap_payload_async(CountingSession)
+
+    payload = asyncio.run(run())
+
+    assert {c["name"] for c in payload.insurance_companies} == {
+        "Other Insurance",
+        "Test Insurance",
+    }
+    assert [a["name"] for a in payload.practice_areas] == ["Legal Tech"]
+    assert payload.analytics["bar"]["labels"] == ["Legal Tech"]
+    assert payload.recent_analyses == []
+    assert open_sessions == {"now": 0, "max": 4}
+
+
+def test_bootstrap_route_returns_latest_analysis_per_pair(
+    session_factory, cache, test_model, monkeypatch
+):
+    monkeypatch.setitem(
+        app_module.app.dependency_overrides,
+        get_async_session_factory,
+        lambda: session_factory,
+    )
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        client.portal.call(_analyse, session_factory, (1, 1), (2, 1), (1, 1))
+        payload = client.get("/api/bootstrap").json()
+        newest = client.get("/api/bootstrap?recent=1").json()
+        client.portal.call(session_factory.kw["bind"].dispose)
+
+    recent = [
+        (job["id"], job["insurance_company_id"]) for job in payload["recent_analyses"]
+    ]
+    # The second run of company 1 replaces its first
+    assert recent == [(3, 1), (2, 2)]
+    assert [job["id"] for job in newest["recent_analyses"]] == [3]
+    assert payload["recent_analyses"][0]["result"]["insurance_company_name"] == (
+        "Test Insurance"
+    )
+    assert set(payload) == {
+        "insurance_companies",
+        "practice_areas",
+        "analytics",
+        "recent_analyses",
+    }
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app as app_module
+from database import KPI, Base, InsuranceCompany, PracticeArea, Report
+from dependencies import get_async_db
+from service_layer.data_version import bump_data_version, get_data_version
+from tests.conftest import seed_pairs
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        [InsuranceCompany(id=1, name="Allianz"), PracticeArea(id=1, name="Marine")]
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def _kpi(**values):
+    return KPI(
+        insurance_company_id=1,
+        practice_area_id=1,
+        incoming_fees=values.get("incoming_fees", 5000),
+        fees_collected=4000,
+        new_mandates=10,
+    )
+
+
+def test_orm_writes_bump_their_scope(session):
+    assert get_data_version(session, "kpis").version == 0
+
+    kpi = _kpi()
+    session.add(kpi)
+    session.commit()
+    first = get_data_version(session, "kpis")
+
+    kpi.incoming_fees = 7000
+    session.commit()
+    session.delete(kpi)
+    session.commit()
+
+    assert first.version == 1
+    assert first.updated_at is not None
+    assert get_data_version(session, "kpis").version == 3
+    # Reports are versioned separately
+    assert get_data_version(session, "reports").version == 0
+
+
+def test_rolled_back_and_bulk_writes(session):
+    session.add(_kpi())
+    session.flush()
+    session.rollback()
+    assert get_data_version(session, "kpis").version == 0
+
+    session.add_all([_kpi(), _kpi()])
+    session.commit()
+    session.execute(update(KPI).values(new_mandates=11))
+    session.commit()
+    # One bump per flush or statement, not per row
+    assert get_data_version(session, "kpis").version == 2
+
+    bump_data_version(session.connection(), "reports")
+    bump_data_version(session.connection(), "reports")
+    session.commit()
+    assert get_data_version(session, "reports").version == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    monkeypatch.setitem(app_module.app.dependency_overrides, get_async_db, override_db)
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        client.portal.call(seed_pairs, engine)
+        client.engine = engine
+        yield client
+        client.portal.call(engine.dispose)
+
+
+def _write(client, *rows):
+    async def write():
+        async with AsyncSession(client.engine) as session:
+            session.add_all(rows)
+            await session.commit()
+
+    client.portal.call(write)
+
+
+def test_analytics_revalidates_until_kpis_change(client):
+    first = client.get("/api/analytics")
+    etag = first.headers["etag"]
+    cached = client.get("/api/analytics", headers={"If-None-Match": etag})
+    by_date = client.get(
+        "/api/analytics",
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+
+    _write(client, _kpi(incoming_fees=9000))
+    changed = client.get("/api/analytics", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert (cached.status_code, cached.content) == (304, b"")
+    assert cached.headers["etag"] == etag
+    assert by_date.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_report_page_revalidates_until_reports_change(client):
+    first = client.get("/report/1")
+    etag = first.headers["etag"]
+    cached = client.get("/report/1", headers={"If-None-Match": etag})
+    # KPI writes leave report pages valid
+    _write(client, _kpi())
+    after_kpi = client.get("/report/1", headers={"If-None-Match": etag})
+    _write(
+        client,
+        Report(
+            insurance_company_id=1,
+            practice_area_id=1,
+            department_visited="Claims",
+            visited_key_personnel="Jane Doe",
+            report_date=datetime(2025, 2, 1),
+            report_content="New visit.",
+        ),
+    )
+    after_report = client.get("/report/1", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert etag.startswith('"report-1-')
+    assert cached.status_code == 304
+    assert after_kpi.status_code == 304
+    assert after_report.status_code == 200
+
+
+def test_report_page_etag_changes_with_the_build(client, monkeypatch):
+    etag = client.get("/report/1").headers["etag"]
+    monkeypatch.setattr(app_module, "page_version", lambda: "rebuilt00000")
+    after_deploy = client.get("/report/1", headers={"If-None-Match": etag})
+
+    assert after_deploy.status_code == 200
+    assert after_deploy.headers["etag"] != etag
+    # A deploy doesn't move Last-Modified, so pages validate by ETag only
+    assert "last-modified" not in after_deploy.headers
@@ -1,5 +1,7 @@
+import asyncio
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from database import (
@@ -8,7 +10,12 @@ from database import (
     InsuranceCompany,
     PracticeArea,
     Report,
+    async_engine,
+    load_pool_options,
+    pool_stats,
 )
+from dependencies import get_async_db
+from pool_stats import instrument_engine
 
 # Test db
 SQLALCHEMY_DATABASE_URL = "sqlite://"
@@ -78,3 +85,60 @@ def test_report_creation(db):
 
     assert report.id is not None
     assert report.insurance_company.name == "Test Corp"
+
+
+def test_pool_profiles_and_env_overrides(monkeypatch):
+    for env_var in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_ECHO"):
+        monkeypatch.delenv(env_var, raising=False)
+    assert load_pool_options("dev")["echo"] is True
+    assert load_pool_options("prod")["echo"] is False
+
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_ECHO", "true")
+    options = load_pool_options("prod", "postgresql://db/crm")
+    assert options["pool_size"] == 7
+    assert options["echo"] is True
+
+    assert "pool_size" not in load_pool_options("prod", "sqlite://")
+    with pytest.raises(ValueError):
+        load_pool_options("staging")
+
+
+def test_pool_stats_track_checkouts(tmp_path):
+    file_engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=0
+    )
+    stats = instrument_engine(file_engine)
+    try:
+        conn = file_engine.connect()
+        assert stats.snapshot()["checkedout"] == 1
+        conn.close()
+
+        snapshot = stats.snapshot()
+        assert snapshot["connects"] == 1
+        assert snapshot["checkouts"] == snapshot["checkins"] == 1
+        assert snapshot["checkedout"] == 0
+        assert snapshot["connect_ms"]["count"] == 1
+        assert snapshot["checkout_wait_ms"]["count"] == 1
+
+        # Still timed once dispose() has replaced the pool
+        file_engine.dispose()
+        file_engine.connect().close()
+        assert stats.snapshot()["checkout_wait_ms"]["count"] == 2
+    finally:
+        file_engine.dispose()
+
+
+def test_request_sessions_check_out_lazily():
+    async def run():
+        before = pool_stats["async"].snapshot()["checkouts"]
+        async for db in get_async_db():
+            unused = pool_stats["async"].snapshot()["checkouts"] - before
+            await db.execute(text("SELECT 1"))
+        used = pool_stats["async"].snapshot()["checkouts"] - before
+        await async_engine.dispose()
+        return unused, used
+
+    unused, used = asyncio.run(run())
+
+    assert (unused, used) == (0, 1)
@@ -1,12 +1,17 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+import service_layer.dropdown_queries as dropdown_module
 from database import Base, InsuranceCompany, PracticeArea
 from service_layer.dropdown_queries import (
+    ReferenceDataCache,
     get_insurance_companies_for_dropdowns,
+    get_insurance_companies_for_dropdowns_cached,
     get_practice_areas_for_dropdowns,
+    get_practice_areas_for_dropdowns_cached,
+    reference_data_cache,
 )
 
 
@@ -70,3 +75,87 @@ def test_get_practice_areas_dropdown_success(db_session):
 def test_get_practice_areas_dropdown_empty(db_session):
     result = get_practice_areas_for_dropdowns(db_session)
     assert result == []
+
+
+@pytest.fixture(name="cache")
+def cache_fixture():
+    reference_data_cache.clear()
+    yield reference_data_cache
+    reference_data_cache.clear()
+
+
+def test_cached_dropdowns_skip_db_on_hit(db_session, cache):
+    db_session.add_all([InsuranceCompany(name="Allianz"), PracticeArea(name="Cyber")])
+    db_session.commit()
+
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    first = get_insurance_companies_for_dropdowns_cached(db_session)
+    second = get_insurance_companies_for_dropdowns_cached(db_session)
+    get_practice_areas_for_dropdowns_cached(db_session)
+    get_practice_areas_for_dropdowns_cached(db_session)
+
+    assert first == second == [{"id": 1, "name": "Allianz"}]
+    assert len(statements) == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_cached_dropdowns_invalidated_on_write(db_session, cache):
+    company = InsuranceCompany(name="Allianz")
+    db_session.add(company)
+    db_session.commit()
+    assert get_insurance_companies_for_dropdowns_cached(db_session) == [
+        {"id": 1, "name": "Allianz"}
+    ]
+
+    company.name = "Allianz SE"
+    db_session.commit()
+    assert get_insurance_companies_for_dropdowns_cached(db_session) == [
+        {"id": 1, "name": "Allianz SE"}
+    ]
+
+    db_session.query(InsuranceCompany).delete()
+    db_session.commit()
+    assert get_insurance_companies_for_dropdowns_cached(db_session) == []
+
+
+def test_read_racing_a_write_is_not_cached(db_session, cache, monkeypatch):
+    db_session.add(InsuranceCompany(name="Allianz"))
+    db_session.commit()
+    query = dropdown_module.get_insurance_companies_for_dropdowns
+
+    def query_then_concurrent_write(session):
+        companies = query(session)
+        # Another request commits a rename after this read saw the old name
+        cache.invalidate()
+        return companies
+
+    monkeypatch.setattr(
+        dropdown_module,
+        "get_insurance_companies_for_dropdowns",
+        query_then_concurrent_write,
+    )
+    stale = get_insurance_companies_for_dropdowns_cached(db_session)
+
+    assert stale == [{"id": 1, "name": "Allianz"}]
+    assert cache.get("insurance_companies") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_reference_cache_expires_after_ttl():
+    now = [0.0]
+    cache = ReferenceDataCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.set("practice_areas", [{"id": 1, "name": "Cyber"}], cache.generation)
+
+    now[0] = 9.9
+    assert cache.get("practice_areas") == [{"id": 1, "name": "Cyber"}]
+    now[0] = 10.0
+    assert cache.get("practice_areas") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
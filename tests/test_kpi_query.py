@@ -1,13 +1,20 @@
+import asyncio
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from database import KPI, Base, InsuranceCompany, PracticeArea
+from database import KPI, Base, InsuranceCompany, KPIAreaRollup, PracticeArea
+from service_layer.kpi_rollup import rebuild_kpi_rollups
 from service_layer.kpi_query import (
     KPISchema,
     get_analytics_payload,
+    get_analytics_payload_async,
     get_kpis_by_insurance_company_and_practice_area,
+    get_kpis_by_insurance_company_and_practice_area_async,
+    get_live_analytics_payload,
 )
 
 
@@ -130,3 +137,184 @@ def test_get_analytics_empty_db(session):
     payload = get_analytics_payload(session)
     assert payload["bar"]["labels"] == []
     assert payload["donut"]["series"] == []
+
+
+def test_async_variants_match_sync():
+    """The async queries return the same data as their sync counterparts."""
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                allianz = InsuranceCompany(name="Allianz")
+                marine = PracticeArea(name="Marine")
+                session.add_all(
+                    [
+                        KPI(
+                            insurance_company=allianz,
+                            practice_area=marine,
+                            incoming_fees=1000,
+                            fees_collected=800,
+                            new_mandates=5,
+                        ),
+                        KPI(
+                            insurance_company=allianz,
+                            practice_area=marine,
+                            incoming_fees=2000,
+                            fees_collected=1200,
+                            new_mandates=3,
+                        ),
+                    ]
+                )
+                await session.commit()
+
+                kpis = await get_kpis_by_insurance_company_and_practice_area_async(
+                    session, allianz.id, marine.id
+                )
+                payload = await get_analytics_payload_async(session)
+        finally:
+            await engine.dispose()
+        return kpis, payload
+
+    kpis, payload = asyncio.run(run())
+
+    assert [k.incoming_fees for k in kpis] == [1000, 2000]
+    assert kpis[0].insurance_company_name == "Allianz"
+    assert payload["bar"] == {
+        "labels": ["Marine"],
+        "incoming": [3000],
+        "collected": [2000],
+    }
+    assert payload["donut"] == {"labels": ["Allianz"], "series": [8]}
+
+
+def _totals(payload):
+    """Order-independent view of an analytics payload."""
+    bar, donut = payload["bar"], payload["donut"]
+    return (
+        dict(zip(bar["labels"], zip(bar["incoming"], bar["collected"]))),
+        dict(zip(donut["labels"], donut["series"])),
+    )
+
+
+def test_rollups_follow_incremental_kpi_changes(session):
+    """Inserts, updates, moves and deletes keep the rollups equal to the live data."""
+    allianz = session.query(InsuranceCompany).filter_by(name="Allianz").first()
+    axa = session.query(InsuranceCompany).filter_by(name="AXA").first()
+    cyber = session.query(PracticeArea).filter_by(name="Cyber").first()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+    kpi = session.query(KPI).filter_by(incoming_fees=5000).one()
+    kpi.incoming_fees = 7000
+    session.commit()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+    kpi.insurance_company_id = axa.id
+    session.commit()
+    payload = get_analytics_payload(session)
+    assert _totals(payload) == _totals(get_live_analytics_payload(session))
+    assert payload["donut"]["series"][payload["donut"]["labels"].index("AXA")] == 12
+
+    session.delete(kpi)
+    session.commit()
+    payload = get_analytics_payload(session)
+    assert _totals(payload) == _totals(get_live_analytics_payload(session))
+    assert "Cyber" not in payload["bar"]["labels"]
+
+    session.add(
+        KPI(
+            insurance_company=allianz,
+            practice_area=cyber,
+            incoming_fees=100,
+            fees_collected=50,
+            new_mandates=1,
+        )
+    )
+    session.commit()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+
+def test_rollups_follow_moves_through_relationships(session):
+    axa = session.query(InsuranceCompany).filter_by(name="AXA").first()
+    cyber = session.query(PracticeArea).filter_by(name="Cyber").first()
+    kpi = session.query(KPI).filter_by(incoming_fees=1000).one()
+
+    # Expired by the commit; the old values are loaded on assignment
+    session.expire_all()
+    kpi.practice_area = cyber
+    kpi.insurance_company = axa
+    kpi.incoming_fees = 1500
+    session.commit()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+    session.expire_all()
+    session.delete(kpi)
+    session.commit()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+
+def test_rollups_add_deltas_instead_of_recomputing(session):
+    """A write adds its own change, so it cannot overwrite a concurrent
+    transaction's change with a total that misses it."""
+    marine = session.query(PracticeArea).filter_by(name="Marine").first()
+    allianz = session.query(InsuranceCompany).filter_by(name="Allianz").first()
+    # Stands in for another transaction's committed change
+    session.execute(
+        update(KPIAreaRollup)
+        .where(KPIAreaRollup.practice_area_id == marine.id)
+        .values(incoming_fees=KPIAreaRollup.incoming_fees + 1)
+    )
+    session.commit()
+
+    session.add(
+        KPI(
+            insurance_company=allianz,
+            practice_area=marine,
+            incoming_fees=100,
+            fees_collected=50,
+            new_mandates=1,
+        )
+    )
+    session.commit()
+
+    assert _totals(get_analytics_payload(session))[0]["Marine"] == (6101, 4550)
+
+
+def test_rebuild_kpi_rollups_repairs_drift(session):
+    session.query(KPIAreaRollup).delete()
+    session.commit()
+    assert get_analytics_payload(session)["bar"]["labels"] == []
+
+    rebuild_kpi_rollups(session.connection())
+    session.commit()
+    assert _totals(get_analytics_payload(session)) == _totals(
+        get_live_analytics_payload(session)
+    )
+
+
+def test_get_kpis_fast_path_matches_validating_mode(session):
+    allianz = session.query(InsuranceCompany).filter_by(name="Allianz").first()
+    marine = session.query(PracticeArea).filter_by(name="Marine").first()
+
+    validated = get_kpis_by_insurance_company_and_practice_area(
+        session, allianz.id, marine.id
+    )
+    fast = get_kpis_by_insurance_company_and_practice_area(
+        session, allianz.id, marine.id, validate=False
+    )
+
+    assert sorted(fast, key=lambda k: k.id) == sorted(validated, key=lambda k: k.id)
+    assert all(isinstance(k, KPISchema) for k in fast)
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_ai.messages import ModelResponse, RetryPromptPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.test import TestModel
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import agent.agent as agent_module
+import app as app_module
+from agent.agent import run_360, run_360_hierarchical, simple_agent
+from agent.concurrency import ModelBusyError, ModelCallLimiter
+from agent.llm_metrics import LLMCall, LLMCallLog
+from agent.map_reduce import chunk_agent
+from tests.conftest import OUTPUT_ARGS, seed_pair
+
+
+def _run(*calls):
+    """Runs the coroutine factories one after another against seeded data."""
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            await seed_pair(engine)
+            results = []
+            for make_call in calls:
+                async with AsyncSession(engine) as session:
+                    try:
+                        results.append(await make_call(session))
+                    except ModelBusyError as exc:
+                        results.append(exc)
+            return results
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _rows(log: LLMCallLog):
+    return (
+        log._connection()
+        .execute(
+            "SELECT operation, cache_hit, input_tokens, output_tokens, requests, "
+            "retries, error FROM llm_calls ORDER BY rowid"
+        )
+        .fetchall()
+    )
+
+
+def test_runs_and_cache_hits_are_recorded(cache, llm_call_log):
+    with simple_agent.override(model=TestModel(custom_output_args=OUTPUT_ARGS)):
+        _run(lambda s: run_360(s, 1, 1), lambda s: run_360(s, 1, 1))
+
+    miss, hit = _rows(llm_call_log)
+    assert miss[:2] == ("run_360", 0)
+    assert miss[2] > 0 and miss[3] > 0
+    assert miss[4] == 1
+    assert hit[:5] == ("run_360", 1, 0, 0, 0)
+
+    summary = llm_call_log.summary()
+    assert summary["totals"]["calls"] == 2
+    assert summary["totals"]["cache_hits"] == 1
+    (pair,) = summary["by_pair"]
+    assert (pair["company_id"], pair["area_id"]) == (1, 1)
+    assert summary["by_model"][0]["model_name"] == agent_module.AI_MODEL
+
+
+def test_validation_retries_are_counted(cache, llm_call_log):
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        retried = any(
+            isinstance(part, RetryPromptPart)
+            for message in messages
+            for part in message.parts
+        )
+        args = OUTPUT_ARGS if retried else {"kpi_analysis": "unvollständig"}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    with simple_agent.override(model=FunctionModel(respond)):
+        _run(lambda s: run_360(s, 1, 1))
+
+    ((_, _, _, _, requests, retries, error),) = _rows(llm_call_log)
+    assert (requests, retries, error) == (2, 1, None)
+
+
+def test_failures_are_recorded(cache, llm_call_log, monkeypatch):
+    limiter = ModelCallLimiter(limit=1, queue_timeout=0)
+    limiter._semaphore = asyncio.Semaphore(0)
+    monkeypatch.setattr(agent_module, "model_call_limiter", limiter)
+
+    (result,) = _run(lambda s: run_360(s, 1, 1))
+
+    assert isinstance(result, ModelBusyError)
+    ((operation, _, _, _, _, _, error),) = _rows(llm_call_log)
+    assert operation == "run_360"
+    assert error.startswith("ModelBusyError")
+
+
+def test_hierarchical_tokens_include_chunk_calls(cache, llm_call_log):
+    chunk_model = TestModel(custom_output_args={"summary": "Befund [Report-1]"})
+    with simple_agent.override(
+        model=TestModel(custom_output_args=OUTPUT_ARGS)
+    ), chunk_agent.override(model=chunk_model):
+        _run(lambda s: run_360_hierarchical(s, 1, 1))
+
+    ((operation, _, _, _, requests, _, _),) = _rows(llm_call_log)
+    assert operation == "run_360_hierarchical"
+    # One chunk call for the single report plus the final call
+    assert requests == 2
+
+
+def test_llm_stats_endpoint(monkeypatch, tmp_path):
+    log = LLMCallLog(str(tmp_path / "llm_calls.db"))
+    monkeypatch.setattr(app_module, "llm_call_log", log)
+    monkeypatch.setattr("agent.llm_metrics.LLM_INPUT_PRICE_PER_MTOK", 2.0)
+    for company_id, tokens in ((1, 1000), (2, 3000), (2, 1000)):
+        log.record(
+            LLMCall(
+                company_id=company_id,
+                area_id=1,
+                operation="run_360",
+                model_name="m",
+                prompt_version="v",
+                input_tokens=tokens,
+                model_ms=tokens / 10,
+            )
+        )
+
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        stats = client.get("/internal/llm-stats").json()
+
+    assert stats["limiter"]["limit"] == agent_module.model_call_limiter.limit
+    assert stats["totals"]["calls"] == 3
+    assert stats["totals"]["estimated_cost_usd"] == pytest.approx(0.01)
+    # The pair with the most model time comes first
+    assert [p["company_id"] for p in stats["by_pair"]] == [2, 1]
+    assert stats["by_pair"][0]["input_tokens"] == 4000
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import RunUsage
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from agent.agent import run_360_hierarchical, simple_agent
+from agent.concurrency import ModelCallLimiter
+from agent.map_reduce import chunk_agent, keep_known_citations, summarize_reports
+from database import Base, InsuranceCompany, PracticeArea, Report
+from service_layer.reports_query import ReportSchema
+from tests.conftest import OUTPUT_ARGS
+
+
+def _reports(count):
+    return [
+        ReportSchema(
+            id=i,
+            insurance_company_name="Test Insurance",
+            practice_area_name="Legal Tech",
+            department_visited="Claims",
+            visited_key_personnel="John Doe",
+            report_date=datetime(2025, 1, 1) + timedelta(days=i),
+            report_content=f"Bericht {i}",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class ChunkModel:
+    """Summarizes a chunk by citing its first report and a made-up one."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def respond(self, messages, info: AgentInfo):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        prompt = messages[-1].parts[-1].content
+        first_id = prompt.split("Report-", 1)[1].split("\t", 1)[0].split("]", 1)[0]
+        summary = f"Befund [Report-{first_id}] und [Report-99999]."
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, {"summary": summary})]
+        )
+
+
+def test_keep_known_citations():
+    text = "A [Report-1], B [Report-2], C [KPI-3]"
+    assert keep_known_citations(text, {1}) == "A [Report-1], B , C [KPI-3]"
+
+
+def test_chunks_run_in_parallel_up_to_the_limit():
+    chunk_model = ChunkModel(delay=0.05)
+
+    async def run():
+        with chunk_agent.override(model=FunctionModel(chunk_model.respond)):
+            return await summarize_reports(
+                _reports(100),
+                ModelCallLimiter(limit=10, queue_timeout=5),
+                chunk_size=10,
+                parallelism=4,
+            )
+
+    digests = asyncio.run(run())
+
+    assert chunk_model.calls == 10
+    assert chunk_model.max_in_flight == 4
+    assert [d.report_ids[0] for d in digests] == list(range(1, 101, 10))
+    assert digests[0].text == "Befund [Report-1] und ."
+
+
+def test_fan_out_is_not_bound_by_one_runs_request_limit():
+    chunk_model = ChunkModel(delay=0)
+    usage = RunUsage()
+
+    async def run():
+        with chunk_agent.override(model=FunctionModel(chunk_model.respond)):
+            return await summarize_reports(
+                _reports(60),
+                ModelCallLimiter(limit=10, queue_timeout=5),
+                chunk_size=1,
+                parallelism=10,
+                token_budget=100_000,
+                usage=usage,
+            )
+
+    digests = asyncio.run(run())
+
+    # More chunks than pydantic_ai's default request_limit of 50
+    assert len(digests) == 60
+    assert usage.requests == 60
+    assert usage.input_tokens > 0
+
+
+def test_summaries_over_budget_are_reduced_again():
+    chunk_model = ChunkModel()
+
+    async def run():
+        with chunk_agent.override(model=FunctionModel(chunk_model.respond)):
+            return await summarize_reports(
+                _reports(40),
+                ModelCallLimiter(limit=4, queue_timeout=5),
+                chunk_size=4,
+                parallelism=4,
+                token_budget=20,
+            )
+
+    digests = asyncio.run(run())
+
+    # 10 chunk summaries, then 3 groups of up to 4, then 1
+    assert chunk_model.calls == 10 + 3 + 1
+    assert len(digests) == 1
+    assert sorted(digests[0].report_ids) == list(range(1, 41))
+    assert "[Report-1]" in digests[0].text
+
+
+def test_hierarchical_run_keeps_report_citations(cache):
+    final_prompts = []
+
+    def final_model(messages, info: AgentInfo):
+        final_prompts.append(messages[-1].parts[-1].content)
+        args = {
+            **OUTPUT_ARGS,
+            "report_analysis": "Siehe [Report-1] und [Report-424242].",
+            "citations": [
+                {"source_id": "Report-1", "company_id": 1, "area_id": 1},
+                {"source_id": "Report-424242", "company_id": 1, "area_id": 1},
+                {"source_id": "KPI-1", "company_id": 1, "area_id": 1},
+            ],
+        }
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with AsyncSession(engine) as session:
+                session.add_all(
+                    [InsuranceCompany(id=1, name="T"), PracticeArea(id=1, name="A")]
+                    + [
+                        Report(
+                            id=i,
+                            insurance_company_id=1,
+                            practice_area_id=1,
+                            department_visited="Claims",
+                            visited_key_personnel="John Doe",
+                            report_date=datetime(2025, 1, 1) + timedelta(days=i),
+                            report_content=f"Bericht {i}",
+                        )
+                        for i in range(1, 13)
+                    ]
+                )
+                await session.commit()
+            with chunk_agent.override(model=FunctionModel(ChunkModel().respond)):
+                with simple_agent.override(model=FunctionModel(final_model)):
+                    async with AsyncSession(engine) as session:
+                        return await run_360_hierarchical(
+                            session, 1, 1, chunk_size=5, parallelism=2
+                        )
+        finally:
+            await engine.dispose()
+
+    output = asyncio.run(run())
+
+    # Reports come newest first: chunks 12-8, 7-3, 2-1
+    assert "Part 3: Befund [Report-2] und ." in final_prompts[0]
+    assert "Bericht" not in final_prompts[0]
+    assert output.report_analysis == "Siehe [Report-1] und ."
+    assert [c.source_id for c in output.citations] == ["Report-1", "KPI-1"]
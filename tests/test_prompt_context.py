@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from agent.prompt_context import (
+    PromptBudgetExceeded,
+    build_prompt_context,
+    estimate_tokens,
+)
+from service_layer.kpi_query import KPISchema
+from service_layer.reports_query import ReportSchema
+
+
+def _kpi(kpi_id=101):
+    return KPISchema(
+        id=kpi_id,
+        incoming_fees=5000,
+        fees_collected=4000,
+        new_mandates=10,
+        insurance_company_name="Test Insurance",
+        practice_area_name="Legal Tech",
+    )
+
+
+def _reports(count):
+    report_list = [
+        ReportSchema(
+            id=200 + i,
+            insurance_company_name="Test Insurance",
+            practice_area_name="Legal Tech",
+            department_visited="Claims",
+            visited_key_personnel="John Doe",
+            report_date=datetime(2025, 1, 1 + i % 28, 14, 30),
+            report_content="Protokoll AL-123/24\nOrt: Berlin | Prio: Hoch\n---\nGut.",
+        )
+        for i in range(count)
+    ]
+    return {
+        "insurance_company_name": "Test Insurance",
+        "practice_area_name": "Legal Tech",
+        "reports": report_list,
+    }
+
+
+def test_rows_carry_citation_ids_and_names_appear_once():
+    context = build_prompt_context(1, 1, [_kpi()], _reports(2))
+
+    lines = context.text.splitlines()
+    assert "KPI-101\t5000\t4000\t10" in lines
+    assert (
+        "Report-200\t2025-01-01\tClaims\tJohn Doe\t"
+        "Protokoll AL-123/24 / Ort: Berlin | Prio: Hoch / --- / Gut." in lines
+    )
+    assert context.text.count("Test Insurance") == 1
+    assert "datetime(" not in context.text
+    assert (context.kpi_count, context.report_count, context.omitted_reports) == (
+        1,
+        2,
+        0,
+    )
+
+
+def test_compact_context_is_smaller_than_repr_prompt():
+    kpis, reports = [_kpi()], _reports(50)
+    repr_prompt = f"KPIs: {kpis}\n\nReports: {reports}"
+
+    context = build_prompt_context(1, 1, kpis, reports)
+
+    assert context.estimated_tokens < estimate_tokens(repr_prompt) / 2
+
+
+def test_budget_keeps_leading_reports_and_notes_the_rest():
+    context = build_prompt_context(1, 1, [_kpi()], _reports(100), token_budget=600)
+
+    assert context.estimated_tokens <= 600
+    assert 0 < context.report_count < 100
+    assert context.omitted_reports == 100 - context.report_count
+    assert "Report-200\t" in context.text
+    assert f"({context.omitted_reports} further reports omitted" in context.text
+
+
+def test_budget_too_small_for_kpis_raises():
+    with pytest.raises(PromptBudgetExceeded):
+        build_prompt_context(1, 1, [_kpi(i) for i in range(100)], None, token_budget=50)
+
+
+def test_input_size_is_logged(caplog):
+    with caplog.at_level("INFO", logger="agent.prompt_context"):
+        build_prompt_context(1, 1, [_kpi()], _reports(3))
+
+    assert "kpis=1 reports=3 omitted=0" in caplog.text
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from pydantic_ai.models.test import TestModel
+
+from agent.agent import Insurance360Output, run_simple_360, simple_agent
+from agent.prompt_context import build_prompt_context
+from agent.report_ranking import BM25Index, rank_reports
+from service_layer.reports_query import ReportSchema
+from tests.conftest import OUTPUT_ARGS
+
+NOW = datetime(2025, 6, 1)
+
+
+def _report(report_id, content, days_ago=0):
+    return ReportSchema(
+        id=report_id,
+        insurance_company_name="Test Insurance",
+        practice_area_name="Cyber-Risiken",
+        department_visited="Claims",
+        visited_key_personnel="John Doe",
+        report_date=NOW - timedelta(days=days_ago),
+        report_content=content,
+    )
+
+
+def test_bm25_scores_matching_documents_higher():
+    index = BM25Index(
+        ["Betrugsprävention Workshop", "Sommerfest mit Kunden", "Betrug und Regress"]
+    )
+
+    scores = index.scores("betrugsprävention")
+
+    assert scores[0] > 0
+    assert scores[1] == scores[2] == 0
+
+
+def test_ranking_weighs_recency_priority_and_relevance():
+    reports = [
+        _report(1, "Prio: Normal\n---\nSommerfest.", days_ago=400),
+        _report(2, "Prio: Normal\n---\nSommerfest.", days_ago=1),
+        _report(3, "Prio: Hoch\n---\nSommerfest.", days_ago=400),
+        _report(
+            4, "Prio: Normal\n---\nRansomware Cyber-Risiken Analyse.", days_ago=400
+        ),
+    ]
+
+    ranked = rank_reports(reports, "Ransomware", now=NOW)
+
+    order = [r.report_id for r in ranked]
+    assert order[0] == 2
+    assert order[-1] == 1
+    assert set(order[1:3]) == {3, 4}
+    by_id = {r.report_id: r for r in ranked}
+    assert by_id[3].priority == 1.0
+    assert by_id[4].relevance == 1.0
+    assert by_id[2].recency > 0.99
+
+
+def test_budget_keeps_top_ranked_reports_listed_newest_first():
+    reports = [_report(i, f"Bericht {i} " + "x" * 200, days_ago=i) for i in range(20)]
+    ranked = [reports[i] for i in (5, 3, 17, 0, 9, 1, 2)] + reports[10:]
+
+    payload = {
+        "insurance_company_name": "T",
+        "practice_area_name": "A",
+        "reports": ranked,
+    }
+
+    context = build_prompt_context(1, 1, [], payload, token_budget=300)
+
+    # Report ids equal their age in days, so newest first is ascending
+    assert context.report_ids == sorted(context.report_ids)
+    assert set(context.report_ids) <= {5, 3, 17, 0, 9, 1, 2}
+    assert 5 in context.report_ids
+
+
+def test_selection_is_recorded_on_the_output(db_session, cache):
+    with simple_agent.override(model=TestModel(custom_output_args=OUTPUT_ARGS)):
+        output = run_simple_360(db_session, 1, 1, focus="Effizienz")
+
+    selection = output.report_selection
+    assert selection.query == "Legal Tech Effizienz"
+    assert selection.considered == 1
+    assert [r.report_id for r in selection.selected] == [1]
+    assert selection.omitted == 0
+    # Kept with the cached result, never requested from the model
+    assert run_simple_360(db_session, 1, 1, focus="Effizienz") == output
+    schema = Insurance360Output.model_json_schema()
+    assert "report_selection" not in schema["properties"]
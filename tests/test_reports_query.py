@@ -1,7 +1,9 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -9,7 +11,12 @@ from database import Base, InsuranceCompany, PracticeArea, Report
 from service_layer.reports_query import (
     ReportSchema,
     get_report_analysis_payload,
+    get_report_analysis_payload_async,
     get_report_by_id,
+    get_report_by_id_async,
+    get_report_page,
+    get_reports_by_ids,
+    months_ago,
 )
 
 
@@ -103,3 +110,200 @@ def test_report_schema_fallback_names(session):
 
     assert result.insurance_company_name == "Unbekannt"
     assert result.practice_area_name == "Unbekannt"
+
+
+def test_async_report_queries():
+    """The async report queries load names eagerly (no lazy IO under asyncio)."""
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                report = Report(
+                    insurance_company=InsuranceCompany(name="Allianz"),
+                    practice_area=PracticeArea(name="Marine"),
+                    department_visited="Claims Management",
+                    visited_key_personnel="Dr. Müller",
+                    report_date=datetime(2024, 1, 15, 10, 0),
+                    report_content="Detailed meeting notes here.",
+                )
+                session.add(report)
+                await session.commit()
+                report_id = report.id
+                company_id = report.insurance_company_id
+                area_id = report.practice_area_id
+                session.expunge_all()
+
+                by_id = await get_report_by_id_async(session, report_id)
+                payload = await get_report_analysis_payload_async(
+                    session, company_id, area_id
+                )
+                missing = await get_report_by_id_async(session, 9999)
+        finally:
+            await engine.dispose()
+        return by_id, payload, missing
+
+    by_id, payload, missing = asyncio.run(run())
+
+    assert by_id.insurance_company_name == "Allianz"
+    assert by_id.practice_area_name == "Marine"
+    assert payload["reports"] == [by_id]
+    assert missing is None
+
+
+def test_report_analysis_fast_path_matches_validating_mode(session):
+    company = session.query(InsuranceCompany).first()
+    area = session.query(PracticeArea).first()
+
+    validated = get_report_analysis_payload(session, company.id, area.id)
+    fast = get_report_analysis_payload(session, company.id, area.id, validate=False)
+
+    assert fast == validated
+    assert isinstance(fast["reports"][0], ReportSchema)
+    assert isinstance(fast["reports"][0].report_date, datetime)
+    assert get_report_analysis_payload(session, 999, 999, validate=False) is None
+
+
+def _add_reports(session, dates):
+    company = session.query(InsuranceCompany).first()
+    area = session.query(PracticeArea).first()
+    session.add_all(
+        Report(
+            insurance_company_id=company.id,
+            practice_area_id=area.id,
+            department_visited="Claims",
+            visited_key_personnel="Dr. Müller",
+            report_date=date,
+            report_content=f"Report {i}",
+        )
+        for i, date in enumerate(dates)
+    )
+    session.commit()
+    return company.id, area.id
+
+
+def test_get_report_page_walks_all_reports_newest_first(session):
+    # Two reports share a timestamp, so the id has to break the tie
+    company_id, area_id = _add_reports(
+        session,
+        [
+            datetime(2024, 3, 1),
+            datetime(2024, 2, 1),
+            datetime(2024, 2, 1),
+            datetime(2023, 12, 24),
+        ],
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = get_report_page(session, company_id, area_id, limit=2, cursor=cursor)
+        seen.extend(page["reports"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len({r.id for r in seen}) == 5
+    keys = [(r.report_date, r.id) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_get_report_page_date_window(session):
+    company_id, area_id = _add_reports(
+        session, [datetime(2024, 3, 1), datetime(2024, 2, 1), datetime(2023, 12, 24)]
+    )
+
+    page = get_report_page(
+        session,
+        company_id,
+        area_id,
+        since=datetime(2024, 1, 1),
+        until=datetime(2024, 3, 1),
+    )
+
+    assert [r.report_date for r in page["reports"]] == [
+        datetime(2024, 2, 1),
+        datetime(2024, 1, 15, 10, 0),
+    ]
+    assert page["next_cursor"] is None
+
+
+def test_get_report_page_converts_aware_window_to_utc(session):
+    company_id, area_id = _add_reports(
+        session, [datetime(2024, 3, 1, 9, 0), datetime(2024, 3, 1, 11, 0)]
+    )
+    cet = timezone(timedelta(hours=1))
+
+    page = get_report_page(
+        session,
+        company_id,
+        area_id,
+        # 10:30 UTC
+        since=datetime(2024, 3, 1, 11, 30, tzinfo=cet),
+    )
+
+    assert [r.report_date for r in page["reports"]] == [datetime(2024, 3, 1, 11, 0)]
+
+
+def test_get_report_page_rejects_bad_cursor(session):
+    with pytest.raises(ValueError):
+        get_report_page(session, 1, 1, cursor="not-a-cursor")
+
+
+def test_report_analysis_payload_most_recent_n(session):
+    company_id, area_id = _add_reports(
+        session, [datetime(2024, 3, 1), datetime(2023, 12, 24)]
+    )
+
+    payload = get_report_analysis_payload(session, company_id, area_id, limit=2)
+
+    assert [r.report_date for r in payload["reports"]] == [
+        datetime(2024, 3, 1),
+        datetime(2024, 1, 15, 10, 0),
+    ]
+
+
+def test_months_ago_clamps_to_month_end():
+    assert months_ago(1, now=datetime(2024, 3, 31, 12)) == datetime(2024, 2, 29, 12)
+    assert months_ago(14, now=datetime(2024, 1, 15)) == datetime(2022, 11, 15)
+
+
+def _count_selects(session):
+    statements = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+def test_get_report_by_id_single_statement(session):
+    report_id = session.query(Report).first().id
+    session.expunge_all()
+    statements = _count_selects(session)
+
+    result = get_report_by_id(session, report_id)
+
+    assert result.insurance_company_name == "Allianz"
+    assert result.practice_area_name == "Marine"
+    assert len(statements) == 1
+
+
+def test_get_reports_by_ids_one_query_in_request_order(session):
+    company_id, area_id = _add_reports(
+        session, [datetime(2024, 3, 1), datetime(2023, 12, 24)]
+    )
+    ids = [r.id for r in session.query(Report).order_by(Report.id)]
+    session.expunge_all()
+    statements = _count_selects(session)
+
+    result = get_reports_by_ids(session, [ids[2], 9999, ids[0], ids[2]])
+
+    assert [r.id for r in result] == [ids[2], ids[0]]
+    assert result[1].insurance_company_name == "Allianz"
+    assert len(statements) == 1
+    assert get_reports_by_ids(session, []) == []
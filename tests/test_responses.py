@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app as app_module
+from agent.agent import Citation, Insurance360Output
+from dependencies import get_async_db
+from responses import PydanticJSONResponse
+from service_layer.kpi_query import KPISchema
+from service_layer.reports_query import ReportSchema
+from tests.conftest import seed_pair
+
+NAMES = {"insurance_company_name": "Allianz", "practice_area_name": "Cyber"}
+
+
+def test_renders_the_same_json_as_jsonable_encoder():
+    output = Insurance360Output(
+        **NAMES,
+        kpi_data=[
+            KPISchema(
+                id=1, incoming_fees=5000, fees_collected=4000, new_mandates=10, **NAMES
+            )
+        ],
+        visit_reports=[
+            ReportSchema(
+                id=1,
+                department_visited="Schadenabteilung",
+                visited_key_personnel="Dr. Müller",
+                report_date=datetime(2025, 1, 1, 9, 30),
+                report_content="Termin.",
+                **NAMES,
+            )
+        ],
+        kpi_analysis="Steigend [KPI-1].",
+        report_analysis="Eng [1].",
+        final_executive_summary="Stabil.",
+        citations=[Citation(source_id="1", company_id=1, area_id=1)],
+    )
+    payload = {"recent": [output], "missing": [2]}
+
+    rendered = PydanticJSONResponse(payload).body
+
+    assert json.loads(rendered) == jsonable_encoder(payload)
+    assert "Müller".encode() in rendered
+
+
+def test_prompt_can_omit_echoed_data(cache, stand_in, monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    TestSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_db():
+        async with TestSession() as db:
+            yield db
+
+    monkeypatch.setitem(app_module.app.dependency_overrides, get_async_db, override_db)
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        client.portal.call(seed_pair, engine)
+        full = client.get("/prompt/1/1").json()
+        slim = client.get("/prompt/1/1?omit_data=true").json()
+        client.portal.call(engine.dispose)
+
+    assert {"kpi_data", "visit_reports"} <= set(full)
+    assert slim == {
+        key: value
+        for key, value in full.items()
+        if key not in ("kpi_data", "visit_reports")
+    }